@@ -0,0 +1,452 @@
+"""pyRFTdi benchmark suite.
+
+Measures USB transaction count and wall time of common operations, either on pair of emulated
+radios linked by Rfm75AirMedium or on real modules connected to FTDI adapters.
+
+Usage::
+
+    python benchmarks/bench.py --latency 0.000125 --output baseline.json
+    python benchmarks/bench.py --compare baseline.json
+    python benchmarks/bench.py --url ftdi://ftdi:232h:555551/1 --url ftdi://ftdi:232h:555552/1
+
+First URL is the RX radio used by single radio benchmarks, second one is the TX radio.
+Benchmarks which need both radios are skipped when only one URL is given.
+
+Comparison run exits with code 1 when USB transactions per operation of any benchmark grow.
+Wall time is reported but never fails comparison. Benchmarks marked as timed (polling loops,
+sustained transfer) depend on timing by nature and are compared with --timed-tolerance.
+"""
+import argparse
+import json
+import logging
+import platform
+import sys
+from time import monotonic, process_time, sleep
+
+from pyRFTdi.Rfm75AirMedium import Rfm75AirMedium
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen, Rfm75TxOutcome, Rfm75TxPower
+from pyRFTdi.Rfm75Profile import Rfm75PipeProfile, Rfm75Profile
+from pyRFTdi.Rfm75Receiver import Rfm75Receiver
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+from pyRFTdi.Rfm75TxStream import Rfm75TxStream
+
+DATA_RATES = ("250ksps", "1Msps", "2Msps")
+PAYLOAD_SIZE = 32
+ADDRESS = b'\x11\x22\x33\x22\x11'
+SUSTAINED_SETUP_RETR = 0x2F  # 15 retransmits 750us apart, RX FIFO could stay full for a poll_interval or two
+
+
+def make_profile(data_rate: str = "2Msps", channel: int = 0x04, auto_ack: bool = True) -> Rfm75Profile:
+    """Profile used by both radios, pipe 0 with static payload width"""
+    return Rfm75Profile(
+        channel=channel, data_rate=data_rate, address_width=Rfm75AddressWidth.ADDR_5, tx_address=ADDRESS,
+        pipes={0: Rfm75PipeProfile(ADDRESS, PAYLOAD_SIZE, auto_ack=auto_ack)},
+        crc_enabled=True, crc_len=Rfm75CRCLen.CRC_2, tx_power=Rfm75TxPower.TX_PWR_LOW, lna_gain_high=True)
+
+
+# Differs from make_profile() in every managed register, applied before bring-up benchmark
+SCRAMBLED_PROFILE = Rfm75Profile(
+    channel=0x50, data_rate="1Msps", address_width=Rfm75AddressWidth.ADDR_3, tx_address=b'\xE7\xE7\xE7\xE7\xE7',
+    pipes={1: Rfm75PipeProfile(b'\xC2\xC2\xC2\xC2\xC2', 1)},
+    crc_enabled=False, crc_len=Rfm75CRCLen.CRC_1, tx_power=Rfm75TxPower.TX_PWR_HIGH, lna_gain_high=False)
+
+
+class CountingPort:
+    """SpiPort proxy which counts USB transactions"""
+
+    def __init__(self, port, counts: dict):
+        self._port = port
+        self._counts = counts
+
+    def exchange(self, out=b'', readlen: int = 0, start: bool = True, stop: bool = True,
+                 duplex: bool = False, droptail: int = 0) -> bytes:
+        self._counts["spi_exchange"] += 1
+        return self._port.exchange(out, readlen, start, stop, duplex, droptail)
+
+    def write(self, out, start: bool = True, stop: bool = True, droptail: int = 0):
+        self._counts["spi_write"] += 1
+        return self._port.write(out, start, stop, droptail)
+
+    def read(self, readlen: int = 0, start: bool = True, stop: bool = True, droptail: int = 0) -> bytes:
+        self._counts["spi_read"] += 1
+        return self._port.read(readlen, start, stop, droptail)
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+
+class CountingGpio:
+    """SpiGpioPort proxy which counts USB transactions"""
+
+    def __init__(self, gpio, counts: dict):
+        self._gpio = gpio
+        self._counts = counts
+
+    @property
+    def direction(self) -> int:
+        return self._gpio.direction
+
+    def read(self, with_output: bool = False) -> int:
+        self._counts["gpio_read"] += 1
+        return self._gpio.read(with_output)
+
+    def write(self, value: int):
+        self._counts["gpio_write"] += 1
+        self._gpio.write(value)
+
+    def set_direction(self, pins: int, direction: int):
+        self._gpio.set_direction(pins, direction)
+
+
+class BenchRadio:
+    """Radio under test with USB transaction counters"""
+
+    KINDS = ("spi_exchange", "spi_write", "spi_read", "gpio_read", "gpio_write")
+
+    def __init__(self, name: str, port, gpio, ce_pin: int, irq_pin: int = None):
+        self.name = name
+        self.counts = dict.fromkeys(self.KINDS, 0)
+        self._port = CountingPort(port, self.counts)
+        self._gpio = CountingGpio(gpio, self.counts)
+        self._ce_pin = ce_pin
+        self._irq_pin = irq_pin
+        self.controller = None
+        self.reopen()
+        self.__features_active = self.__probe_features()
+
+    def reopen(self) -> FtdiRfm75Controller:
+        """Create new controllers, so register cache starts empty"""
+        reg_controller = Rfm75RegisterController(self._port, use_cache=True)
+        self.controller = FtdiRfm75Controller(self._port, self._gpio, self._ce_pin, reg_controller,
+                                              irq_pin=self._irq_pin)
+        return self.controller
+
+    def bring_up(self, profile: Rfm75Profile, rx: bool):
+        controller = self.controller
+        controller.ce_off()
+        # R_RX_PL_WID used by drain_rx_fifo() returns 0 until features are activated
+        if not self.__features_active:
+            controller.activate_features()
+            self.__features_active = True
+        controller.config_ctrl.apply(profile)
+        if rx:
+            controller.set_mode_rx()
+        else:
+            controller.set_mode_tx()
+        controller.power_up()
+        controller.flush_tx()
+        controller.flush_rx()
+        controller.clear_status_flags(0x70)
+        if rx:
+            controller.ce_on()
+
+    def __probe_features(self) -> bool:
+        """Module ignores FEATURE writes while features are not activated. ACTIVATE toggles them,
+        so their state is probed once instead of sending ACTIVATE on every bring-up"""
+        reg_controller = self.controller.get_register_controller()
+        reg_controller.write_register(Rfm75Registers.FEATURE, [0x01])
+        reg_controller.invalidate_cache(Rfm75Registers.FEATURE)
+        active = reg_controller.read_register(Rfm75Registers.FEATURE)[0] == 0x01
+        reg_controller.write_register(Rfm75Registers.FEATURE, [0x00])
+        return active
+
+
+class Bench:
+    """Runs benchmarks and collects results"""
+
+    def __init__(self, rx: BenchRadio, tx: BenchRadio = None, iterations: int = 50, packets: int = 200,
+                 idle_time: float = 1.0):
+        self.rx = rx
+        self.tx = tx
+        self.iterations = iterations
+        self.packets = packets
+        self.idle_time = idle_time
+        self.results = {}
+
+    def measure(self, name: str, op, setup=None, iterations: int = None, radios: list = None,
+                warmup: bool = True) -> dict:
+        """Run op iterations times and account transactions and time spent in op only
+
+        :param setup: callable run before every op, not accounted
+        :param radios: list of BenchRadio which transactions are accounted, rx radio if not set
+        :param warmup: bool Run setup and op once before measurement, so register cache is filled
+        """
+        radios = radios or [self.rx]
+        iterations = iterations or self.iterations
+        if warmup:
+            if setup is not None:
+                setup()
+            op()
+        counts = dict.fromkeys(BenchRadio.KINDS, 0)
+        wall_time = 0.0
+        for _ in range(iterations):
+            if setup is not None:
+                setup()
+            before = [dict(radio.counts) for radio in radios]
+            start = monotonic()
+            op()
+            wall_time += monotonic() - start
+            for radio, snapshot in zip(radios, before):
+                for kind in counts:
+                    counts[kind] += radio.counts[kind] - snapshot[kind]
+        transactions = sum(counts.values())
+        result = {
+            "iterations": iterations,
+            "transactions": counts,
+            "transactions_per_op": transactions / iterations,
+            "wall_time": wall_time,
+            "time_per_op": wall_time / iterations,
+            "timed": False
+        }
+        self.results[name] = result
+        return result
+
+    def run(self, selected: list = None):
+        benchmarks = [
+            ("set_register_bit", self.bench_set_register_bit),
+            ("chip_init", self.bench_chip_init),
+            ("profile_bring_up", self.bench_profile_bring_up),
+            ("write_tx_payload", self.bench_write_tx_payload),
+            ("read_rx_payload", self.bench_read_rx_payload),
+            ("receive_idle", self.bench_receive_idle),
+            ("sustained", self.bench_sustained)
+        ]
+        for name, bench in benchmarks:
+            if selected and name not in selected:
+                continue
+            print("Running {}".format(name), file=sys.stderr)
+            bench()
+        return self.results
+
+    def bench_set_register_bit(self):
+        self.rx.bring_up(make_profile(), rx=False)
+        reg_controller = self.rx.controller.get_register_controller()
+        self.measure("set_register_bit",
+                     lambda: reg_controller.set_register_bit(Rfm75Registers.EN_RXADDR, 5),
+                     lambda: reg_controller.unset_register_bit(Rfm75Registers.EN_RXADDR, 5))
+
+    def bench_chip_init(self):
+        self.rx.bring_up(make_profile(), rx=False)
+        config_ctrl = self.rx.controller.config_ctrl
+        self.measure("chip_init", lambda: config_ctrl.chip_init("2Msps"))
+
+    def bench_profile_bring_up(self):
+        profile = make_profile()
+
+        def setup():
+            self.rx.controller.config_ctrl.apply(SCRAMBLED_PROFILE)
+
+        def bring_up():
+            controller = self.rx.reopen()
+            if not controller.is_connected():
+                raise RuntimeError("Radio {} is not connected".format(self.rx.name))
+            self.rx.bring_up(profile, rx=True)
+
+        self.measure("profile_bring_up", bring_up, setup)
+
+    def bench_write_tx_payload(self):
+        self.rx.bring_up(make_profile(auto_ack=False), rx=False)
+        controller = self.rx.controller
+        payload = bytearray(PAYLOAD_SIZE)
+        self.measure("write_tx_payload", lambda: controller.write_tx_payload(payload), controller.flush_tx)
+
+    def bench_read_rx_payload(self):
+        if self.tx is None:
+            logging.warning("read_rx_payload skipped, TX radio is not set")
+            return
+        self.rx.bring_up(make_profile(), rx=True)
+        self.tx.bring_up(make_profile(), rx=False)
+        payload = bytearray(range(PAYLOAD_SIZE))
+
+        def setup():
+            result = self.tx.controller.send(payload)
+            if result.outcome != Rfm75TxOutcome.SENT:
+                raise RuntimeError("Packet not delivered: {}".format(result))
+
+        def read():
+            if self.rx.controller.read_rx_payload(PAYLOAD_SIZE) != payload:
+                raise RuntimeError("Wrong payload received")
+
+        self.measure("read_rx_payload", read, setup)
+
+    def bench_receive_idle(self):
+        self.rx.bring_up(make_profile(), rx=True)
+        controller = self.rx.controller
+        cpu_start = process_time()
+        result = self.measure("receive_idle", lambda: controller.wait_rx_data(self.idle_time),
+                              iterations=1, warmup=False)
+        cpu_time = process_time() - cpu_start
+        result["timed"] = True
+        result["transactions_per_second"] = result["transactions_per_op"] / result["wall_time"]
+        result["cpu_load"] = cpu_time / result["wall_time"]
+
+    def bench_sustained(self):
+        """Stream packets with Rfm75TxStream while RX radio is drained by Rfm75Receiver thread.
+        Fails when any packet is not sent or not received, so broken link does not report throughput"""
+        if self.tx is None:
+            logging.warning("sustained skipped, TX radio is not set")
+            return
+        payloads = [bytearray([index & 0xFF] * PAYLOAD_SIZE) for index in range(self.packets)]
+        for data_rate in DATA_RATES:
+            name = "sustained_{}".format(data_rate)
+            self.rx.bring_up(make_profile(data_rate), rx=True)
+            self.tx.bring_up(make_profile(data_rate), rx=False)
+            self.tx.controller.get_register_controller().write_register(Rfm75Registers.SETUP_RETR,
+                                                                        [SUSTAINED_SETUP_RETR])
+            receiver = Rfm75Receiver(self.rx.controller, maxsize=self.packets, name=name)
+            stream = Rfm75TxStream(self.tx.controller)
+            stats = {"sent": 0, "received": 0}
+
+            def transfer():
+                for _, outcome in stream.send(payloads):
+                    if outcome == Rfm75TxOutcome.SENT:
+                        stats["sent"] += 1
+
+            receiver.start()
+            try:
+                result = self.measure(name, transfer, iterations=1, radios=[self.rx, self.tx], warmup=False)
+                # Acknowledged packets are in RX FIFO already, receiver needs a poll or two to pick them up
+                deadline = monotonic() + Rfm75Receiver.WAIT_TIMEOUT
+                while receiver.received < stats["sent"] and monotonic() < deadline:
+                    sleep(self.rx.controller.poll_interval)
+            finally:
+                receiver.stop()
+            stats["received"] = receiver.received
+            if stats["sent"] < self.packets or stats["received"] < stats["sent"]:
+                raise RuntimeError("{}: {} of {} packets sent, {} received".format(
+                    name, stats["sent"], self.packets, stats["received"]))
+            result.update(stats)
+            result["iterations"] = self.packets
+            result["transactions_per_op"] /= self.packets
+            result["time_per_op"] /= self.packets
+            result["timed"] = True
+            result["packets_per_second"] = stats["received"] / result["wall_time"]
+            result["payload_bytes_per_second"] = stats["received"] * PAYLOAD_SIZE / result["wall_time"]
+
+
+def open_emulated(latency: float, irq_pin: int, ce_pin: int) -> tuple:
+    medium = Rfm75AirMedium()
+    radios = []
+    for name in ("rx", "tx"):
+        emulator = medium.add(Rfm75Emulator(latency=latency, name=name))
+        radios.append(BenchRadio(name, emulator.get_port(), emulator.get_gpio(ce_pin, irq_pin),
+                                 ce_pin, irq_pin))
+    return tuple(radios)
+
+
+def open_hardware(urls: list, frequency: float, irq_pin: int, ce_pin: int) -> tuple:
+    from pyftdi.spi import SpiController
+
+    radios = []
+    for name, url in zip(("rx", "tx"), urls):
+        spi_controller = SpiController(cs_count=1)
+        spi_controller.configure(url)
+        radios.append(BenchRadio(name, spi_controller.get_port(cs=0, freq=frequency),
+                                 spi_controller.get_gpio(), ce_pin, irq_pin))
+    if len(radios) == 1:
+        radios.append(None)
+    return tuple(radios)
+
+
+def compare(results: dict, baseline: dict, tolerance: float, timed_tolerance: float) -> list:
+    """Compare transactions per operation with baseline
+
+    :return:  list of regression descriptions, empty if there is no regression
+    """
+    regressions = []
+    for name, base in baseline["results"].items():
+        current = results.get(name)
+        if current is None:
+            continue
+        allowed = base["transactions_per_op"] * (1 + (timed_tolerance if base["timed"] else tolerance))
+        if current["transactions_per_op"] > allowed + 1e-9:
+            regressions.append("{}: {:.2f} transactions per op, baseline {:.2f}".format(
+                name, current["transactions_per_op"], base["transactions_per_op"]))
+    return regressions
+
+
+def print_results(results: dict, baseline: dict = None):
+    base_results = baseline["results"] if baseline else {}
+    print("{:<26} {:>10} {:>12} {:>12}".format("benchmark", "iterations", "usb/op", "ms/op"), end="")
+    print(" {:>12}".format("base usb/op") if baseline else "")
+    for name, result in results.items():
+        print("{:<26} {:>10} {:>12.2f} {:>12.3f}".format(
+            name, result["iterations"], result["transactions_per_op"], result["time_per_op"] * 1000), end="")
+        base = base_results.get(name)
+        if baseline:
+            print(" {:>12}".format("{:.2f}".format(base["transactions_per_op"]) if base else "-"))
+        else:
+            print()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="pyRFTdi benchmarks")
+    parser.add_argument("--url", action="append", default=[],
+                        help="FTDI URL of radio, give twice for RX and TX radios. Emulator is used if not set")
+    parser.add_argument("--latency", type=float, default=0.000125,
+                        help="Emulated delay of every USB transaction in seconds")
+    parser.add_argument("--frequency", type=float, default=8E6, help="SPI clock frequency in Hz")
+    parser.add_argument("--ce-pin", type=int, default=7, help="GPIO pin used as CE")
+    parser.add_argument("--irq-pin", type=int, default=None, help="GPIO pin wired to IRQ, polling over SPI if not set")
+    parser.add_argument("--iterations", type=int, default=50, help="Iterations of single operation benchmarks")
+    parser.add_argument("--packets", type=int, default=200, help="Packets sent by sustained benchmark per data rate")
+    parser.add_argument("--idle-time", type=float, default=1.0, help="Duration of receive idle benchmark in seconds")
+    parser.add_argument("--only", action="append", default=[], help="Run only given benchmark, could be repeated")
+    parser.add_argument("--output", help="Write results into JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file, exit with code 1 on transaction count regression")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="Allowed relative growth of transactions per op")
+    parser.add_argument("--timed-tolerance", type=float, default=0.2,
+                        help="Allowed relative growth of transactions per op for timed benchmarks")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    if len(args.url) > 2:
+        parser.error("At most two URLs are supported")
+    if args.url:
+        target = "hardware"
+        rx, tx = open_hardware(args.url, args.frequency, args.irq_pin, args.ce_pin)
+    else:
+        target = "emulator"
+        rx, tx = open_emulated(args.latency, args.irq_pin, args.ce_pin)
+
+    bench = Bench(rx, tx, args.iterations, args.packets, args.idle_time)
+    results = bench.run(args.only)
+    report = {
+        "meta": {
+            "target": target,
+            "urls": args.url,
+            "latency": args.latency if target == "emulator" else None,
+            "frequency": args.frequency,
+            "irq_pin": args.irq_pin,
+            "python": platform.python_version()
+        },
+        "results": results
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+    print_results(results, baseline)
+    if args.output:
+        with open(args.output, "w") as output_file:
+            json.dump(report, output_file, indent=2)
+
+    if baseline is not None:
+        for key in ("target", "latency", "irq_pin"):
+            if baseline["meta"][key] != report["meta"][key]:
+                logging.warning("Baseline {} {} differs from {}".format(key, baseline["meta"][key], report["meta"][key]))
+        regressions = compare(results, baseline, args.tolerance, args.timed_tolerance)
+        for regression in regressions:
+            print("REGRESSION {}".format(regression))
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import logging
+from time import monotonic
+from pyRFTdi.Rfm75AirMedium import Rfm75AirMedium
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen, Rfm75TxOutcome
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+
+logging.basicConfig(level=logging.INFO)
+logging.info("Emulated RX/TX pair started")
+
+##################################################################################################
+# Config
+##################################################################################################
+
+USB_LATENCY = 0.000125                  # Emulated delay of every USB transaction in seconds
+LOSS = 0.1                              # Probability of packet or ACK lost on air
+SEED = 1                                # Random seed for reproducible runs
+PACKETS = 200                           # Number of packets to send
+
+CE_PIN = 7                              # Emulated FTDI pin used as CE for RFM device
+PIPE_NO = 0                             # Pipe number used to receive data
+ADDR_WIDTH = Rfm75AddressWidth.ADDR_5   # How many bytes used for address
+TX_ADDR = b'\x11\x22\x33\x22\x11'       # Addres where to transmit
+PIPE_ADDR = b'\x11\x22\x33\x22\x11'     # Addres for selected pipe, same on both sides for AutoAcknowledge
+RF_CHANNEL = 0x04                       # Operating Rf Channel
+DATA_RATE = '2Msps'                     # Transfer speed
+PAYLOAD_SIZE = 0x05                     # Static payload size up to 32b
+
+##################################################################################################
+# End of config
+##################################################################################################
+
+
+def open_radio(emulator: Rfm75Emulator) -> FtdiRfm75Controller:
+    port = emulator.get_port()
+    reg_controller = Rfm75RegisterController(port, use_cache=True)
+    controller = FtdiRfm75Controller(port, emulator.get_gpio(CE_PIN), CE_PIN, reg_controller)
+    with reg_controller.batch():
+        controller.config_ctrl.reset_config()
+        controller.config_ctrl.set_rf_channel(RF_CHANNEL)
+        controller.config_ctrl.chip_init(DATA_RATE)
+        controller.activate_features()
+        controller.config_ctrl.disable_dynamic_payload()
+        controller.config_ctrl.disable_dynamic_acknowledge()
+        controller.config_ctrl.set_address_width(ADDR_WIDTH)
+        controller.config_ctrl.set_tx_address(TX_ADDR)
+        controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+        controller.config_ctrl.pipe_ctrl.enable_pipe(PIPE_NO)
+        controller.config_ctrl.pipe_ctrl.set_rx_pipe_address(PIPE_NO, PIPE_ADDR)
+        controller.config_ctrl.pipe_ctrl.set_rx_pipe_payload_width(PIPE_NO, PAYLOAD_SIZE)
+        controller.config_ctrl.pipe_ctrl.enable_pipe_auto_acknowledge(PIPE_NO)
+        controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
+        controller.config_ctrl.crc_ctrl.enable_crc()
+    return controller
+
+
+medium = Rfm75AirMedium(loss=LOSS, seed=SEED)
+tx_controller = open_radio(medium.add(Rfm75Emulator(latency=USB_LATENCY, name="tx")))
+rx_controller = open_radio(medium.add(Rfm75Emulator(latency=USB_LATENCY, name="rx")))
+
+tx_controller.set_mode_tx()
+tx_controller.power_up()
+rx_controller.set_mode_rx()
+rx_controller.power_up()
+rx_controller.ce_on()
+
+logging.info("----  Radios initialisation done ------")
+
+sent = 0
+received = []
+latencies = []
+start = monotonic()
+for counter in range(PACKETS):
+    payload = bytearray([0xCA, 0xFE, 0xB0, 0xBA, counter & 0xFF])
+    send_start = monotonic()
+    result = tx_controller.send(payload)
+    if result.outcome == Rfm75TxOutcome.SENT:
+        sent += 1
+        latencies.append(monotonic() - send_start)
+    else:
+        logging.warning("Packet {} not acknowledged, {} retransmits".format(counter, result.retransmits))
+    received.extend(rx_controller.drain_rx_fifo())
+elapsed = monotonic() - start
+
+logging.info("Sent {} of {} packets in {:.3f}s, {:.1f} packets/s".format(sent, PACKETS, elapsed, sent / elapsed))
+if latencies:
+    latencies.sort()
+    logging.info("Send latency: median {:.3f}ms, max {:.3f}ms".format(
+        latencies[len(latencies) // 2] * 1000, latencies[-1] * 1000))
+logging.info("Received {} packets".format(len(received)))
+logging.info("Air: {} on air, {} delivered, {} lost, {} ACKs lost".format(
+    medium.sent, medium.delivered, medium.lost, medium.acks_lost))
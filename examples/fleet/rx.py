@@ -0,0 +1,60 @@
+import logging
+
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen
+from pyRFTdi.Rfm75Fleet import Rfm75Fleet
+from pyRFTdi.Rfm75Profile import Rfm75PipeProfile, Rfm75Profile
+
+##################################################################################################
+# Config
+##################################################################################################
+
+FTDI_URLS = None                        # List of ftdi urls, all connected FTDI adapters are used if None
+CE_PIN = 7                              # FTDI pin used to as CE for RFM device
+
+PIPE_NO = 0                             # Pipe number used to receive data
+ADDR_WIDTH = Rfm75AddressWidth.ADDR_5   # How many bytes used for address
+PIPE_ADDR = b'\x11\x22\x33\x22\x11'     # Addres for selected pipe
+RF_CHANNEL = 0x04                       # Operating Rf Channel
+DATA_RATE = '250ksps'                   # Transfer speed
+PAYLOAD_SIZE = 0x05                     # Static payload size up to 32b
+
+##################################################################################################
+# End of config
+##################################################################################################
+
+logging.basicConfig(level=logging.INFO)
+logging.info("Fleet RX part started")
+
+profile = Rfm75Profile(
+    channel=RF_CHANNEL,
+    data_rate=DATA_RATE,
+    address_width=ADDR_WIDTH,
+    pipes={PIPE_NO: Rfm75PipeProfile(PIPE_ADDR, PAYLOAD_SIZE)},
+    crc_enabled=True,
+    crc_len=Rfm75CRCLen.CRC_2,
+    lna_gain_high=False,
+    dynamic_payload=False,
+    dynamic_ack=False)
+
+fleet = Rfm75Fleet(FTDI_URLS, ce_pin=CE_PIN)
+logging.info("Radios: {}".format(fleet.open()))
+
+fleet.run(lambda controller: controller.activate_features())
+fleet.apply_profile(profile)
+fleet.run(lambda controller: controller.set_mode_rx())
+fleet.run(lambda controller: controller.power_up())
+fleet.run(lambda controller: controller.ce_on())
+
+logging.info("----  Starting main receive loop ------")
+fleet.start_receive()
+try:
+    for packet in fleet:
+        logging.info("{} pipe {}: {}".format(packet.source, packet.pipe, packet.payload.hex()))
+except KeyboardInterrupt:
+    logging.info("----  Keyboard interrupt, shutdown ------")
+    fleet.stop_receive()
+    for health in fleet.health().values():
+        logging.info(health)
+    fleet.run(lambda controller: controller.ce_off())
+    fleet.run(lambda controller: controller.power_down())
+    fleet.close()
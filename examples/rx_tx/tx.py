@@ -35,7 +35,7 @@ ftdi_ctrl.configure(FTDI_URL)  # Assuming there is only one FT232H.
 ftdi_port = ftdi_ctrl.get_port(cs=0, freq=8E6)
 ftdi_gpio = ftdi_ctrl.get_gpio()
 
-reg_controller = Rfm75RegisterController(ftdi_port)
+reg_controller = Rfm75RegisterController(ftdi_port, use_cache=True)
 
 logging.info("----  Starting module initialisation ------")
 
@@ -46,32 +46,34 @@ if(not controller.is_connected()):                                      # Make s
     exit(1)
 
 logging.info("Chip id: {}".format(controller.get_chip_id().hex()))      # Print connected chip ID
-controller.config_ctrl.reset_config()                                   # Reset config to be sure we start from 0 walues
-controller.config_ctrl.set_rf_channel(RF_CHANNEL)                       # Configure RF channel, be sure it is the same for transmitter and receiver
-controller.config_ctrl.chip_init(DATA_RATE)                             # This is RFM magic init, most iportant to set data rate the same om transmitter and on receiver
-# Activate features and disable any dynamic features
-controller.activate_features()
-controller.config_ctrl.disable_dynamic_payload()
-controller.config_ctrl.disable_dynamic_acknowledge()
-
-# Configure adress width up to 5 bytes
-controller.config_ctrl.set_address_width(ADDR_WIDTH)
-# Target receiver address
-controller.config_ctrl.set_tx_address(TX_ADDR)
-# Do not pollute air with our RF waves 
-controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_LOW)
-
-# In this mode tranceiver does not care whether packet was received by target device
-controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
-
-# Enable hardware CRC calculation and set it to 2 bytes
-controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
-controller.config_ctrl.crc_ctrl.enable_crc()
-
-# Switch to TX mode
-controller.set_mode_tx()
-# Turn on RFM power. Note this is standby II mode. Data is not transmitted until CE enabled and data present in TX buffer. 
-controller.power_up()
+# Configuration is queued and sent to the module as single batch
+with reg_controller.batch():
+    controller.config_ctrl.reset_config()                                   # Reset config to be sure we start from 0 walues
+    controller.config_ctrl.set_rf_channel(RF_CHANNEL)                       # Configure RF channel, be sure it is the same for transmitter and receiver
+    controller.config_ctrl.chip_init(DATA_RATE)                             # This is RFM magic init, most iportant to set data rate the same om transmitter and on receiver
+    # Activate features and disable any dynamic features
+    controller.activate_features()
+    controller.config_ctrl.disable_dynamic_payload()
+    controller.config_ctrl.disable_dynamic_acknowledge()
+
+    # Configure adress width up to 5 bytes
+    controller.config_ctrl.set_address_width(ADDR_WIDTH)
+    # Target receiver address
+    controller.config_ctrl.set_tx_address(TX_ADDR)
+    # Do not pollute air with our RF waves 
+    controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_LOW)
+
+    # In this mode tranceiver does not care whether packet was received by target device
+    controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+
+    # Enable hardware CRC calculation and set it to 2 bytes
+    controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
+    controller.config_ctrl.crc_ctrl.enable_crc()
+
+    # Switch to TX mode
+    controller.set_mode_tx()
+    # Turn on RFM power. Note this is standby II mode. Data is not transmitted until CE enabled and data present in TX buffer. 
+    controller.power_up()
 
 logging.info("----  Module initialisation done ------")
 logging.info("----  Starting main receive loop ------")
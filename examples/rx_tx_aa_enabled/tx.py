@@ -2,7 +2,7 @@ import logging
 from time import sleep
 from pyftdi.spi import SpiController
 from struct import *
-from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen, Rfm75TxPower
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen, Rfm75TxOutcome, Rfm75TxPower
 from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
 from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
 from pyRFTdi.Rfm75Registers import Rfm75Register, Rfm75Registers
@@ -37,7 +37,7 @@ ftdi_ctrl.configure(FTDI_URL)  # Assuming there is only one FT232H.
 ftdi_port = ftdi_ctrl.get_port(cs=0, freq=8E6)
 ftdi_gpio = ftdi_ctrl.get_gpio()
 
-reg_controller = Rfm75RegisterController(ftdi_port)
+reg_controller = Rfm75RegisterController(ftdi_port, use_cache=True)
 
 logging.info("----  Starting module initialisation ------")
 
@@ -48,30 +48,32 @@ if(not controller.is_connected()):
     exit(1)
 
 logging.info("Chip id: {}".format(controller.get_chip_id().hex()))
-controller.config_ctrl.reset_config()
-controller.config_ctrl.set_rf_channel(RF_CHANNEL)
-controller.config_ctrl.chip_init(DATA_RATE)
-controller.activate_features()
-controller.config_ctrl.disable_dynamic_payload()
-controller.config_ctrl.disable_dynamic_acknowledge()
+# Configuration is queued and sent to the module as single batch
+with reg_controller.batch():
+    controller.config_ctrl.reset_config()
+    controller.config_ctrl.set_rf_channel(RF_CHANNEL)
+    controller.config_ctrl.chip_init(DATA_RATE)
+    controller.activate_features()
+    controller.config_ctrl.disable_dynamic_payload()
+    controller.config_ctrl.disable_dynamic_acknowledge()
 
-controller.config_ctrl.set_address_width(ADDR_WIDTH)
-controller.config_ctrl.set_tx_address(TX_ADDR)
+    controller.config_ctrl.set_address_width(ADDR_WIDTH)
+    controller.config_ctrl.set_tx_address(TX_ADDR)
 
-controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_LOW)
+    controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_LOW)
 
-controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+    controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
 
-controller.config_ctrl.pipe_ctrl.enable_pipe(PIPE_NO)
-controller.config_ctrl.pipe_ctrl.set_rx_pipe_address(PIPE_NO, PIPE_ADDR)
-controller.config_ctrl.pipe_ctrl.set_rx_pipe_payload_width(PIPE_NO, PAYLOAD_SIZE)
-controller.config_ctrl.pipe_ctrl.enable_pipe_auto_acknowledge(PIPE_NO)
+    controller.config_ctrl.pipe_ctrl.enable_pipe(PIPE_NO)
+    controller.config_ctrl.pipe_ctrl.set_rx_pipe_address(PIPE_NO, PIPE_ADDR)
+    controller.config_ctrl.pipe_ctrl.set_rx_pipe_payload_width(PIPE_NO, PAYLOAD_SIZE)
+    controller.config_ctrl.pipe_ctrl.enable_pipe_auto_acknowledge(PIPE_NO)
 
-controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
-controller.config_ctrl.crc_ctrl.enable_crc()
-controller.set_mode_tx()
+    controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
+    controller.config_ctrl.crc_ctrl.enable_crc()
+    controller.set_mode_tx()
 
-controller.power_up()
+    controller.power_up()
 
 logging.info("----  Module initialisation done ------")
 logging.info("----  Starting main receive loop ------")
@@ -83,16 +85,13 @@ try:
             Rfm75Registers.STATUS)[0]))
         payload = bytearray([0xCA, 0xFE, 0xB0, 0xBA, counter])
         logging.info("Data transmitted {}".format(payload.hex()))
-        controller.write_tx_payload(payload, True)
+        result = controller.send(payload)
         counter += 1
         if(counter >= 0xFF):
             counter = 0
-        logging.debug("Status register after send: b{:b}".format(reg_controller.read_register(
-            Rfm75Registers.STATUS)[0]))
-        if(controller.is_max_rt()):
-            logging.warning("MAX_RT detected, cleaning")
-            controller.unset_max_rt()
-        controller.unset_data_sent()
+        logging.debug("Send result: {}".format(result))
+        if(result.outcome != Rfm75TxOutcome.SENT):
+            logging.warning("Packet not acknowledged, {} retransmits".format(result.retransmits))
 
         sleep(1)
 
@@ -37,7 +37,7 @@ ftdi_ctrl.configure(FTDI_URL)  # Assuming there is only one FT232H.
 ftdi_port = ftdi_ctrl.get_port(cs=0, freq=8E6)
 ftdi_gpio = ftdi_ctrl.get_gpio()
 
-reg_controller = Rfm75RegisterController(ftdi_port)
+reg_controller = Rfm75RegisterController(ftdi_port, use_cache=True)
 
 logging.info("----  Starting module initialisation ------")
 
@@ -48,33 +48,35 @@ if(not controller.is_connected()):
     exit(1)
 
 logging.info("Chip id: {}".format(controller.get_chip_id().hex()))
-controller.config_ctrl.reset_config()
-controller.config_ctrl.set_rf_channel(RF_CHANNEL)
-controller.config_ctrl.chip_init(DATA_RATE)
-controller.config_ctrl.enable_dynamic_payload()
-controller.config_ctrl.enable_payload_ack()
+# Configuration is queued and sent to the module as single batch
+with reg_controller.batch():
+    controller.config_ctrl.reset_config()
+    controller.config_ctrl.set_rf_channel(RF_CHANNEL)
+    controller.config_ctrl.chip_init(DATA_RATE)
+    controller.config_ctrl.enable_dynamic_payload()
+    controller.config_ctrl.enable_payload_ack()
 
-controller.activate_features()
+    controller.activate_features()
 
-controller.config_ctrl.set_address_width(ADDR_WIDTH)
-controller.config_ctrl.set_tx_address(TX_ADDR)
+    controller.config_ctrl.set_address_width(ADDR_WIDTH)
+    controller.config_ctrl.set_tx_address(TX_ADDR)
 
-controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_HIGH)
+    controller.config_ctrl.set_tx_power(Rfm75TxPower.TX_PWR_HIGH)
 
-controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+    controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
 
-controller.config_ctrl.pipe_ctrl.enable_pipe(PIPE_NO)
-#controller.config_ctrl.enable_dynamic_acknowledge()
-controller.config_ctrl.pipe_ctrl.enable_pipe_dynamic_payload(0) # Always pipe 0 on TX side
-controller.config_ctrl.pipe_ctrl.set_rx_pipe_address(PIPE_NO, PIPE_ADDR)
-#controller.config_ctrl.pipe_ctrl.set_rx_pipe_payload_width(PIPE_NO, PAYLOAD_SIZE)
-controller.config_ctrl.pipe_ctrl.enable_pipe_auto_acknowledge(PIPE_NO)
+    controller.config_ctrl.pipe_ctrl.enable_pipe(PIPE_NO)
+    #controller.config_ctrl.enable_dynamic_acknowledge()
+    controller.config_ctrl.pipe_ctrl.enable_pipe_dynamic_payload(0) # Always pipe 0 on TX side
+    controller.config_ctrl.pipe_ctrl.set_rx_pipe_address(PIPE_NO, PIPE_ADDR)
+    #controller.config_ctrl.pipe_ctrl.set_rx_pipe_payload_width(PIPE_NO, PAYLOAD_SIZE)
+    controller.config_ctrl.pipe_ctrl.enable_pipe_auto_acknowledge(PIPE_NO)
 
-controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
-controller.config_ctrl.crc_ctrl.enable_crc()
-controller.set_mode_tx()
+    controller.config_ctrl.crc_ctrl.set_crc_len(Rfm75CRCLen.CRC_2)
+    controller.config_ctrl.crc_ctrl.enable_crc()
+    controller.set_mode_tx()
 
-controller.power_up()
+    controller.power_up()
 
 logging.info("----  Module initialisation done ------")
 logging.info("----  Starting main receive loop ------")
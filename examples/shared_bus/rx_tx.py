@@ -0,0 +1,87 @@
+import logging
+from time import sleep
+
+from pyftdi.spi import SpiController
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen
+from pyRFTdi.Rfm75Profile import Rfm75PipeProfile, Rfm75Profile
+from pyRFTdi.Rfm75Receiver import Rfm75Receiver
+from pyRFTdi.Rfm75SpiBus import Rfm75SpiBus
+
+##################################################################################################
+# Config
+##################################################################################################
+
+FTDI_URL = 'ftdi://ftdi:232h:555551/1'  # Url for ftdi chip, both RFM devices connected to it
+RX_CS = 0                               # Chip select of RFM device used to receive data
+RX_CE_PIN = 6                           # FTDI pin used to as CE for RX RFM device
+TX_CS = 1                               # Chip select of RFM device used to send data
+TX_CE_PIN = 7                           # FTDI pin used to as CE for TX RFM device
+
+PIPE_NO = 0                             # Pipe number used to receive data
+ADDR_WIDTH = Rfm75AddressWidth.ADDR_5   # How many bytes used for address
+PIPE_ADDR = b'\x11\x22\x33\x22\x11'     # Addres for selected pipe
+RF_CHANNEL = 0x04                       # Operating Rf Channel
+DATA_RATE = '250ksps'                   # Transfer speed
+PAYLOAD_SIZE = 0x05                     # Static payload size up to 32b
+
+##################################################################################################
+# End of config
+##################################################################################################
+
+logging.basicConfig(level=logging.INFO)
+logging.info("Shared bus RX/TX started")
+
+ftdi_ctrl = SpiController(cs_count=2)  # spi
+ftdi_ctrl.configure(FTDI_URL)
+bus = Rfm75SpiBus(ftdi_ctrl)
+
+rx_controller = bus.open_radio(cs=RX_CS, ce_pin=RX_CE_PIN, name="rx")
+tx_controller = bus.open_radio(cs=TX_CS, ce_pin=TX_CE_PIN, name="tx")
+
+for controller in (rx_controller, tx_controller):
+    if(not controller.is_connected()):
+        logging.error("RFMx controller not found, exit")
+        exit(1)
+
+profile = Rfm75Profile(
+    channel=RF_CHANNEL,
+    data_rate=DATA_RATE,
+    address_width=ADDR_WIDTH,
+    tx_address=PIPE_ADDR,
+    pipes={PIPE_NO: Rfm75PipeProfile(PIPE_ADDR, PAYLOAD_SIZE)},
+    crc_enabled=True,
+    crc_len=Rfm75CRCLen.CRC_2,
+    dynamic_payload=False,
+    dynamic_ack=False)
+
+for controller in (rx_controller, tx_controller):
+    controller.activate_features()
+    controller.config_ctrl.apply(profile)
+
+rx_controller.set_mode_rx()
+rx_controller.power_up()
+rx_controller.ce_on()
+
+tx_controller.set_mode_tx()
+tx_controller.power_up()
+
+receiver = Rfm75Receiver(rx_controller, name="rx")
+receiver.start()
+
+logging.info("----  Module initialisation done ------")
+try:
+    counter = 0
+    while(1):
+        tx_controller.write_tx_payload(counter.to_bytes(PAYLOAD_SIZE, 'little'))
+        counter += 1
+        while not receiver.queue.empty():
+            packet = receiver.get()
+            logging.info("Data received: {}".format(packet.payload.hex()))
+        sleep(0.1)
+except KeyboardInterrupt:
+    logging.info("----  Keyboard interrupt, shutdown ------")
+    receiver.stop()
+    logging.info("Bus transactions: {}".format(bus.transactions))
+    rx_controller.ce_off()
+    rx_controller.power_down()
+    tx_controller.power_down()
@@ -0,0 +1,22 @@
+import argparse
+from pyRFTdi.Rfm75TraceDecoder import Rfm75TraceDecoder
+from pyRFTdi.Rfm75TraceReplayer import Rfm75TraceReplayer
+
+##################################################################################################
+# Print SPI/GPIO trace recorded by Rfm75TraceRecorder with register names and time profile
+##################################################################################################
+
+parser = argparse.ArgumentParser(description="Decode RFM75 trace")
+parser.add_argument("trace", help="Trace file recorded by Rfm75TraceRecorder")
+parser.add_argument("--ce-pin", type=int, default=7, help="FTDI pin used as CE")
+parser.add_argument("--irq-pin", type=int, default=None, help="FTDI pin wired to IRQ")
+parser.add_argument("--profile-only", action="store_true", help="Print only time profile")
+args = parser.parse_args()
+
+decoder = Rfm75TraceDecoder(ce_pin=args.ce_pin, irq_pin=args.irq_pin)
+for entry in Rfm75TraceReplayer(args.trace):
+    line = decoder.format(entry)
+    if not args.profile_only:
+        print(line)
+print()
+print(decoder.format_profile())
@@ -0,0 +1,138 @@
+import random
+from threading import RLock
+
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+
+
+class Rfm75AirMedium:
+    """Virtual air which links several Rfm75Emulator instances.
+
+    Packet put on air by one emulator is delivered to every other emulator which is listening
+    (powered up in RX mode with CE HIGH) on the same RF_CH, data rate, address width and CRC setting
+    and has enabled pipe with address equal to TX_ADDR of transmitter. Payload width must match static
+    RX_PW_Px of the pipe, or both sides must have dynamic payload enabled.
+
+    Auto acknowledge is done by receiver pipe with EN_AA bit set. Transmitter gets ACK only when its
+    RX_ADDR_P0 equals TX_ADDR, as on real chip; ACK payload written with W_ACK_PAYLOAD is delivered with it.
+    Retransmits (ARD/ARC) and airtime are timed by transmitting emulator, retransmitted packet
+    already received is acknowledged again but not put into RX FIFO twice.
+    Packets and ACKs are lost with configured probability. Collisions are not modelled.
+
+    All linked emulators share single lock, so radios could be driven from different threads.
+
+    Usage::
+
+        medium = Rfm75AirMedium(loss=0.05, seed=1)
+        tx_emulator = medium.add(Rfm75Emulator(name="tx"))
+        rx_emulator = medium.add(Rfm75Emulator(name="rx"))
+    """
+
+    def __init__(self, loss: float = 0.0, ack_loss: float = None, seed: int = None):
+        """Constructor
+
+        :param loss: float Probability in range 0-1 that packet is lost on air
+        :param ack_loss: float Probability that ACK is lost, same as loss if not set
+        :param seed: int Random generator seed for reproducible runs
+        """
+        self.loss = loss
+        self.ack_loss = loss if ack_loss is None else ack_loss
+        self.lock = RLock()
+        self._random = random.Random(seed)
+        self.__emulators = []
+        self.__delivered = {}  # (id(transmitter), id(receiver)) -> last delivered packet serial
+        self.sent = 0  # Packets put on air, including retransmits
+        self.delivered = 0  # Packets put into RX FIFO of receiver
+        self.lost = 0  # Packets lost on air
+        self.acks_lost = 0  # ACKs lost on air
+        self.overflows = 0  # Packets not stored because RX FIFO of receiver was full
+
+    @property
+    def emulators(self) -> list:
+        return list(self.__emulators)
+
+    def add(self, emulator: Rfm75Emulator) -> Rfm75Emulator:
+        """Link emulator to this medium
+
+        :param emulator: Rfm75Emulator, its on_transmit hook and lock are replaced by medium ones
+
+        :return:  emulator
+        """
+        with self.lock:
+            emulator.lock = self.lock
+            emulator.on_transmit = self.__transmit
+            emulator.medium = self
+            self.__emulators.append(emulator)
+        return emulator
+
+    def advance(self):
+        """Process due events of all linked emulators"""
+        with self.lock:
+            for emulator in self.__emulators:
+                emulator.advance()
+
+    def __transmit(self, transmitter: Rfm75Emulator, payload: bytes, no_ack: bool) -> bool:
+        self.sent += 1
+        if self._random.random() < self.loss:
+            self.lost += 1
+            return False
+        acked = False
+        for receiver in self.__emulators:
+            if receiver is transmitter:
+                continue
+            pipe = self.__match(transmitter, receiver, payload)
+            if pipe is None:
+                continue
+            key = (id(transmitter), id(receiver))
+            duplicate = transmitter.arc_cnt > 0 and self.__delivered.get(key) == transmitter.packet_serial
+            if not duplicate:
+                if not receiver.receive(payload, pipe):
+                    self.overflows += 1
+                    continue
+                self.__delivered[key] = transmitter.packet_serial
+                self.delivered += 1
+            if no_ack or not receiver.register(0x01)[0] & (1 << pipe) or acked:
+                continue
+            width = transmitter.address_width()
+            if transmitter.register(0x0A)[:width] != transmitter.register(0x10)[:width]:
+                continue
+            if self._random.random() < self.ack_loss:
+                self.acks_lost += 1
+                continue
+            acked = True
+            ack_payload = receiver.take_ack_payload(pipe)
+            if ack_payload is not None:
+                transmitter.receive(ack_payload, 0)
+        return acked
+
+    def __match(self, transmitter: Rfm75Emulator, receiver: Rfm75Emulator, payload: bytes) -> int:
+        """Find receiver pipe packet is delivered to
+
+        :return:  pipe number, None if receiver does not get packet
+        """
+        if not receiver.is_listening():
+            return None
+        for addr in (0x05, 0x03):  # RF_CH, SETUP_AW
+            if transmitter.register(addr) != receiver.register(addr):
+                return None
+        if transmitter.data_rate() != receiver.data_rate():
+            return None
+        if transmitter.register(0x00)[0] & 0x0C != receiver.register(0x00)[0] & 0x0C:  # EN_CRC, CRCO
+            return None
+        width = transmitter.address_width()
+        address = transmitter.register(0x10)[:width]
+        enabled = receiver.register(0x02)[0]
+        dynamic_tx = transmitter.features_active and transmitter.register(0x1D)[0] & 0x04
+        dynamic_rx = receiver.features_active and receiver.register(0x1D)[0] & 0x04
+        for pipe in range(6):
+            if not enabled & (1 << pipe):
+                continue
+            if pipe < 2:
+                pipe_address = receiver.register(0x0A + pipe)[:width]
+            else:
+                pipe_address = receiver.register(0x0A + pipe)[:1] + receiver.register(0x0B)[1:width]
+            if pipe_address != address:
+                continue
+            if dynamic_rx and receiver.register(0x1C)[0] & (1 << pipe):
+                return pipe if dynamic_tx else None
+            return pipe if not dynamic_tx and receiver.register(0x11 + pipe)[0] == len(payload) else None
+        return None
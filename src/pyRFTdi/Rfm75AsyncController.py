@@ -0,0 +1,115 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Enums import Rfm75TxOutcome
+from pyRFTdi.Rfm75TxResult import Rfm75TxResult
+
+
+class AsyncRfm75Controller:
+    """asyncio front-end for FtdiRfm75Controller.
+
+    All SPI and GPIO work is done on dedicated executor thread, so event loop is never blocked
+    and one process could serve several radios alongside network I/O.
+
+    Usage::
+
+        radio = AsyncRfm75Controller(controller)
+        await radio.send(b'hello')
+        async for packet in radio.packets():
+            print(packet.payload.hex())
+    """
+
+    def __init__(self, controller: FtdiRfm75Controller, poll_interval: float = 0.001,
+                 executor: ThreadPoolExecutor = None):
+        """Constructor
+
+        :param controller: FtdiRfm75Controller to be driven. Must not be used from other threads meanwhile
+        :param poll_interval: float Time in seconds between RX FIFO/STATUS checks
+        :param executor: ThreadPoolExecutor with single worker used for SPI work, created if not set
+        """
+        self._controller = controller
+        self.poll_interval = poll_interval
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="Rfm75")
+
+    @property
+    def controller(self) -> FtdiRfm75Controller:
+        return self._controller
+
+    async def run(self, func, *args, **kwargs):
+        """Run blocking function on executor thread
+
+        :param func: callable to run, usually method of controller or its config controllers
+
+        :return:  value returned by func
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+
+    async def packets(self, source: str = None):
+        """Asynchronous generator of received packets. Module must be configured for RX, powered up and with CE set
+
+        :param source: str Packet source name stored in every packet
+
+        :return:  Rfm75Packet for every received packet
+        """
+        while True:
+            packets = await self.run(self.__receive, source)
+            if not packets:
+                await asyncio.sleep(self.poll_interval)
+                continue
+            for packet in packets:
+                yield packet
+
+    async def send(self, payload: bytearray, timeout: float = 0.1) -> Rfm75TxResult:
+        """Send payload and wait until module reports TX_DS, see FtdiRfm75Controller.send().
+        Module must be configured for TX and powered up
+
+        :param payload: data to be sent. It's length must not exceed PAYLOAD size
+        :param timeout: float Max time in seconds to wait for TX_DS or MAX_RT
+
+        :return:  Rfm75TxResult, raise RuntimeError on MAX_RT and asyncio.TimeoutError on timeout
+        """
+        result = await self.run(self._controller.send, payload, True, timeout)
+        if result.outcome == Rfm75TxOutcome.MAX_RT:
+            raise RuntimeError("Maximum number of retransmits reached")
+        if result.outcome == Rfm75TxOutcome.TIMEOUT:
+            raise asyncio.TimeoutError("No TX_DS or MAX_RT in {}s".format(timeout))
+        return result
+
+    async def apply_profile(self, profile) -> list:
+        """Write Rfm75Profile into module, see Rfm75ConfigController.apply()"""
+        return await self.run(self._controller.config_ctrl.apply, profile)
+
+    async def is_connected(self) -> bool:
+        return await self.run(self._controller.is_connected)
+
+    async def power_up(self):
+        return await self.run(self._controller.power_up)
+
+    async def power_down(self):
+        return await self.run(self._controller.power_down)
+
+    async def set_mode_rx(self):
+        return await self.run(self._controller.set_mode_rx)
+
+    async def set_mode_tx(self):
+        return await self.run(self._controller.set_mode_tx)
+
+    async def ce_on(self) -> int:
+        return await self.run(self._controller.ce_on)
+
+    async def ce_off(self) -> int:
+        return await self.run(self._controller.ce_off)
+
+    def close(self):
+        """Stop executor thread"""
+        self._executor.shutdown(wait=True)
+
+    def __receive(self, source: str) -> list:
+        # Single check without sleeping on executor thread, waiting is done by event loop
+        if not self._controller.wait_rx_data(0):
+            return []
+        return self._controller.drain_rx_fifo(source)
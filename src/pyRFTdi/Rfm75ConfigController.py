@@ -98,6 +98,19 @@ class Rfm75ConfigController:
             self._register_controller.set_register_bit(
                 Rfm75Registers.RF_SETUP, 5)
 
+        # Set of magic values provided by datasheet, sent as single batch
+        with self._register_controller.batch():
+            for register, values in self.bank1_init_values(speed):
+                self._register_controller.write_register(register, values)
+
+    @staticmethod
+    def bank1_init_values(speed: str) -> list:
+        """Bank 1 magic values written by chip_init()
+
+        :param speed: One of: "1Msps","2Msps","250ksps"
+
+        :return: list of (Rfm75Register, values) pairs in write order
+        """
         B1_REG_04_VALUES = {
             "1Msps": [0xF9, 0x96, 0x82, 0x1B],
             "2Msps": [0xF9, 0x96, 0x82, 0xDB],
@@ -108,25 +121,51 @@ class Rfm75ConfigController:
             "2Msps": [0x24, 0x06, 0x0F, 0xB6],
             "250ksps": [0x24, 0x06, 0x0F, 0xB6]
         }
-        # Set of magic values provided by datasheet
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_00, [0x40, 0x4B, 0x01, 0xE2])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_01, [0xC0, 0x4B, 0x00, 0x00])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_02, [0xD0, 0xFC, 0x8C, 0x02])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_03, [0x99, 0x00, 0x39, 0x41])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_04, B1_REG_04_VALUES[speed])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_05, B1_REG_05_VALUES[speed])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_0C, [0x00, 0x12, 0x73, 0x00])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_0D, [0x36, 0xB4, 0x80, 0x00])
-        self._register_controller.write_register(
-            Rfm75Registers.B1_REG_0E, [0x41, 0x20, 0x08, 0x04, 0x81, 0x20, 0xCF, 0xF7, 0xFE, 0xFF, 0xFF])
+        return [
+            (Rfm75Registers.B1_REG_00, [0x40, 0x4B, 0x01, 0xE2]),
+            (Rfm75Registers.B1_REG_01, [0xC0, 0x4B, 0x00, 0x00]),
+            (Rfm75Registers.B1_REG_02, [0xD0, 0xFC, 0x8C, 0x02]),
+            (Rfm75Registers.B1_REG_03, [0x99, 0x00, 0x39, 0x41]),
+            (Rfm75Registers.B1_REG_04, B1_REG_04_VALUES[speed]),
+            (Rfm75Registers.B1_REG_05, B1_REG_05_VALUES[speed]),
+            (Rfm75Registers.B1_REG_0C, [0x00, 0x12, 0x73, 0x00]),
+            (Rfm75Registers.B1_REG_0D, [0x36, 0xB4, 0x80, 0x00]),
+            (Rfm75Registers.B1_REG_0E, [0x41, 0x20, 0x08, 0x04, 0x81, 0x20, 0xCF, 0xF7, 0xFE, 0xFF, 0xFF])
+        ]
+
+    def apply(self, profile) -> list:
+        """Write Rfm75Profile into module.
+        Target register image is compared with current module state and only registers
+        which differ are written, in a single batch. With register cache enabled
+        re-applying unchanged profile does not cost any SPI transaction, except of FEATURE and DYNPD
+        read back when profile changed them: features are activated if module ignored them.
+
+        :param profile: Rfm75Profile to apply
+
+        :return: list of written Rfm75Register
+        """
+        changes = []
+        for register, mask, value in profile.register_image():
+            current = self._register_controller.read_register(register)
+            if mask is None:
+                target = bytearray(value)
+                if current[:len(target)] == target:
+                    continue
+            else:
+                current_val = int.from_bytes(current, 'little')
+                target_val = (current_val & ~mask) | (value & mask)
+                if target_val == current_val:
+                    continue
+                target = target_val.to_bytes(register.size, 'little')
+            changes.append((register, target))
+
+        with self._register_controller.batch():
+            for register, target in changes:
+                self._register_controller.write_register(register, target)
+        # Written FEATURE/DYNPD are cached even if module ignored them with features not activated
+        self._register_controller.verify_features(changes)
+        logging.info("Profile applied, {} registers written".format(len(changes)))
+        return [register for register, _ in changes]
 
     def enable_dynamic_acknowledge(self) -> bytearray:
         return self._register_controller.set_register_bit(Rfm75Registers.FEATURE, 0)
@@ -1,32 +1,65 @@
 import logging
-from time import sleep
+from time import monotonic, sleep
 
 from pyftdi.spi import SpiController, SpiGpioPort
 from pyRFTdi.Rfm75ConfigController import Rfm75ConfigController
 
-from pyRFTdi.Rfm75Enums import Rfm75Command
+from pyRFTdi.Rfm75Enums import Rfm75Command, Rfm75TxOutcome
+from pyRFTdi.Rfm75MpsseSequencer import Rfm75MpsseSequencer
+from pyRFTdi.Rfm75Packet import Rfm75Packet
+from pyRFTdi.Rfm75PacketSlab import Rfm75PacketSlab
 from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
 from pyRFTdi.Rfm75Registers import Rfm75Registers
+from pyRFTdi.Rfm75Status import Rfm75Status
+from pyRFTdi.Rfm75TimedLock import Rfm75TimedLock
+from pyRFTdi.Rfm75TxResult import Rfm75TxResult
 
 
 class FtdiRfm75Controller:
-    """This class intended to control RFM75(73) modules with SPI and GPIO ports"""
-
-    def __init__(self, port: SpiController, gpio: SpiGpioPort, ce_pin: int, register_controller: Rfm75RegisterController):
+    """This class intended to control RFM75(73) modules with SPI and GPIO ports.
+
+    Controller could be shared by threads, e.g. receive thread and TX thread. SPI sequences are
+    serialised by register controller lock, CE pin changes use own lock and do not wait for SPI
+    of other threads. Only batch owned by calling thread is flushed before CE change.
+    """
+
+    RECEIVE_LOOP_WAIT = 0.1  # Max time in seconds receive loop waits for data before checking stop request
+    RX_FIFO_DEPTH = 3
+    MAX_PAYLOAD_LEN = 32
+    TX_CE_PULSE = 0.002  # CE HIGH time in seconds used by write_tx_payload, datasheet allows up to 4ms in TX mode
+    CE_PULSE_MIN = 0.00001  # Min CE HIGH time in seconds to start transmission
+
+    def __init__(self, port: SpiController, gpio: SpiGpioPort, ce_pin: int, register_controller: Rfm75RegisterController,
+                 irq_pin: int = None, poll_interval: float = 0.001, verify_gpio: bool = False,
+                 sequencer: Rfm75MpsseSequencer = None):
         """Constructor
 
         :param port: SpiController Instance of SpiController interface which used to communicate with module
         :param gpio: SpiGpioPort Instance of SpiGpioPort interface which used to control CE pin state
         :param ce_pin: int GPIO pin number for CE pin
         :param register_controller: Rfm75RegisterController register controller used for low-level communication with module registers
+        :param irq_pin: int GPIO pin number wired to module IRQ pin. When set, receive loop waits on this pin instead of polling R_RX_PL_WID
+        :param poll_interval: float Time in seconds between IRQ pin (or R_RX_PL_WID when IRQ pin not set) checks
+        :param verify_gpio: bool Read GPIO back after every CE change and raise RuntimeError on mismatch. Debug option, costs extra USB round-trip
+        :param sequencer: Rfm75MpsseSequencer When set, TX payload write and CE pulse are done with single MPSSE command sequence timed by adapter
         """
         self.__port = port
         self.__gpio = gpio
         self.__ce_pin = ce_pin
+        self.__irq_pin = irq_pin
+        self.poll_interval = poll_interval
+        self.__verify_gpio = verify_gpio
+        self.__sequencer = sequencer
+        self._register_controller = register_controller
         self.__gpio.set_direction(1 << ce_pin, 1 << ce_pin)
-        self.ce_off()
+        if irq_pin is not None:
+            self.__gpio.set_direction(1 << irq_pin, 0)
+        self.__gpio_out = None  # Software copy of GPIO output pins state, None until read from adapter
+        self.__gpio_lock = Rfm75TimedLock("gpio")
+        self.metrics = None  # Rfm75Metrics set by Rfm75Metrics.attach(), GPIO accesses are not counted if not set
+        self.resync_gpio()
+        self.__write_gpio(self.__gpio_out & ~(1 << self.__ce_pin), True)
 
-        self._register_controller = register_controller
         self.config_ctrl = Rfm75ConfigController(self._register_controller)
 
         # Event handlers
@@ -37,29 +70,66 @@ class FtdiRfm75Controller:
 
     def activate_features(self):
         logging.debug("Features activated")
-        self.__port.write(Rfm75Command.ACTIVATE_FEATURES, True, True)
+        self._register_controller.send_command(Rfm75Command.ACTIVATE_FEATURES)
 
     def ce_on(self) -> int:
-        """Set pin CE to HIGH value
+        """Set pin CE to HIGH value. Frames queued by register batch of calling thread are sent before,
+        register controller lock is not taken otherwise.
+        GPIO output state is tracked in software, so pin change costs single GPIO write
+        and no write at all when CE is already HIGH.
 
-        :return:  GPIO state after operation
+        :return:  GPIO output pins state after operation
 
         """
-        pins = self.__gpio.read()
-        pins |= 1 << self.__ce_pin
-        self.__gpio.write(pins)
-        return self.__gpio.read()
+        if self._register_controller.in_batch:
+            self._register_controller.flush()
+        with self.__gpio_lock:
+            return self.__write_gpio(self.__gpio_out | (1 << self.__ce_pin))
 
     def ce_off(self) -> int:
-        """Set pin CE to LOW value
+        """Set pin CE to LOW value. Frames queued by register batch of calling thread are sent before.
+        See ce_on()
+
+        :return:  GPIO output pins state after operation
+
+        """
+        if self._register_controller.in_batch:
+            self._register_controller.flush()
+        with self.__gpio_lock:
+            return self.__write_gpio(self.__gpio_out & ~(1 << self.__ce_pin))
 
-        :return:  GPIO state after operation
+    def resync_gpio(self) -> int:
+        """Read GPIO output pins state from adapter and use it as software copy.
+        Must be called when output pins were changed outside of this controller.
 
+        :return:  GPIO output pins state
         """
-        pins = self.__gpio.read()
-        pins &= ~((1 << self.__ce_pin))
-        self.__gpio.write(pins)
-        return self.__gpio.read()
+        with self.__gpio_lock:
+            self.__gpio_out = self.__gpio.read(with_output=True) & self.__gpio.direction
+            if self.metrics is not None:
+                self.metrics.count("gpio_reads")
+            return self.__gpio_out
+
+    def lock_stats(self) -> dict:
+        """Get usage statistics of controller locks
+
+        :return:  dict with lock name as key and Rfm75LockStats as value
+        """
+        return {"register": self._register_controller.lock_stats(), "gpio": self.__gpio_lock.stats()}
+
+    def __write_gpio(self, pins: int, force: bool = False) -> int:
+        if pins != self.__gpio_out or force:
+            self.__gpio.write(pins)
+            self.__gpio_out = pins
+            if self.metrics is not None:
+                self.metrics.count("gpio_writes")
+        if self.__verify_gpio:
+            actual = self.__gpio.read(with_output=True) & self.__gpio.direction
+            if self.metrics is not None:
+                self.metrics.count("gpio_reads")
+            if actual != pins:
+                raise RuntimeError("GPIO output state 0x{:04X} does not match expected 0x{:04X}".format(actual, pins))
+        return pins
 
     def get_chip_id(self) -> bytearray:
         return self._register_controller.read_register(Rfm75Registers.B1_CHIP_ID)
@@ -70,8 +140,9 @@ class FtdiRfm75Controller:
         :return:  number of bytes available for the top R_RX_PAYLOAD in the RX FIFO
 
         """
-        result = int(self.__port.exchange([Rfm75Command.R_RX_PL_WID], 1)[0])
-        logging.debug("R_RX_PAYLOAD length is {}".format(result))
+        result = int(self._register_controller.send_command([Rfm75Command.R_RX_PL_WID], 1)[0])
+        if logging.getLogger().isEnabledFor(logging.DEBUG):
+            logging.debug("R_RX_PAYLOAD length is {}".format(result))
         return result
 
     def read_rx_payload(self, len: int) -> bytearray:
@@ -80,7 +151,17 @@ class FtdiRfm75Controller:
         :return:  R_RX_PAYLOAD as bytearray
 
         """
-        return self.__port.exchange([Rfm75Command.R_RX_PAYLOAD], len, True, True)
+        return self._register_controller.send_command([Rfm75Command.R_RX_PAYLOAD], len)
+
+    def read_rx_payload_into(self, buffer) -> int:
+        """Retrieve payload from RX buffer straight into caller supplied buffer.
+
+        :param buffer: writable buffer (bytearray, memoryview), number of bytes read is defined by its length
+
+        :return:  number of bytes read
+
+        """
+        return self._register_controller.send_command_into([Rfm75Command.R_RX_PAYLOAD], buffer)
 
     def is_connected(self):
         bank_0_status = self._register_controller.read_register(
@@ -113,10 +194,11 @@ class FtdiRfm75Controller:
         return self._register_controller.unset_register_bit(Rfm75Registers.CONFIG, 1)
 
     def set_mode_tx(self):
-        self._register_controller.unset_register_bit(
-            Rfm75Registers.CONFIG, 0x00)
-        self._register_controller.write_register(Rfm75Registers.STATUS, [0x70])
-        self.__port.exchange([Rfm75Command.FLUSH_TX], True, True)
+        with self._register_controller.batch():
+            self._register_controller.unset_register_bit(
+                Rfm75Registers.CONFIG, 0x00)
+            self._register_controller.write_register(Rfm75Registers.STATUS, [0x70])
+            self._register_controller.send_command([Rfm75Command.FLUSH_TX])
 
     def set_mode_rx(self):
         self._register_controller.set_register_bit(Rfm75Registers.CONFIG, 0x00)
@@ -124,62 +206,253 @@ class FtdiRfm75Controller:
     def write_tx_payload(self, payload: bytearray, ack_send: bool = False):
         """Send data to the air.
 
+        Command byte and whole payload are written in a single SPI transaction.
+        EN_AA is read through register controller, so with register cache enabled
+        ACK/NO_ACK decision does not cost any SPI transaction.
+        With sequencer set, payload write and CE pulse of TX_CE_PULSE are sent in single USB transfer
+        and timed by adapter, otherwise CE HIGH time is measured by host.
+
+        :param payload: data to be sent. It's length must not exceed PAYLOAD size
+        :param ack_send: has no meaning when AA disabled, but if any AA enabled, this parameter allow to control which command actual used for data transfer
+
+        """
+        self.__write_and_pulse(payload, ack_send, self.TX_CE_PULSE)
+
+    def send(self, payload: bytearray, ack_send: bool = True, timeout: float = 0.1) -> Rfm75TxResult:
+        """Send data to the air and wait until module reports TX_DS or MAX_RT.
+        Module must be configured for TX mode and powered up.
+
+        CE is pulsed only to start transmission, module completes packet (including auto retransmits)
+        by itself, so send latency is defined by radio instead of fixed delay. Completion is detected
+        on IRQ pin when configured, otherwise STATUS is polled, checks are done every poll_interval seconds.
+        Packet is flushed from TX FIFO on MAX_RT or timeout, STATUS flags are cleared.
+
         :param payload: data to be sent. It's length must not exceed PAYLOAD size
         :param ack_send: has no meaning when AA disabled, but if any AA enabled, this parameter allow to control which command actual used for data transfer
+        :param timeout: float Max time in seconds to wait for TX_DS or MAX_RT
 
+        :return:  Rfm75TxResult
         """
+        start = monotonic()
+        deadline = start + timeout
+        self.__write_and_pulse(payload, ack_send, None)
+        while True:
+            if self.__irq_pin is None or self.is_irq_active():
+                status = self._register_controller.read_status()
+                if status.tx_ds or status.max_rt:
+                    break
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                status = None
+                break
+            sleep(min(self.poll_interval, remaining))
+        elapsed = monotonic() - start
+
+        if status is not None and status.tx_ds:
+            outcome = Rfm75TxOutcome.SENT
+        else:
+            outcome = Rfm75TxOutcome.MAX_RT if status is not None else Rfm75TxOutcome.TIMEOUT
+            self.flush_tx()
+        retransmits = int(self._register_controller.read_register(Rfm75Registers.OBSERVE_TX)[0]) & 0x0F
+        self.clear_status_flags(0x30)
+        return Rfm75TxResult(outcome, retransmits, elapsed)
+
+    def write_tx_fifo(self, payload: bytearray, ack_send: bool = False):
+        """Write payload into TX FIFO without touching CE pin.
+
+        :param payload: data to be sent. It's length must not exceed PAYLOAD size
+        :param ack_send: has no meaning when AA disabled, but if any AA enabled, this parameter allow to control which command actual used for data transfer
+        """
+        self._register_controller.send_command(self.__tx_frame(payload, ack_send))
+
+    def __tx_frame(self, payload: bytearray, ack_send: bool) -> bytearray:
+        if(len(payload) > self.MAX_PAYLOAD_LEN):
+            raise RuntimeError("Payload length {} exceeds {} bytes".format(
+                len(payload), self.MAX_PAYLOAD_LEN))
         command = Rfm75Command.W_TX_PAYLOAD
         if self.config_ctrl.pipe_ctrl.is_auto_acknowledge_enabled() and not ack_send:
             command = Rfm75Command.W_TX_PAYLOAD_NO_ACK
+        frame = bytearray([command])
+        frame.extend(payload)
+        return frame
+
+    def __write_and_pulse(self, payload: bytearray, ack_send: bool, ce_high_time: float):
+        """Write payload into TX FIFO and pulse CE to start transmission.
+        ce_high_time None means shortest pulse: one GPIO write apart on host, CE_PULSE_MIN with sequencer"""
         self.ce_off()
-        self.__port.exchange([command], 0, True, False)
-        for pld_byte in payload:
-            self.__port.exchange([pld_byte], 0, False, False)
-        self.__port.exchange([], 0, False, True)
+        if self.__sequencer is not None:
+            frame = self.__tx_frame(payload, ack_send)
+            with self.__gpio_lock:
+                self.__sequencer.pulse(frame, self.__gpio_out, self.__ce_pin, ce_high_time or self.CE_PULSE_MIN)
+            if self.metrics is not None:
+                self.metrics.count_spi(len(frame), 0, False)
+            return
+        self.write_tx_fifo(payload, ack_send)
         self.ce_on()
-        # This delay is to guarantee that we do not stay in TX mode longer than allowed by datasheet
-        sleep(0.002)
+        if ce_high_time is not None:
+            # This delay is to guarantee that we do not stay in TX mode longer than allowed by datasheet
+            sleep(ce_high_time)
         self.ce_off()
 
-    def is_rx_data_ready(self) -> bool:
-        """Check if RX contains new data"""
-        return self._register_controller.read_register_bit(Rfm75Registers.STATUS, 6) > 0
+    def clear_status_flags(self, flags: int):
+        """Clear STATUS flags with single write and without readback
+
+        :param flags: int Mask of RX_DR(0x40), TX_DS(0x20), MAX_RT(0x10) flags to clear
+        """
+        with self._register_controller.locked():
+            self._register_controller.set_bank_number(Rfm75Registers.STATUS.bank)
+            self._register_controller.send_command(
+                [Rfm75Registers.STATUS.addr | Rfm75Command.WRITE, flags & 0x70])
+
+    def get_status(self, max_age: float = None) -> Rfm75Status:
+        """Get STATUS register value
+
+        :param max_age: float Maximum age in seconds of STATUS harvested from previous SPI transactions to be reused. Module is always read if not set
+
+        :return:  Rfm75Status
+        """
+        return self._register_controller.get_status(max_age)
+
+    def is_rx_data_ready(self, max_age: float = None) -> bool:
+        """Check if RX contains new data
+
+        :param max_age: float Maximum age in seconds of harvested STATUS to be reused
+        """
+        return self.get_status(max_age).rx_dr
 
     def unset_rx_data_ready(self) -> bytearray:
         """Reset RX"""
-        return self._register_controller.set_register_bit(
-            Rfm75Registers.STATUS, 6)
+        return self.__clear_status_flag(6)
 
-    def is_max_rt(self) -> bool:
-        """Check if maximum number of retransmittion reached"""
-        return self._register_controller.read_register_bit(Rfm75Registers.STATUS, 4) > 0
+    def is_max_rt(self, max_age: float = None) -> bool:
+        """Check if maximum number of retransmittion reached
+
+        :param max_age: float Maximum age in seconds of harvested STATUS to be reused
+        """
+        return self.get_status(max_age).max_rt
 
     def unset_max_rt(self) -> bytearray:
         """Reset MAX_RT event"""
-        return self._register_controller.set_register_bit(
-            Rfm75Registers.STATUS, 4)
+        return self.__clear_status_flag(4)
+
+    def is_data_sent(self, max_age: float = None):
+        """In AA mode return true when data succesfully sent and ACK received
 
-    def is_data_sent(self):
-        """In AA mode return true when data succesfully sent and ACK received"""
-        return self._register_controller.read_register_bit(Rfm75Registers.STATUS, 5) > 0
+        :param max_age: float Maximum age in seconds of harvested STATUS to be reused
+        """
+        return self.get_status(max_age).tx_ds
 
     def unset_data_sent(self):
         """Unset data sent bit"""
-        return self._register_controller.set_register_bit(
-            Rfm75Registers.STATUS, 5)
+        return self.__clear_status_flag(5)
+
+    def __clear_status_flag(self, bit_num: int) -> bytearray:
+        """STATUS flags are cleared by writing 1, so only requested flag is written
+        and other pending flags are kept"""
+        return self._register_controller.write_register(Rfm75Registers.STATUS, [1 << bit_num])
 
     def flush_rx(self):
-        self.__port.exchange([Rfm75Command.FLUSH_RX], True, True)
+        self._register_controller.send_command([Rfm75Command.FLUSH_RX])
+
+    def flush_tx(self):
+        self._register_controller.send_command([Rfm75Command.FLUSH_TX])
+
+    def read_fifo_status(self) -> int:
+        """Read FIFO_STATUS register
+
+        :return:  FIFO_STATUS value
+        """
+        return int(self._register_controller.read_register(Rfm75Registers.FIFO_STATUS)[0])
+
+    def drain_rx_fifo(self, source: str = None, slab: Rfm75PacketSlab = None) -> list:
+        """Read all packets pending in RX FIFO (up to its depth of three) in one burst.
+        RX FIFO emptiness is taken from STATUS harvested from R_RX_PL_WID transaction,
+        so no additional STATUS or FIFO_STATUS reads are required. RX_DR is cleared once per call.
+
+        :param source: str Packet source name stored in every packet
+        :param slab: Rfm75PacketSlab to read payloads into. Payloads are memoryview slots which must be released back to slab.
+                     Packet is read out of FIFO and dropped when slab has no free slot
+
+        :return:  list of Rfm75Packet
+        """
+        if self.__irq_pin is not None:
+            # RX_DR is cleared before FIFO read, so packet received meanwhile asserts IRQ again
+            self.unset_rx_data_ready()
+        packets = []
+        for _ in range(self.RX_FIFO_DEPTH):
+            # Payload length, harvested STATUS and payload must belong to the same FIFO entry
+            with self._register_controller.locked():
+                payload_len = self.read_rx_payload_len()
+                status = self._register_controller.last_status
+                if status.rx_empty or payload_len == 0:
+                    break
+                if payload_len > self.MAX_PAYLOAD_LEN:
+                    # Datasheet: R_RX_PL_WID above 32 means corrupted payload, RX FIFO must be flushed
+                    logging.warning("Wrong payload length {}, RX FIFO flushed".format(payload_len))
+                    self.flush_rx()
+                    break
+                if slab is None:
+                    payload = self.read_rx_payload(payload_len)
+                else:
+                    payload = slab.acquire(payload_len)
+                    if payload is None:
+                        self.read_rx_payload(payload_len)
+                        continue
+                    self.read_rx_payload_into(payload)
+                packets.append(Rfm75Packet(payload, status.rx_p_no, monotonic(), source))
+        if packets and self.__irq_pin is None:
+            self.unset_rx_data_ready()
+        return packets
+
+    @property
+    def irq_pin(self) -> int:
+        """GPIO pin number wired to module IRQ pin, None if not configured"""
+        return self.__irq_pin
+
+    def is_irq_active(self) -> bool:
+        """Check IRQ pin state. IRQ pin is active low and asserted while any of RX_DR/TX_DS/MAX_RT is set
+
+        :return:  True if IRQ is asserted
+        """
+        if self.__irq_pin is None:
+            raise RuntimeError("IRQ pin is not configured")
+        if self.metrics is not None:
+            self.metrics.count("gpio_reads")
+        return (self.__gpio.read() & (1 << self.__irq_pin)) == 0
+
+    def wait_rx_data(self, timeout: float = None) -> bool:
+        """Wait until module has data to be processed.
+        When IRQ pin is configured only GPIO is polled and SPI is not touched until module signals
+        RX_DR/TX_DS/MAX_RT, otherwise R_RX_PL_WID is polled. Checks are done every poll_interval seconds.
+
+        :param timeout: float Maximum wait time in seconds, wait forever if not set
+
+        :return:  True if IRQ asserted or data available in RX FIFO, False on timeout
+        """
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            if self.__irq_pin is not None:
+                if self.is_irq_active():
+                    return True
+            elif self.read_rx_payload_len() > 0:
+                return True
+            if deadline is not None and monotonic() >= deadline:
+                return False
+            sleep(self.poll_interval)
 
     def __loop_receive(self):
         while (self.__receive_loop_run):
-            payload_len = self.read_rx_payload_len()
-            if (payload_len > 0):
-                logging.debug("Data received: {}".format(
-                    self.read_rx_payload(payload_len).hex()))
+            if not self.wait_rx_data(self.RECEIVE_LOOP_WAIT):
+                continue
+            packets = self.drain_rx_fifo()
+            if not packets:
+                # IRQ asserted by TX_DS/MAX_RT, nothing to receive
+                sleep(self.poll_interval)
+            for packet in packets:
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    logging.debug("Data received: {}".format(packet.payload.hex()))
                 if self.on_data_received:
-                    self.on_data_received(
-                        payload_len, self.read_rx_payload(payload_len))
+                    self.on_data_received(len(packet.payload), packet.payload)
         self.__receive_loop_stopped = True
 
     def start_loop_receive(self):
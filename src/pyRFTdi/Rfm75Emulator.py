@@ -0,0 +1,494 @@
+import heapq
+import logging
+from collections import deque
+from itertools import count
+from threading import RLock
+from time import monotonic, sleep
+
+from pyRFTdi.Rfm75Enums import Rfm75Command
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+
+
+class Rfm75Emulator:
+    """Software model of RFM75 chip working at SPI byte level.
+
+    Emulator implements both register banks, ACTIVATE (bank switch and features), R_RX_PL_WID,
+    R_RX_PAYLOAD, W_TX_PAYLOAD, W_TX_PAYLOAD_NO_ACK (only with EN_DYN_ACK), W_ACK_PAYLOAD, FLUSH_TX/RX,
+    REUSE_TX_PL, 3-deep TX and RX FIFOs, STATUS flags clocked out on first byte of every transaction, CE and IRQ pins.
+    Transmission takes PLL settling plus on-air time for configured data rate; with auto acknowledge,
+    ARD/ARC retransmits are done until on_transmit reports acknowledge or MAX_RT is reached.
+
+    Chip is driven through Rfm75EmulatedSpiPort and Rfm75EmulatedGpio, which implement SpiPort and
+    SpiGpioPort methods used by this library, so emulator plugs into the same constructors as hardware.
+    Every port call counts as single USB transaction and could be delayed by latency model.
+
+    Usage::
+
+        emulator = Rfm75Emulator(latency=0.000125)
+        port = emulator.get_port()
+        gpio = emulator.get_gpio(ce_pin=7, irq_pin=6)
+        reg_controller = Rfm75RegisterController(port)
+        controller = FtdiRfm75Controller(port, gpio, 7, reg_controller, irq_pin=6)
+        emulator.receive(b'hello', pipe=1)
+    """
+
+    FIFO_DEPTH = 3
+    MAX_PAYLOAD_LEN = 32
+    PLL_SETTLING = 0.00013  # Time in seconds from CE/retransmit to start of packet on air
+    DATA_RATES = {0b000000: 1000000, 0b001000: 2000000, 0b100000: 250000, 0b101000: 2000000}  # RF_DR_LOW, RF_DR_HIGH bits
+
+    BANK0_DEFAULTS = {
+        0x00: [0x08], 0x01: [0x3F], 0x02: [0x03], 0x03: [0x03], 0x04: [0x03], 0x05: [0x02], 0x06: [0x3F],
+        0x08: [0x00], 0x09: [0x00],
+        0x0A: [0xE7, 0xE7, 0xE7, 0xE7, 0xE7], 0x0B: [0xC2, 0xC2, 0xC2, 0xC2, 0xC2],
+        0x0C: [0xC3], 0x0D: [0xC4], 0x0E: [0xC5], 0x0F: [0xC6],
+        0x10: [0xE7, 0xE7, 0xE7, 0xE7, 0xE7],
+        0x11: [0x00], 0x12: [0x00], 0x13: [0x00], 0x14: [0x00], 0x15: [0x00], 0x16: [0x00],
+        0x1C: [0x00], 0x1D: [0x00]
+    }
+    CHIP_ID = [0x63, 0x00, 0x00, 0x00]
+
+    def __init__(self, latency=0.0, clock=monotonic, on_transmit=None, name: str = None):
+        """Constructor
+
+        :param latency: float Delay in seconds added to every USB transaction,
+                        or callable(kind, nbytes) returning delay, where kind is one of
+                        "spi_exchange", "spi_write", "spi_read", "gpio_read", "gpio_write"
+        :param clock: callable returning time in seconds, used for transmission timing
+        :param on_transmit: callable(emulator, payload, no_ack) called for every packet put on air (including retransmits).
+                            Returns True if packet was acknowledged. Packets are never acknowledged if not set
+        :param name: str Emulator name used in logs
+        """
+        self.latency = latency
+        self.clock = clock
+        self.on_transmit = on_transmit
+        self.name = name or "rfm75"
+        self.lock = RLock()
+        self.transactions = {}  # kind -> number of USB transactions
+        self.tx_packets = 0  # Number of packets put on air, including retransmits
+        self.medium = None  # Rfm75AirMedium this emulator is linked to, set by Rfm75AirMedium.add()
+        self.__events = []  # heap of (due time, sequence, callback)
+        self.__sequence = count()
+        self.reset()
+
+    def reset(self):
+        """Power-on reset: registers to defaults, FIFOs empty, bank 0, features inactive"""
+        with self.lock:
+            self.__banks = ({addr: bytearray(value) for addr, value in self.BANK0_DEFAULTS.items()},
+                            {addr: bytearray(self.__bank1_size(addr)) for addr in range(0x0F) if addr != 0x07})
+            self.__banks[1][0x08] = bytearray(self.CHIP_ID)
+            self.__bank = 0
+            self.__features = False
+            self.__flags = 0  # RX_DR, TX_DS, MAX_RT bits of STATUS
+            self.__tx_fifo = deque()  # (payload, no_ack)
+            self.__rx_fifo = deque()  # (pipe, payload)
+            self.__ack_payloads = deque()  # (pipe, payload)
+            self.__reuse = False
+            self.__plos_cnt = 0
+            self.__arc_cnt = 0
+            self.__ce = False
+            self.__tx_busy = False
+            self.__packet_serial = 0
+            self.__frame = None
+            self.__events.clear()
+
+    @property
+    def ce(self) -> bool:
+        return self.__ce
+
+    @property
+    def bank(self) -> int:
+        return self.__bank
+
+    @property
+    def features_active(self) -> bool:
+        return self.__features
+
+    @property
+    def packet_serial(self) -> int:
+        """Serial number of packet being transmitted, same for all retransmits of the packet"""
+        return self.__packet_serial
+
+    @property
+    def arc_cnt(self) -> int:
+        """Number of retransmits done for packet being transmitted"""
+        return self.__arc_cnt
+
+    def get_port(self):
+        """Create SpiPort implementation connected to this emulator"""
+        return Rfm75EmulatedSpiPort(self)
+
+    def get_gpio(self, ce_pin: int, irq_pin: int = None):
+        """Create SpiGpioPort implementation with CE and IRQ pins connected to this emulator
+
+        :param ce_pin: int GPIO pin number wired to CE
+        :param irq_pin: int GPIO pin number wired to IRQ
+        """
+        return Rfm75EmulatedGpio(self, ce_pin, irq_pin)
+
+    def register(self, addr: int, bank: int = 0) -> bytes:
+        """Read register value without SPI transaction, e.g. for checks and air medium
+
+        :param addr: int Register address
+        :param bank: int Register bank
+
+        :return:  register value as bytes
+        """
+        with self.lock:
+            return bytes(self.__read_register(bank, addr))
+
+    def status(self) -> int:
+        """Current STATUS value"""
+        with self.lock:
+            return self.__status()
+
+    def irq(self) -> bool:
+        """True while IRQ is asserted, i.e. IRQ pin is LOW"""
+        with self.lock:
+            self.__tick()
+            return bool(self.__flags & ~self.__banks[0][0x00][0] & 0x70)
+
+    def receive(self, payload: bytes, pipe: int = 0) -> bool:
+        """Put packet into RX FIFO as if it was received from the air and set RX_DR
+
+        :param payload: bytes Packet payload
+        :param pipe: int RX pipe number packet was received on
+
+        :return:  False if RX FIFO is full and packet is lost
+        """
+        with self.lock:
+            if len(self.__rx_fifo) >= self.FIFO_DEPTH:
+                return False
+            self.__rx_fifo.append((pipe, bytes(payload[:self.MAX_PAYLOAD_LEN])))
+            self.__flags |= 0x40
+            return True
+
+    def take_ack_payload(self, pipe: int) -> bytes:
+        """Take payload written with W_ACK_PAYLOAD for given pipe, None if there is no one"""
+        with self.lock:
+            for entry in self.__ack_payloads:
+                if entry[0] == pipe:
+                    self.__ack_payloads.remove(entry)
+                    return entry[1]
+            return None
+
+    def is_listening(self) -> bool:
+        """True when chip is powered up in RX mode with CE HIGH"""
+        config = self.__banks[0][0x00][0]
+        return self.__ce and config & 0x03 == 0x03
+
+    def data_rate(self) -> int:
+        """Data rate in bits per second as configured in RF_SETUP"""
+        return self.DATA_RATES[self.__banks[0][0x06][0] & 0b101000]
+
+    def address_width(self) -> int:
+        """Address width in bytes as configured in SETUP_AW"""
+        return (self.__banks[0][0x03][0] & 0x03) + 2
+
+    def airtime(self, payload_len: int) -> float:
+        """On-air time in seconds of packet with given payload length: preamble, address,
+        9-bit packet control field, payload and CRC"""
+        config = self.__banks[0][0x00][0]
+        crc_len = (1 + ((config >> 2) & 1)) if config & 0x08 else 0
+        bits = 8 * (1 + self.address_width() + payload_len + crc_len) + 9
+        return bits / self.data_rate()
+
+    def schedule(self, delay: float, callback, now: float = None):
+        """Run callback(due_time) after delay seconds. Events are processed on every access to emulator"""
+        with self.lock:
+            due = (self.clock() if now is None else now) + delay
+            heapq.heappush(self.__events, (due, next(self.__sequence), callback))
+
+    def advance(self, now: float = None):
+        """Process all events due until now"""
+        with self.lock:
+            now = self.clock() if now is None else now
+            while self.__events and self.__events[0][0] <= now:
+                due, _, callback = heapq.heappop(self.__events)
+                callback(due)
+
+    def next_event(self) -> float:
+        """Due time of next pending event, None if there is no one"""
+        with self.lock:
+            return self.__events[0][0] if self.__events else None
+
+    def set_ce(self, level: bool):
+        """Change CE pin level"""
+        with self.lock:
+            self.__tick()
+            rising = level and not self.__ce
+            self.__ce = bool(level)
+            if rising:
+                self.__start_tx(self.clock())
+
+    def usb_transaction(self, kind: str, nbytes: int):
+        """Account single USB transaction and apply latency model"""
+        self.transactions[kind] = self.transactions.get(kind, 0) + 1
+        delay = self.latency(kind, nbytes) if callable(self.latency) else self.latency
+        if delay > 0:
+            sleep(delay)
+
+    # SPI interface, called by Rfm75EmulatedSpiPort
+
+    def select(self):
+        with self.lock:
+            self.__tick()
+            self.__frame = bytearray()
+            self.__miso = None
+
+    def shift(self, mosi: int) -> int:
+        """Shift single byte within active transaction
+
+        :return:  byte clocked out by chip
+        """
+        with self.lock:
+            if self.__frame is None:
+                raise RuntimeError("Chip is not selected")
+            self.__frame.append(mosi)
+            index = len(self.__frame) - 1
+            if index == 0:
+                status = self.__status()
+                self.__miso = self.__read_data(mosi)
+                return status
+            return self.__miso[index - 1] if index - 1 < len(self.__miso) else 0x00
+
+    def deselect(self):
+        with self.lock:
+            frame = self.__frame
+            self.__frame = None
+            if frame:
+                self.__execute(frame)
+
+    # Implementation
+
+    def __tick(self):
+        """Process due events of this emulator, or of all emulators sharing air medium"""
+        if self.medium is not None:
+            self.medium.advance()
+        else:
+            self.advance()
+
+    def __cancel(self, *callbacks):
+        """Drop pending events with given callbacks"""
+        self.__events[:] = [event for event in self.__events if event[2] not in callbacks]
+        heapq.heapify(self.__events)
+
+    def __bank1_size(self, addr: int) -> int:
+        return 11 if addr == 0x0E else 4
+
+    def __status(self) -> int:
+        rx_p_no = self.__rx_fifo[0][0] if self.__rx_fifo else 0b111
+        tx_full = int(len(self.__tx_fifo) + len(self.__ack_payloads) >= self.FIFO_DEPTH)
+        return (self.__bank << 7) | self.__flags | (rx_p_no << 1) | tx_full
+
+    def __fifo_status(self) -> int:
+        tx_count = len(self.__tx_fifo) + len(self.__ack_payloads)
+        return ((int(self.__reuse) << 6) | (int(tx_count >= self.FIFO_DEPTH) << 5) | (int(tx_count == 0) << 4) |
+                (int(len(self.__rx_fifo) >= self.FIFO_DEPTH) << 1) | int(not self.__rx_fifo))
+
+    def __read_register(self, bank: int, addr: int) -> bytearray:
+        if addr == Rfm75Registers.STATUS.addr:
+            return bytearray([self.__status()])
+        if bank == 0:
+            if addr == Rfm75Registers.OBSERVE_TX.addr:
+                return bytearray([(self.__plos_cnt << 4) | self.__arc_cnt])
+            if addr == Rfm75Registers.FIFO_STATUS.addr:
+                return bytearray([self.__fifo_status()])
+        return self.__banks[bank].get(addr, bytearray(1))
+
+    def __read_data(self, command: int) -> bytes:
+        """Data clocked out after command byte"""
+        if command < Rfm75Command.WRITE:
+            return bytes(self.__read_register(self.__bank, command & 0x1F))
+        if command == Rfm75Command.R_RX_PAYLOAD:
+            return self.__rx_fifo[0][1] if self.__rx_fifo else b''
+        if command == Rfm75Command.R_RX_PL_WID:
+            if not self.__features:
+                return b'\x00'
+            return bytes([len(self.__rx_fifo[0][1]) if self.__rx_fifo else 0])
+        return b''
+
+    def __execute(self, frame: bytearray):
+        command = frame[0]
+        data = bytes(frame[1:])
+        if Rfm75Command.WRITE <= command < 0x40:
+            if data:
+                self.__write_register(command & 0x1F, data)
+        elif command == Rfm75Command.R_RX_PAYLOAD:
+            if data and self.__rx_fifo:
+                self.__rx_fifo.popleft()
+        elif command == 0x50:
+            if data[:1] == b'\x53':
+                self.__bank ^= 1
+            elif data[:1] == b'\x73':
+                self.__features = not self.__features
+        elif command in (Rfm75Command.W_TX_PAYLOAD, Rfm75Command.W_TX_PAYLOAD_NO_ACK):
+            if command == Rfm75Command.W_TX_PAYLOAD_NO_ACK and not self.__features:
+                logging.debug("{}: W_TX_PAYLOAD_NO_ACK ignored, features are not active".format(self.name))
+                return
+            if command == Rfm75Command.W_TX_PAYLOAD_NO_ACK and not self.__banks[0][0x1D][0] & 0x01:
+                logging.debug("{}: W_TX_PAYLOAD_NO_ACK ignored, EN_DYN_ACK is not set".format(self.name))
+                return
+            if data and len(self.__tx_fifo) + len(self.__ack_payloads) < self.FIFO_DEPTH:
+                self.__tx_fifo.append((data[:self.MAX_PAYLOAD_LEN], command == Rfm75Command.W_TX_PAYLOAD_NO_ACK))
+                self.__reuse = False
+                self.__start_tx(self.clock())
+        elif command & 0xF8 == 0xA8:
+            if self.__features and data and len(self.__tx_fifo) + len(self.__ack_payloads) < self.FIFO_DEPTH:
+                self.__ack_payloads.append((command & 0x07, data[:self.MAX_PAYLOAD_LEN]))
+        elif command == Rfm75Command.FLUSH_TX:
+            self.__tx_fifo.clear()
+            self.__ack_payloads.clear()
+            self.__reuse = False
+            # Packet in flight is abandoned, chip is ready for next one
+            self.__cancel(self.__on_air_done, self.__tx_done)
+            self.__tx_busy = False
+        elif command == Rfm75Command.FLUSH_RX:
+            self.__rx_fifo.clear()
+        elif command == 0xE3:
+            self.__reuse = True
+
+    def __write_register(self, addr: int, data: bytes):
+        bank = self.__bank
+        if addr == Rfm75Registers.STATUS.addr:
+            if bank == 0:
+                self.__flags &= ~(data[0] & 0x70)
+                self.__start_tx(self.clock())
+            return
+        if bank == 0:
+            if addr in (Rfm75Registers.OBSERVE_TX.addr, Rfm75Registers.CD.addr, Rfm75Registers.FIFO_STATUS.addr):
+                return
+            if addr in (Rfm75Registers.DYNPD.addr, Rfm75Registers.FEATURE.addr) and not self.__features:
+                logging.debug("{}: write to 0x{:02X} ignored, features are not active".format(self.name, addr))
+                return
+            if addr == Rfm75Registers.RF_CH.addr:
+                self.__plos_cnt = 0
+        elif addr == Rfm75Registers.B1_CHIP_ID.addr:
+            return
+        register = self.__banks[bank].get(addr)
+        if register is None:
+            return
+        register[:len(data)] = data[:len(register)]
+        if bank == 0 and addr == Rfm75Registers.CONFIG.addr:
+            self.__start_tx(self.clock())
+
+    def __start_tx(self, now: float):
+        config = self.__banks[0][0x00][0]
+        if (self.__tx_busy or not self.__ce or config & 0x03 != 0x02 or not self.__tx_fifo or
+                self.__flags & 0x10):
+            return
+        self.__tx_busy = True
+        self.__arc_cnt = 0
+        self.__packet_serial += 1
+        payload, no_ack = self.__tx_fifo[0]
+        self.schedule(self.PLL_SETTLING + self.airtime(len(payload)), self.__on_air_done, now)
+
+    def __on_air_done(self, now: float):
+        if not self.__tx_fifo:
+            self.__tx_busy = False
+            return
+        payload, no_ack = self.__tx_fifo[0]
+        self.tx_packets += 1
+        acked = bool(self.on_transmit(self, payload, no_ack)) if self.on_transmit is not None else False
+        setup_retr = self.__banks[0][0x04][0]
+        auto_ack = not no_ack and self.__banks[0][0x01][0] & 0x01
+        if not auto_ack:
+            self.__tx_done(now)
+        elif acked:
+            # ACK packet without payload after RX/TX turnaround
+            self.schedule(self.PLL_SETTLING + self.airtime(0), self.__tx_done, now)
+        elif self.__arc_cnt < setup_retr & 0x0F:
+            self.__arc_cnt += 1
+            ard = 0.00025 * ((setup_retr >> 4) + 1)
+            self.schedule(ard + self.PLL_SETTLING + self.airtime(len(payload)), self.__on_air_done, now)
+        else:
+            self.__plos_cnt = min(self.__plos_cnt + 1, 0x0F)
+            self.__flags |= 0x10
+            self.__tx_busy = False
+
+    def __tx_done(self, now: float):
+        if self.__tx_fifo and not self.__reuse:
+            self.__tx_fifo.popleft()
+        self.__flags |= 0x20
+        self.__tx_busy = False
+        self.__start_tx(now)
+
+
+class Rfm75EmulatedSpiPort:
+    """SpiPort implementation connected to Rfm75Emulator"""
+
+    def __init__(self, emulator: Rfm75Emulator):
+        self._emulator = emulator
+
+    def exchange(self, out=b'', readlen: int = 0, start: bool = True, stop: bool = True,
+                 duplex: bool = False, droptail: int = 0) -> bytes:
+        emulator = self._emulator
+        emulator.usb_transaction("spi_exchange", len(out) + (0 if duplex else readlen))
+        with emulator.lock:
+            if start:
+                emulator.select()
+            received = bytearray(emulator.shift(byte) for byte in out)
+            if not duplex:
+                received = bytearray(emulator.shift(0x00) for _ in range(readlen))
+            if stop:
+                emulator.deselect()
+            return bytes(received)
+
+    def write(self, out, start: bool = True, stop: bool = True, droptail: int = 0):
+        emulator = self._emulator
+        emulator.usb_transaction("spi_write", len(out))
+        with emulator.lock:
+            if start:
+                emulator.select()
+            for byte in out:
+                emulator.shift(byte)
+            if stop:
+                emulator.deselect()
+
+    def read(self, readlen: int = 0, start: bool = True, stop: bool = True, droptail: int = 0) -> bytes:
+        emulator = self._emulator
+        emulator.usb_transaction("spi_read", readlen)
+        with emulator.lock:
+            if start:
+                emulator.select()
+            received = bytes(emulator.shift(0x00) for _ in range(readlen))
+            if stop:
+                emulator.deselect()
+            return received
+
+
+class Rfm75EmulatedGpio:
+    """SpiGpioPort implementation with CE and IRQ pins connected to Rfm75Emulator"""
+
+    def __init__(self, emulator: Rfm75Emulator, ce_pin: int, irq_pin: int = None):
+        self._emulator = emulator
+        self._ce_pin = ce_pin
+        self._irq_pin = irq_pin
+        self.__direction = 0
+        self.__output = 0
+
+    @property
+    def direction(self) -> int:
+        return self.__direction
+
+    def set_direction(self, pins: int, direction: int):
+        self.__direction = (self.__direction & ~pins) | (pins & direction)
+        self.__output &= self.__direction
+
+    def read(self, with_output: bool = False) -> int:
+        self._emulator.usb_transaction("gpio_read", 1)
+        value = 0
+        if self._irq_pin is not None and not self._emulator.irq():
+            value |= 1 << self._irq_pin
+        value &= ~self.__direction
+        if with_output:
+            value |= self.__output
+        return value
+
+    def write(self, value: int):
+        self._emulator.usb_transaction("gpio_write", 1)
+        if (value & self.__direction) != value:
+            raise RuntimeError("No such GPO pins: {:04x}/{:04x}".format(self.__direction, value))
+        self.__output = value
+        if self.__direction & (1 << self._ce_pin):
+            self._emulator.set_ce(bool(value & (1 << self._ce_pin)))
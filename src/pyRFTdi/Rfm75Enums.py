@@ -12,6 +12,7 @@ class Rfm75Command:
     W_TX_PAYLOAD_NO_ACK = 0xB0
     FLUSH_TX = 0xE1
     FLUSH_RX = 0xE2
+    NOP = 0xFF
 
 class Rfm75CRCLen:
     CRC_1 = 0
@@ -21,4 +22,22 @@ class Rfm75TxPower:
     TX_PWR_LOW = 0b000
     TX_PWR_1 = 0b010
     TX_PWR_2 = 0b100
-    TX_PWR_HIGH = 0b110
\ No newline at end of file
+    TX_PWR_HIGH = 0b110
+
+class Rfm75OverflowPolicy:
+    DROP_OLDEST = 0
+    DROP_NEWEST = 1
+    BLOCK = 2
+
+class Rfm75TxOutcome:
+    SENT = 0
+    MAX_RT = 1
+    TIMEOUT = 2
+
+class Rfm75TraceKind:
+    SPI_EXCHANGE = 1
+    SPI_WRITE = 2
+    SPI_READ = 3
+    GPIO_READ = 4
+    GPIO_WRITE = 5
+    GPIO_DIRECTION = 6
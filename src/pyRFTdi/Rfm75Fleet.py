@@ -0,0 +1,217 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from queue import Empty, Queue
+
+from pyftdi.ftdi import Ftdi
+from pyftdi.spi import SpiController
+from pyftdi.usbtools import UsbTools
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Enums import Rfm75OverflowPolicy
+from pyRFTdi.Rfm75Packet import Rfm75Packet
+from pyRFTdi.Rfm75RadioHealth import Rfm75RadioHealth
+from pyRFTdi.Rfm75Receiver import Rfm75Receiver
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+
+
+class Rfm75Fleet:
+    """Drive several RFM75 modules, each connected to its own FTDI adapter, in parallel.
+
+    Every radio gets dedicated I/O thread, so open, configuration and any other fan-out call
+    take time of the slowest radio instead of sum of all. Received packets of all radios
+    are merged into single queue, packet source is set to adapter URL.
+
+    Usage::
+
+        fleet = Rfm75Fleet(ce_pin=7)
+        fleet.open()
+        fleet.apply_profile(profile)
+        fleet.run(lambda controller: controller.set_mode_rx())
+        fleet.start_receive()
+        for packet in fleet:
+            print(packet.source, packet.payload.hex())
+    """
+
+    def __init__(self, urls: list = None, ce_pin: int = 7, irq_pin: int = None, frequency: float = 8E6,
+                 use_cache: bool = True, open_radio=None, maxsize: int = 1024,
+                 overflow: Rfm75OverflowPolicy = Rfm75OverflowPolicy.DROP_OLDEST):
+        """Constructor
+
+        :param urls: list of FTDI URLs, all connected FTDI adapters are used if not set
+        :param ce_pin: int GPIO pin number for CE pin, same for all radios
+        :param irq_pin: int GPIO pin number wired to module IRQ pin, same for all radios
+        :param frequency: float SPI clock frequency in Hz
+        :param use_cache: bool Enable register cache, see Rfm75RegisterController
+        :param open_radio: callable which takes URL and returns FtdiRfm75Controller. Replaces default SpiController based opener
+        :param maxsize: int Merged packet queue size
+        :param overflow: Rfm75OverflowPolicy what to do when merged queue is full
+        """
+        self._urls = list(urls) if urls is not None else self.discover()
+        self._ce_pin = ce_pin
+        self._irq_pin = irq_pin
+        self._frequency = frequency
+        self._use_cache = use_cache
+        self._open_radio = open_radio or self.__open_ftdi_radio
+        self._overflow = overflow
+        self._queue = Queue(maxsize)
+        self.__executors = {url: ThreadPoolExecutor(max_workers=1, thread_name_prefix=url) for url in self._urls}
+        self.__controllers = {}
+        self.__spi_controllers = {}  # SpiController opened by default opener, terminated on close()
+        self.__receivers = {}
+        self.__connected = {}
+        self.__errors = {}
+
+    @staticmethod
+    def discover(url: str = None) -> list:
+        """Find URLs of all connected FTDI adapters
+
+        :param url: str URL pattern to restrict search, all FTDI devices if not set
+
+        :return:  list of URLs
+        """
+        devices = Ftdi.list_devices(url)
+        return [dev_url for dev_url, _ in UsbTools.build_dev_strings(
+            Ftdi.SCHEME, Ftdi.VENDOR_IDS, Ftdi.PRODUCT_IDS, devices)]
+
+    @property
+    def urls(self) -> list:
+        return list(self._urls)
+
+    @property
+    def controllers(self) -> dict:
+        """dict with URL as key and FtdiRfm75Controller as value for every opened radio"""
+        return dict(self.__controllers)
+
+    def open(self) -> dict:
+        """Open and check all radios in parallel. Radios which failed to open or are not connected are skipped
+        by following calls and reported by health()
+
+        :return:  dict with URL as key and is_connected() result as value, False if radio failed to open
+        """
+        def open_one(url):
+            controller = self._open_radio(url)
+            self.__controllers[url] = controller
+            return controller.is_connected()
+
+        results = self.__submit(open_one, self._urls)
+        for url, connected in results.items():
+            self.__connected[url] = bool(connected)
+            if not connected:
+                logging.warning("Radio {} is not connected".format(url))
+        return {url: self.__connected[url] for url in self._urls}
+
+    def run(self, func, *args) -> dict:
+        """Call func(controller, *args) for every connected radio in parallel on radio I/O threads
+
+        :param func: callable which takes FtdiRfm75Controller as first argument
+
+        :return:  dict with URL as key and value returned by func as value, None if call failed
+        """
+        receiving = [url for url, receiver in self.__receivers.items() if receiver.running]
+        if receiving:
+            raise RuntimeError("Radios are receiving: {}".format(", ".join(receiving)))
+        urls = [url for url in self._urls if self.__connected.get(url)]
+        return self.__submit(lambda url: func(self.__controllers[url], *args), urls)
+
+    def apply_profile(self, profile) -> dict:
+        """Write Rfm75Profile into all radios, see Rfm75ConfigController.apply()
+
+        :return:  dict with URL as key and list of written registers as value
+        """
+        return self.run(lambda controller: controller.config_ctrl.apply(profile))
+
+    def start_receive(self):
+        """Start receive thread for every connected radio. Radios must be configured for RX, powered up and with CE set"""
+        for url, controller in self.__controllers.items():
+            if not self.__connected.get(url):
+                continue
+            receiver = Rfm75Receiver(controller, overflow=self._overflow, packet_queue=self._queue, name=url)
+            receiver.start()
+            self.__receivers[url] = receiver
+
+    def stop_receive(self, timeout: float = None) -> int:
+        """Stop all receive threads
+
+        :param timeout: float Max time in seconds to wait for every thread, wait forever if not set
+
+        :return:  total number of dropped packets
+        """
+        dropped = 0
+        for url, receiver in self.__receivers.items():
+            dropped += receiver.stop(timeout)
+            if receiver.error is not None:
+                self.__errors[url] = receiver.error
+        return dropped
+
+    def get(self, block: bool = True, timeout: float = None) -> Rfm75Packet:
+        """Take next packet from merged queue
+
+        :return:  Rfm75Packet with adapter URL as source, raise queue.Empty if no packet available in time
+        """
+        return self._queue.get(block, timeout)
+
+    def __iter__(self):
+        """Yield packets of all radios in order of arrival until all receivers are stopped and queue is drained"""
+        while any(receiver.running for receiver in self.__receivers.values()) or not self._queue.empty():
+            try:
+                yield self._queue.get(True, Rfm75Receiver.WAIT_TIMEOUT)
+            except Empty:
+                continue
+
+    def health(self, probe: bool = False) -> dict:
+        """Report state of every radio
+
+        :param probe: bool Check connection of opened radios with is_connected() in parallel before report
+
+        :return:  dict with URL as key and Rfm75RadioHealth as value
+        """
+        if probe:
+            urls = [url for url in self._urls if url in self.__controllers]
+            for url, connected in self.__submit(
+                    lambda url: self.__controllers[url].is_connected(), urls).items():
+                self.__connected[url] = bool(connected)
+        result = {}
+        for url in self._urls:
+            receiver = self.__receivers.get(url)
+            error = self.__errors.get(url)
+            if receiver is not None and receiver.error is not None:
+                error = receiver.error
+            result[url] = Rfm75RadioHealth(
+                url, self.__connected.get(url),
+                receiver is not None and receiver.running,
+                receiver.received if receiver is not None else 0,
+                receiver.dropped if receiver is not None else 0,
+                error)
+        return result
+
+    def close(self):
+        """Stop receivers and I/O threads, close adapters opened by default opener"""
+        self.stop_receive()
+        for executor in self.__executors.values():
+            executor.shutdown(wait=True)
+        for spi_controller in self.__spi_controllers.values():
+            spi_controller.terminate()
+        self.__spi_controllers.clear()
+
+    def __submit(self, func, urls: list) -> dict:
+        """Run func(url) on I/O thread of every radio and wait for all of them"""
+        futures = {url: self.__executors[url].submit(func, url) for url in urls}
+        wait(futures.values())
+        results = {}
+        for url, future in futures.items():
+            error = future.exception()
+            if error is not None:
+                logging.error("Radio {} failed: {}".format(url, error))
+                self.__errors[url] = error
+                results[url] = None
+            else:
+                results[url] = future.result()
+        return results
+
+    def __open_ftdi_radio(self, url: str) -> FtdiRfm75Controller:
+        spi_controller = SpiController(cs_count=1)
+        spi_controller.configure(url)
+        self.__spi_controllers[url] = spi_controller
+        port = spi_controller.get_port(cs=0, freq=self._frequency)
+        gpio = spi_controller.get_gpio()
+        reg_controller = Rfm75RegisterController(port, use_cache=self._use_cache)
+        return FtdiRfm75Controller(port, gpio, self._ce_pin, reg_controller, irq_pin=self._irq_pin)
@@ -0,0 +1,9 @@
+from collections import namedtuple
+
+# Usage statistics of Rfm75TimedLock, only outermost acquisitions of reentrant lock are counted
+# acquisitions: number of times lock was acquired
+# contended: number of acquisitions which had to wait for other thread
+# wait_time: total time in seconds spent waiting for lock
+# held_time: total time in seconds lock was held
+# max_held_time: longest time in seconds lock was held at once
+Rfm75LockStats = namedtuple("Rfm75LockStats", "acquisitions contended wait_time held_time max_held_time")
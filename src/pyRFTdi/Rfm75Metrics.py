@@ -0,0 +1,199 @@
+import inspect
+from bisect import bisect_left
+from threading import Lock, local
+from time import monotonic
+
+
+class Rfm75Metrics:
+    """SPI, GPIO and USB transaction counters and call latency histograms.
+
+    Counters are attributed to outermost public API call which caused them, e.g. all register
+    reads and writes done by set_mode_tx() are reported under "FtdiRfm75Controller.set_mode_tx".
+    Transactions made outside of attached API calls are reported under OTHER.
+    Controllers which are not attached pay single attribute check per transaction.
+
+    Usage::
+
+        metrics = Rfm75Metrics()
+        metrics.attach(controller)
+        controller.set_mode_tx()
+        print(metrics.snapshot()["FtdiRfm75Controller.set_mode_tx"]["usb_round_trips"])
+        print(metrics.prometheus())
+    """
+
+    COUNTERS = ("calls", "spi_exchanges", "spi_writes", "bytes_out", "bytes_in",
+                "bank_switches", "gpio_reads", "gpio_writes")
+    LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+    OTHER = "other"
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        """Constructor
+
+        :param buckets: tuple of histogram bucket upper bounds in seconds, ascending
+        """
+        self._buckets = tuple(buckets)
+        self.__lock = Lock()
+        self.__local = local()
+        self.__attached = {}  # id(object) -> (object, list of wrapped method names)
+        self.reset()
+
+    def attach(self, controller):
+        """Start collecting metrics of controller. FtdiRfm75Controller is attached with its
+        register and config controllers, Rfm75RegisterController could be attached alone
+
+        :param controller: FtdiRfm75Controller or Rfm75RegisterController
+        """
+        for obj in self.__related(controller):
+            if id(obj) in self.__attached:
+                continue
+            if hasattr(obj, "metrics"):
+                obj.metrics = self
+            self.__attached[id(obj)] = (obj, self.__wrap(obj))
+
+    def detach(self, controller):
+        """Stop collecting metrics of controller attached with attach()"""
+        for obj in self.__related(controller):
+            _, names = self.__attached.pop(id(obj), (None, []))
+            for name in names:
+                delattr(obj, name)
+            if hasattr(obj, "metrics"):
+                obj.metrics = None
+
+    def snapshot(self) -> dict:
+        """Get copy of collected metrics
+
+        :return:  dict with operation name as key and dict of counters as value. Every operation has
+                  COUNTERS, usb_round_trips and latency dict with count, sum and cumulative buckets
+        """
+        result = {}
+        with self.__lock:
+            for operation, data in self.__operations.items():
+                counters = dict(data["counters"])
+                counters["usb_round_trips"] = (counters["spi_exchanges"] + counters["spi_writes"] +
+                                               counters["gpio_reads"] + counters["gpio_writes"])
+                histogram = data["histogram"]
+                cumulative = []
+                total = 0
+                for count in histogram[:len(self._buckets)]:
+                    total += count
+                    cumulative.append(total)
+                counters["latency"] = {
+                    "count": sum(histogram),
+                    "sum": data["latency_sum"],
+                    "buckets": dict(zip(self._buckets, cumulative))
+                }
+                result[operation] = counters
+        return result
+
+    def totals(self) -> dict:
+        """Get counters summed over all operations
+
+        :return:  dict with counter name as key
+        """
+        result = dict.fromkeys(self.COUNTERS + ("usb_round_trips",), 0)
+        for counters in self.snapshot().values():
+            for name in result:
+                result[name] += counters[name]
+        return result
+
+    def reset(self):
+        """Drop collected metrics"""
+        with self.__lock:
+            self.__operations = {}
+
+    def prometheus(self, prefix: str = "rfm75") -> str:
+        """Export metrics in Prometheus text format
+
+        :param prefix: str Metric name prefix
+
+        :return:  str with one counter family per counter and call duration histogram
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name in self.COUNTERS + ("usb_round_trips",):
+            lines.append("# TYPE {}_{}_total counter".format(prefix, name))
+            for operation, counters in sorted(snapshot.items()):
+                lines.append('{}_{}_total{{op="{}"}} {}'.format(prefix, name, operation, counters[name]))
+        lines.append("# TYPE {}_call_duration_seconds histogram".format(prefix))
+        for operation, counters in sorted(snapshot.items()):
+            latency = counters["latency"]
+            for bound, count in latency["buckets"].items():
+                lines.append('{}_call_duration_seconds_bucket{{op="{}",le="{}"}} {}'.format(
+                    prefix, operation, bound, count))
+            lines.append('{}_call_duration_seconds_bucket{{op="{}",le="+Inf"}} {}'.format(
+                prefix, operation, latency["count"]))
+            lines.append('{}_call_duration_seconds_sum{{op="{}"}} {}'.format(prefix, operation, latency["sum"]))
+            lines.append('{}_call_duration_seconds_count{{op="{}"}} {}'.format(prefix, operation, latency["count"]))
+        return "\n".join(lines) + "\n"
+
+    def count_spi(self, bytes_out: int, bytes_in: int, exchange: bool):
+        """Count single SPI transaction, called by instrumented controllers"""
+        with self.__lock:
+            counters = self.__current()["counters"]
+            counters["spi_exchanges" if exchange else "spi_writes"] += 1
+            counters["bytes_out"] += bytes_out
+            counters["bytes_in"] += bytes_in
+
+    def count(self, name: str, value: int = 1):
+        """Increment counter of current operation, called by instrumented controllers
+
+        :param name: str One of COUNTERS
+        """
+        with self.__lock:
+            self.__current()["counters"][name] += value
+
+    def __current(self) -> dict:
+        return self.__operation(getattr(self.__local, "operation", None) or self.OTHER)
+
+    def __operation(self, operation: str) -> dict:
+        data = self.__operations.get(operation)
+        if data is None:
+            data = {
+                "counters": dict.fromkeys(self.COUNTERS, 0),
+                "histogram": [0] * (len(self._buckets) + 1),
+                "latency_sum": 0.0
+            }
+            self.__operations[operation] = data
+        return data
+
+    def __observe(self, operation: str, elapsed: float):
+        with self.__lock:
+            data = self.__operation(operation)
+            data["counters"]["calls"] += 1
+            data["histogram"][bisect_left(self._buckets, elapsed)] += 1
+            data["latency_sum"] += elapsed
+
+    def __related(self, controller) -> list:
+        objects = [controller]
+        if hasattr(controller, "get_register_controller"):
+            objects.append(controller.get_register_controller())
+        config_ctrl = getattr(controller, "config_ctrl", None)
+        if config_ctrl is not None:
+            objects.extend([config_ctrl, config_ctrl.pipe_ctrl, config_ctrl.crc_ctrl])
+        return objects
+
+    def __wrap(self, obj) -> list:
+        names = []
+        for name, method in inspect.getmembers(obj, inspect.ismethod):
+            if name.startswith("_") or name in ("locked", "batch", "lock_stats"):
+                continue
+            setattr(obj, name, self.__timed("{}.{}".format(type(obj).__name__, name), method))
+            names.append(name)
+        return names
+
+    def __timed(self, operation: str, method):
+        state = self.__local
+
+        def wrapper(*args, **kwargs):
+            if getattr(state, "operation", None) is not None:
+                return method(*args, **kwargs)
+            state.operation = operation
+            start = monotonic()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                state.operation = None
+                self.__observe(operation, monotonic() - start)
+        wrapper.__name__ = method.__name__
+        wrapper.__doc__ = method.__doc__
+        return wrapper
@@ -0,0 +1,149 @@
+from struct import pack
+
+from pyftdi.ftdi import Ftdi
+from pyftdi.spi import SpiController, SpiPort
+
+
+class Rfm75MpsseSequencer:
+    """Write SPI frame and pulse CE pin with single MPSSE command sequence.
+
+    Sequence is sent to FTDI adapter in one USB transfer and executed by MPSSE engine:
+    chip select, write frame, chip deselect, CE HIGH, wait given number of SPI clock cycles, CE LOW.
+    CE HIGH time is defined by SPI clock and does not depend on host scheduling.
+
+    Several SPI frames, each within own chip select, are sent the same way with write_frames()
+    and exchange_frames(). Rfm75RegisterController uses them for register batches and snapshots.
+
+    Relies on SpiController internals (pin state and MPSSE opcodes), as pyftdi public API
+    does not allow to combine SPI transaction and GPIO change in one transfer.
+    Only SPI mode 0, used by RFM75, is supported.
+
+    Usage::
+
+        sequencer = Rfm75MpsseSequencer(ftdi_ctrl, ftdi_port)
+        reg_controller = Rfm75RegisterController(ftdi_port, use_cache=True, sequencer=sequencer)
+        controller = FtdiRfm75Controller(ftdi_port, ftdi_gpio, CE_PIN, reg_controller, sequencer=sequencer)
+    """
+
+    MAX_WAIT_BYTES = 0x10000  # CLK_BYTES_NO_DATA length is 16 bit
+
+    def __init__(self, spi_controller: SpiController, port: SpiPort):
+        """Constructor
+
+        :param spi_controller: SpiController which owns port and GPIO pins
+        :param port: SpiPort with RFM75 chip select
+        """
+        if(port.mode != 0):
+            raise RuntimeError("SPI mode {} is not supported".format(port.mode))
+        self._spi_controller = spi_controller
+        self._port = port
+
+    def cycles(self, duration: float) -> int:
+        """Convert duration into number of SPI clock cycles, rounded up to whole bytes
+
+        :param duration: float Time in seconds
+
+        :return:  number of SPI clock cycles
+        """
+        nbytes = max(1, -(-int(duration * self._port.frequency) // 8))
+        if(nbytes > self.MAX_WAIT_BYTES):
+            raise RuntimeError("Pulse {}s is too long for {}Hz SPI clock".format(duration, self._port.frequency))
+        return nbytes * 8
+
+    def build(self, frame: bytearray, gpio_out: int, ce_pin: int, duration: float) -> bytearray:
+        """Build MPSSE command sequence
+
+        :param frame: bytearray SPI frame, command byte followed by data
+        :param gpio_out: int GPIO output pins state with CE LOW, as tracked by FtdiRfm75Controller
+        :param ce_pin: int GPIO pin number for CE pin
+        :param duration: float CE HIGH time in seconds
+
+        :return:  bytearray with MPSSE commands
+        """
+        ctrl = self._spi_controller
+        direction = ctrl.direction
+        cmd = bytearray()
+        self.__frame(cmd, frame, gpio_out & 0xFF & ~ctrl._spi_mask, Ftdi.WRITE_BYTES_NVE_MSB)
+        cmd.extend(self.__set_pins(gpio_out | (1 << ce_pin), direction, ce_pin))
+        cmd.extend(pack("<BH", Ftdi.CLK_BYTES_NO_DATA, self.cycles(duration) // 8 - 1))
+        cmd.extend(self.__set_pins(gpio_out & ~(1 << ce_pin), direction, ce_pin))
+        return cmd
+
+    def build_frames(self, frames: list, duplex: bool = False) -> bytearray:
+        """Build MPSSE command sequence for several SPI frames, each within own chip select.
+        GPIO pins keep state last written through SpiController.
+
+        :param frames: list of bytearray SPI frames
+        :param duplex: bool Clock in data while frames are written
+
+        :return:  bytearray with MPSSE commands
+        """
+        ctrl = self._spi_controller
+        opcode = Ftdi.RW_BYTES_PVE_NVE_MSB if duplex else Ftdi.WRITE_BYTES_NVE_MSB
+        cmd = bytearray()
+        for frame in frames:
+            self.__frame(cmd, frame, ctrl._gpio_low, opcode)
+        if duplex:
+            cmd.append(Ftdi.SEND_IMMEDIATE)
+        return cmd
+
+    def pulse(self, frame: bytearray, gpio_out: int, ce_pin: int, duration: float):
+        """Execute frame write and CE pulse in single USB transfer, see build()"""
+        ctrl = self._spi_controller
+        with ctrl._lock:
+            self.__set_frequency()
+            ctrl.ftdi.write_data(self.build(frame, gpio_out, ce_pin, duration))
+
+    def write_frames(self, frames: list):
+        """Write several SPI frames in single USB transfer, see build_frames()
+
+        :param frames: list of bytearray SPI frames
+        """
+        ctrl = self._spi_controller
+        with ctrl._lock:
+            self.__set_frequency()
+            ctrl.ftdi.write_data(self.build_frames(frames))
+
+    def exchange_frames(self, frames: list) -> list:
+        """Full duplex exchange of several SPI frames in single USB write and read, see build_frames()
+
+        :param frames: list of bytearray SPI frames
+
+        :return:  list of bytearray received while every frame was written
+        """
+        ctrl = self._spi_controller
+        with ctrl._lock:
+            self.__set_frequency()
+            ctrl.ftdi.write_data(self.build_frames(frames, True))
+            data = ctrl.ftdi.read_data_bytes(sum(len(frame) for frame in frames), 4)
+        received = []
+        offset = 0
+        for frame in frames:
+            received.append(data[offset:offset + len(frame)])
+            offset += len(frame)
+        return received
+
+    def __set_frequency(self):
+        ctrl = self._spi_controller
+        if(ctrl._frequency != self._port.frequency):
+            ctrl.ftdi.set_frequency(self._port.frequency)
+            ctrl._frequency = self._port.frequency
+
+    def __frame(self, cmd: bytearray, frame: bytearray, gpio_low: int, opcode: int):
+        """Append chip select, frame transfer and chip deselect to command sequence"""
+        ctrl = self._spi_controller
+        direction = ctrl.direction & 0xFF
+        spi_mask = ctrl._spi_mask
+        for cs in self._port._cs_prolog:
+            cmd.extend((Ftdi.SET_BITS_LOW, (cs & spi_mask) | gpio_low, direction))
+        cmd.extend(pack("<BH", opcode, len(frame) - 1))
+        cmd.extend(frame)
+        for cs in self._port._cs_epilog:
+            cmd.extend((Ftdi.SET_BITS_LOW, (cs & spi_mask) | gpio_low, direction))
+        cmd.extend((Ftdi.SET_BITS_LOW, ctrl._cs_bits | gpio_low, direction))
+
+    def __set_pins(self, gpio_out: int, direction: int, ce_pin: int) -> tuple:
+        if ce_pin < 8:
+            value = self._spi_controller._cs_bits | (gpio_out & 0xFF & ~self._spi_controller._spi_mask)
+            return Ftdi.SET_BITS_LOW, value, direction & 0xFF
+        return Ftdi.SET_BITS_HIGH, (gpio_out >> 8) & 0xFF, (direction >> 8) & 0xFF
@@ -0,0 +1,8 @@
+from collections import namedtuple
+
+# Packet received from RX FIFO
+# payload: bytearray with packet data
+# pipe: RX pipe number packet was received on
+# timestamp: time.monotonic() when packet was read from module
+# source: name of receiver which read packet, None if not set
+Rfm75Packet = namedtuple("Rfm75Packet", "payload pipe timestamp source")
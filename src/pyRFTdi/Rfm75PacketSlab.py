@@ -0,0 +1,79 @@
+class Rfm75PacketSlab:
+    """Preallocated buffer of fixed size payload slots used to receive payloads without per-packet allocation.
+
+    Payloads are handed out as memoryview slices of single bytearray and must be released
+    back when consumer is done with them. Slots are reused in ring order. Views for every slot and
+    payload length are created once by constructor, so acquire() and release() allocate nothing;
+    they cost slots * (slot_size + 1) memoryview objects.
+
+    Usage::
+
+        slab = Rfm75PacketSlab(slots=128)
+        receiver = Rfm75Receiver(controller, slab=slab)
+        receiver.start()
+        for packet in receiver:
+            process(packet.payload)
+            receiver.release(packet)
+    """
+
+    SLOT_SIZE = 32
+
+    def __init__(self, slots: int = 64, slot_size: int = SLOT_SIZE):
+        """Constructor
+
+        :param slots: int Number of slots, defines max number of payloads held by consumers and queues
+        :param slot_size: int Slot size in bytes, must fit max payload length
+        """
+        if(slots <= 0):
+            raise RuntimeError("Wrong slots count {}".format(slots))
+        self._buffer = bytearray(slots * slot_size)
+        view = memoryview(self._buffer)
+        self.__slot_size = slot_size
+        # slot -> views of every payload length, views live as long as slab, so their ids are stable
+        self.__views = [[view[i * slot_size:i * slot_size + length] for length in range(slot_size + 1)]
+                        for i in range(slots)]
+        self.__owners = {id(payload): slot for slot, views in enumerate(self.__views) for payload in views}
+        self.__leased = [False] * slots
+        self.__ring = list(range(slots))  # Free slots ring, starts at head and holds free count entries
+        self.__head = 0
+        self.__free = slots
+        self.overruns = 0  # Number of acquire() calls failed because all slots were in use
+
+    @property
+    def slots(self) -> int:
+        return len(self.__views)
+
+    @property
+    def free(self) -> int:
+        """Number of slots available for acquire()"""
+        return self.__free
+
+    def acquire(self, length: int) -> memoryview:
+        """Take free slot
+
+        :param length: int Payload length, must not exceed slot size
+
+        :return:  memoryview of given length, None if all slots are in use
+        """
+        if(length > self.__slot_size):
+            raise RuntimeError("Payload length {} does not fit slot size {}".format(length, self.__slot_size))
+        if self.__free == 0:
+            self.overruns += 1
+            return None
+        slot = self.__ring[self.__head]
+        self.__head = (self.__head + 1) % len(self.__ring)
+        self.__free -= 1
+        self.__leased[slot] = True
+        return self.__views[slot][length]
+
+    def release(self, payload: memoryview):
+        """Return slot back to slab. Payload must not be used after release
+
+        :param payload: memoryview returned by acquire()
+        """
+        slot = self.__owners.get(id(payload))
+        if slot is None or not self.__leased[slot] or self.__views[slot][len(payload)] is not payload:
+            raise RuntimeError("Payload does not belong to slab or already released")
+        self.__leased[slot] = False
+        self.__ring[(self.__head + self.__free) % len(self.__ring)] = slot
+        self.__free += 1
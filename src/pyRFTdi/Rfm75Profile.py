@@ -0,0 +1,169 @@
+from pyRFTdi.Rfm75ConfigController import Rfm75ConfigController
+from pyRFTdi.Rfm75Enums import Rfm75AddressWidth, Rfm75CRCLen, Rfm75TxPower
+from pyRFTdi.Rfm75Registers import Rfm75Register, Rfm75Registers
+
+
+class Rfm75PipeProfile:
+    """Configuration of single RX pipe"""
+
+    def __init__(self, address: bytearray = None, payload_width: int = None,
+                 auto_ack: bool = False, dynamic_payload: bool = False):
+        """Constructor
+
+        :param address: bytearray with pipe address. Only LSB byte is used for pipes 2-5. Address is not changed if not set
+        :param payload_width: Static payload width in range 0-32. Width is not changed if not set
+        :param auto_ack: Enable auto acknowledge for pipe
+        :param dynamic_payload: Enable dynamic payload length for pipe
+        """
+        if(payload_width is not None and (payload_width < 0 or payload_width > 32)):
+            raise RuntimeError(
+                "Wrong payload width {}. Allowed values 0-32".format(payload_width))
+        self.address = address
+        self.payload_width = payload_width
+        self.auto_ack = auto_ack
+        self.dynamic_payload = dynamic_payload
+
+
+class Rfm75Profile:
+    """Declarative radio configuration.
+
+    Every parameter left as None is not managed by profile and keeps its current value on the chip.
+    Profile is written by Rfm75ConfigController.apply() which writes only registers that differ.
+    """
+
+    PIPE_ADDR_REGISTERS = [
+        Rfm75Registers.RX_ADDR_P0,
+        Rfm75Registers.RX_ADDR_P1,
+        Rfm75Registers.RX_ADDR_P2,
+        Rfm75Registers.RX_ADDR_P3,
+        Rfm75Registers.RX_ADDR_P4,
+        Rfm75Registers.RX_ADDR_P5
+    ]
+    PIPE_WIDTH_REGISTERS = [
+        Rfm75Registers.RX_PW_P0,
+        Rfm75Registers.RX_PW_P1,
+        Rfm75Registers.RX_PW_P2,
+        Rfm75Registers.RX_PW_P3,
+        Rfm75Registers.RX_PW_P4,
+        Rfm75Registers.RX_PW_P5
+    ]
+    DATA_RATE_BITS = {
+        "1Msps": 0b000000,
+        "2Msps": 0b001000,
+        "250ksps": 0b100000
+    }
+    DATA_RATE_MASK = 0b101000
+    TX_POWER_MASK = Rfm75TxPower.TX_PWR_HIGH
+
+    def __init__(self, channel: int = None, data_rate: str = None,
+                 address_width: Rfm75AddressWidth = None, tx_address: bytearray = None,
+                 pipes: dict = None, crc_enabled: bool = None, crc_len: Rfm75CRCLen = None,
+                 tx_power: Rfm75TxPower = None, lna_gain_high: bool = None,
+                 dynamic_payload: bool = None, payload_ack: bool = None, dynamic_ack: bool = None):
+        """Constructor
+
+        :param channel: RF channel, F0= 2400 + channel (MHz)
+        :param data_rate: One of: "1Msps","2Msps","250ksps". Also defines bank 1 values written by chip_init()
+        :param address_width: Rfm75AddressWidth address width
+        :param tx_address: bytearray with TX address
+        :param pipes: dict with pipe number as key and Rfm75PipeProfile as value. Pipes not listed are disabled
+        :param crc_enabled: Enable CRC
+        :param crc_len: Rfm75CRCLen CRC encoding scheme
+        :param tx_power: Rfm75TxPower output power
+        :param lna_gain_high: True for high LNA gain, False for low
+        :param dynamic_payload: FEATURE EN_DPL bit
+        :param payload_ack: FEATURE EN_ACK_PAY bit
+        :param dynamic_ack: FEATURE EN_DYN_ACK bit
+        """
+        if(data_rate is not None and data_rate not in self.DATA_RATE_BITS):
+            raise RuntimeError(
+                "Wrong data rate {}. Allowed values: {}".format(data_rate, ", ".join(self.DATA_RATE_BITS)))
+        for pipe_no in (pipes or {}):
+            if(pipe_no < 0 or pipe_no > 5):
+                raise RuntimeError(
+                    "Wrong pipe number: {}. Allowed values 0-5".format(pipe_no))
+        self.channel = channel
+        self.data_rate = data_rate
+        self.address_width = address_width
+        self.tx_address = tx_address
+        self.pipes = pipes
+        self.crc_enabled = crc_enabled
+        self.crc_len = crc_len
+        self.tx_power = tx_power
+        self.lna_gain_high = lna_gain_high
+        self.dynamic_payload = dynamic_payload
+        self.payload_ack = payload_ack
+        self.dynamic_ack = dynamic_ack
+
+    def register_image(self) -> list:
+        """Compute target register image for this profile.
+
+:return:  list of (Rfm75Register, mask, value) tuples ordered by bank.
+            For single byte registers mask and value are int and only masked bits are managed.
+            For multi-byte registers mask is None and value is bytearray written as is
+        """
+        bits = {}
+        values = {}
+
+        def set_bits(register: Rfm75Register, mask: int, value: int):
+            old_mask, old_value = bits.get(register, (0, 0))
+            bits[register] = (old_mask | mask, (old_value & ~mask) | (value & mask))
+
+        def set_bit(register: Rfm75Register, bit_num: int, enabled: bool):
+            set_bits(register, 1 << bit_num, int(bool(enabled)) << bit_num)
+
+        def set_value(register: Rfm75Register, value: bytearray):
+            if(len(value) > register.size):
+                raise RuntimeError(
+                    "Value {} does not fit register 0x{:02X} size: {} bytes.".format(
+                        bytearray(value).hex(), register.addr, register.size))
+            if register.size == 1:
+                set_bits(register, 0xFF, value[0])
+            else:
+                values[register] = bytearray(value)
+
+        if self.crc_enabled is not None:
+            set_bit(Rfm75Registers.CONFIG, 3, self.crc_enabled)
+        if self.crc_len is not None:
+            set_bit(Rfm75Registers.CONFIG, 2, self.crc_len == Rfm75CRCLen.CRC_2)
+        if self.channel is not None:
+            set_value(Rfm75Registers.RF_CH, [self.channel])
+        if self.lna_gain_high is not None:
+            set_bit(Rfm75Registers.RF_SETUP, 0, self.lna_gain_high)
+        if self.tx_power is not None:
+            set_bits(Rfm75Registers.RF_SETUP, self.TX_POWER_MASK, self.tx_power)
+        if self.data_rate is not None:
+            set_bits(Rfm75Registers.RF_SETUP, self.DATA_RATE_MASK,
+                     self.DATA_RATE_BITS[self.data_rate])
+        if self.address_width is not None:
+            set_value(Rfm75Registers.SETUP_AW, [self.address_width])
+        if self.tx_address is not None:
+            set_value(Rfm75Registers.TX_ADDR, self.tx_address)
+        if self.dynamic_ack is not None:
+            set_bit(Rfm75Registers.FEATURE, 0, self.dynamic_ack)
+        if self.payload_ack is not None:
+            set_bit(Rfm75Registers.FEATURE, 1, self.payload_ack)
+        if self.dynamic_payload is not None:
+            set_bit(Rfm75Registers.FEATURE, 2, self.dynamic_payload)
+        if self.pipes is not None:
+            for pipe_no in range(6):
+                pipe = self.pipes.get(pipe_no)
+                set_bit(Rfm75Registers.EN_RXADDR, pipe_no, pipe is not None)
+                set_bit(Rfm75Registers.EN_AA, pipe_no, pipe is not None and pipe.auto_ack)
+                set_bit(Rfm75Registers.DYNPD, pipe_no, pipe is not None and pipe.dynamic_payload)
+                if pipe is None:
+                    continue
+                if pipe.address is not None:
+                    address = pipe.address
+                    if self.PIPE_ADDR_REGISTERS[pipe_no].size == 1:
+                        address = address[:1]
+                    set_value(self.PIPE_ADDR_REGISTERS[pipe_no], address)
+                if pipe.payload_width is not None:
+                    set_value(self.PIPE_WIDTH_REGISTERS[pipe_no], [pipe.payload_width])
+        if self.data_rate is not None:
+            for register, value in Rfm75ConfigController.bank1_init_values(self.data_rate):
+                set_value(register, value)
+
+        image = [(register, mask, value) for register, (mask, value) in bits.items()]
+        image.extend((register, None, value) for register, value in values.items())
+        return sorted(image, key=lambda item: item[0].bank)
@@ -0,0 +1,10 @@
+from collections import namedtuple
+
+# Health of single radio managed by Rfm75Fleet
+# url: FTDI URL of adapter radio is connected to
+# connected: result of last is_connected() check, None if radio was not opened
+# receiving: True while receive thread is running
+# received: number of packets received
+# dropped: number of packets dropped on queue overflow
+# error: last exception raised by radio open, fan-out call or receive thread, None if none
+Rfm75RadioHealth = namedtuple("Rfm75RadioHealth", "url connected receiving received dropped error")
@@ -0,0 +1,146 @@
+import logging
+from queue import Empty, Full, Queue
+from threading import Thread
+from time import sleep
+
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Enums import Rfm75OverflowPolicy
+from pyRFTdi.Rfm75Packet import Rfm75Packet
+from pyRFTdi.Rfm75PacketSlab import Rfm75PacketSlab
+
+
+class Rfm75Receiver:
+    """Receive packets on dedicated thread and hand them to consumer threads through bounded queue.
+
+    Usage::
+
+        receiver = Rfm75Receiver(controller, maxsize=128)
+        receiver.start()
+        for packet in receiver:
+            print(packet.payload.hex())
+
+    With slab set, payloads are memoryview slots of preallocated Rfm75PacketSlab
+    and every packet must be returned with release() once processed.
+    """
+
+    WAIT_TIMEOUT = 0.1  # Max time in seconds receive thread waits before checking stop request
+
+    def __init__(self, controller: FtdiRfm75Controller, maxsize: int = 64,
+                 overflow: Rfm75OverflowPolicy = Rfm75OverflowPolicy.DROP_OLDEST,
+                 packet_queue: Queue = None, name: str = None, slab: Rfm75PacketSlab = None):
+        """Constructor
+
+        :param controller: FtdiRfm75Controller configured for RX, powered up and with CE set
+        :param maxsize: int Queue size in packets, ignored if packet_queue is set
+        :param overflow: Rfm75OverflowPolicy what to do when queue is full
+        :param packet_queue: Queue to push packets into, could be shared by several receivers
+        :param name: str Receiver name, used as thread name and as packet source
+        :param slab: Rfm75PacketSlab to receive payloads into. Packets which do not fit free slots are dropped.
+                     Shared packet_queue must not be fed by receivers with other slabs
+        """
+        self._controller = controller
+        self._overflow = overflow
+        self._queue = packet_queue if packet_queue is not None else Queue(maxsize)
+        self.name = name
+        self._slab = slab
+        self.received = 0
+        self.dropped = 0
+        self.error = None  # Exception which stopped receive thread
+        self.__running = False
+        self.__thread = None
+
+    @property
+    def running(self) -> bool:
+        return self.__running
+
+    @property
+    def queue(self) -> Queue:
+        return self._queue
+
+    def start(self):
+        """Start receive thread"""
+        if self.__running:
+            raise RuntimeError("Receiver is already running")
+        self.__running = True
+        self.__thread = Thread(target=self.__run, name=self.name or "Rfm75Receiver", daemon=True)
+        self.__thread.start()
+
+    def stop(self, timeout: float = None) -> int:
+        """Stop receive thread and wait for it to finish
+
+        :param timeout: float Max time in seconds to wait for thread, wait forever if not set
+
+        :return:  number of dropped packets, including packets which did not fit free slab slots
+        """
+        self.__running = False
+        if self.__thread is not None:
+            self.__thread.join(timeout)
+        dropped = self.dropped + (self._slab.overruns if self._slab is not None else 0)
+        logging.info("Receiver stopped, received: {} dropped: {}".format(self.received, dropped))
+        return dropped
+
+    def get(self, block: bool = True, timeout: float = None) -> Rfm75Packet:
+        """Take next packet from queue
+
+        :return:  Rfm75Packet, raise queue.Empty if no packet available in time
+        """
+        return self._queue.get(block, timeout)
+
+    def release(self, packet: Rfm75Packet):
+        """Return packet payload slot back to slab. Does nothing when slab is not used
+
+        :param packet: Rfm75Packet taken from receiver
+        """
+        if self._slab is not None:
+            self._slab.release(packet.payload)
+
+    def __iter__(self):
+        """Yield packets until receiver is stopped and queue is drained"""
+        while self.__running or not self._queue.empty():
+            try:
+                yield self._queue.get(True, self.WAIT_TIMEOUT)
+            except Empty:
+                continue
+
+    def __run(self):
+        try:
+            while self.__running:
+                if not self._controller.wait_rx_data(self.WAIT_TIMEOUT):
+                    continue
+                packets = self._controller.drain_rx_fifo(self.name, self._slab)
+                if not packets:
+                    # IRQ asserted by TX_DS/MAX_RT or RX_DR already handled, nothing to receive
+                    sleep(self._controller.poll_interval)
+                for packet in packets:
+                    self.__put(packet)
+        except Exception as ex:
+            logging.exception("Receiver stopped on error")
+            self.error = ex
+            self.__running = False
+
+    def __put(self, packet: Rfm75Packet):
+        self.received += 1
+        if self._overflow == Rfm75OverflowPolicy.BLOCK:
+            while self.__running:
+                try:
+                    self._queue.put(packet, True, self.WAIT_TIMEOUT)
+                    return
+                except Full:
+                    continue
+            self.dropped += 1
+            self.release(packet)
+            return
+        while True:
+            try:
+                self._queue.put_nowait(packet)
+                return
+            except Full:
+                if self._overflow == Rfm75OverflowPolicy.DROP_NEWEST:
+                    self.dropped += 1
+                    self.release(packet)
+                    return
+            try:
+                self.release(self._queue.get_nowait())
+                self.dropped += 1
+            except Empty:
+                pass
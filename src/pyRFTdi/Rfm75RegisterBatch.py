@@ -0,0 +1,70 @@
+from typing import Iterable
+from pyRFTdi.Rfm75Registers import Rfm75Register
+
+
+class Rfm75RegisterBatch:
+    """Queue of register writes, bank switches and commands sent to module at once.
+
+    Batch is created by Rfm75RegisterController.batch() and used as context manager.
+    While batch is active all writes made through register controller are queued,
+    each frame keeps its own chip select. Queue is flushed when batch exits or
+    before any operation which requires data from the module. Queued frames are sent
+    in single USB transfer when register controller has Rfm75MpsseSequencer, otherwise
+    every frame is separate SpiPort.write().
+    """
+
+    def __init__(self, register_controller, readback: bool = False):
+        """Constructor
+
+        :param register_controller: Rfm75RegisterController which owns this batch
+        :param readback: bool Read back every written register when batch is flushed
+        """
+        self._register_controller = register_controller
+        self._readback = readback
+        self._depth = 0
+        self.frames = []
+        self.readbacks = []
+        self.results = {}
+
+    def __enter__(self):
+        if self._depth == 0:
+            self._register_controller._begin_batch(self)
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth == 0:
+            self._register_controller._end_batch(self)
+        return False
+
+    def write_register(self, register: Rfm75Register, values: bytearray) -> bytearray:
+        """Queue register write
+
+        :param register: Rfm75Register which defines address bank and register size
+        :param values: Bytearray of values which represent register
+
+:return:  values to be written
+        """
+        return self._register_controller.write_register(register, values)
+
+    def switch_bank_number(self):
+        """Queue bank switch"""
+        self._register_controller.switch_bank_number()
+
+    def send_command(self, command: Iterable[int]):
+        """Queue command which does not return data"""
+        self._register_controller.send_command(command)
+
+    def read_register(self, register: Rfm75Register):
+        """Schedule register read after all queued frames are sent.
+        Value is available in results dictionary when batch exits"""
+        if register not in self.readbacks:
+            self.readbacks.append(register)
+
+    def _queue(self, frame: bytearray):
+        self.frames.append(bytes(frame))
+
+    def _written(self, register: Rfm75Register):
+        if self._readback:
+            self.read_register(register)
@@ -1,28 +1,120 @@
+import logging
+from threading import get_ident
+from time import monotonic
 from typing import Iterable
+from pyRFTdi.Rfm75LockStats import Rfm75LockStats
+from pyRFTdi.Rfm75MpsseSequencer import Rfm75MpsseSequencer
+from pyRFTdi.Rfm75RegisterBatch import Rfm75RegisterBatch
+from pyRFTdi.Rfm75RegisterImage import Rfm75RegisterImage
 from pyRFTdi.Rfm75Registers import Rfm75Register, Rfm75Registers
 from pyRFTdi.Rfm75Enums import Rfm75Command
+from pyRFTdi.Rfm75Status import Rfm75Status
+from pyRFTdi.Rfm75TimedLock import Rfm75TimedLock
 
 
 class Rfm75RegisterController:
+    """Low-level access to module registers and commands.
 
-    def __init__(self, port):
+    Controller is thread safe. Every access to the module, together with bank switch it requires,
+    read-modify-write of register bits and whole batch are done under single reentrant lock,
+    so bank switches of concurrent threads never interleave. Register reads served from cache
+    and harvested STATUS do not take the lock. Use locked() to make own multi-step sequence atomic.
+    """
+
+    def __init__(self, port, use_cache: bool = False, paranoid: bool = False,
+                 sequencer: Rfm75MpsseSequencer = None):
+        """Constructor
+
+        :param port: SpiPort Instance of SpiPort interface which used to communicate with module
+        :param use_cache: bool Keep write-through shadow copy of registers and serve reads of static registers from memory
+        :param paranoid: bool Probe active bank from STATUS before every register access instead of tracking it locally
+        :param sequencer: Rfm75MpsseSequencer When set, frames of batch and snapshot are sent in single USB transfer
+        """
         self.__port = port
+        self.__sequencer = sequencer
+        self.__use_cache = use_cache
+        self.__cache = {}
+        self.__paranoid = paranoid
+        self.__bank = None  # Active bank as tracked by software, None until probed
+        self.__batch = None  # Active Rfm75RegisterBatch, None when frames are sent immediately
+        self.__status = None  # Last Rfm75Status harvested from SPI transactions
+        self.__lock = Rfm75TimedLock("register")
+        self.__batch_owner = None  # Thread identifier of active batch owner
+        self.metrics = None  # Rfm75Metrics set by Rfm75Metrics.attach(), transactions are not counted if not set
+
+    @property
+    def use_cache(self) -> bool:
+        """True when register shadow cache is enabled"""
+        return self.__use_cache
+
+    @property
+    def last_status(self) -> Rfm75Status:
+        """Last STATUS value captured from any SPI transaction which reads data, None if nothing captured yet"""
+        return self.__status
+
+    @property
+    def in_batch(self) -> bool:
+        """True when calling thread owns active batch. Checked without taking controller lock"""
+        return self.__batch is not None and self.__batch_owner == get_ident()
+
+    def locked(self) -> Rfm75TimedLock:
+        """Hold controller lock for sequence of operations, which must not be interleaved with other threads
+
+        Usage::
+
+            with reg_controller.locked():
+                payload_len = controller.read_rx_payload_len()
+                status = reg_controller.last_status
+
+:return:  controller lock to be used as context manager
+        """
+        return self.__lock
+
+    def lock_stats(self) -> Rfm75LockStats:
+        """Get controller lock usage statistics, shows how long threads waited for each other
+
+:return:  Rfm75LockStats
+        """
+        return self.__lock.stats()
+
+    def read_status(self) -> Rfm75Status:
+        """Read STATUS register with single byte NOP transaction, which does not depend on active bank
+
+:return:  Rfm75Status read from module
+        """
+        with self.__lock:
+            self.__exchange([Rfm75Command.NOP], 0)
+            return self.__status
+
+    def get_status(self, max_age: float = None) -> Rfm75Status:
+        """Get STATUS register value.
+
+        :param max_age: float Maximum age in seconds of harvested STATUS value to be reused. Module is always read if not set
+
+:return:  Rfm75Status
+        """
+        status = self.__status
+        if(max_age is not None and status is not None and monotonic() - status.timestamp <= max_age):
+            return status
+        return self.read_status()
 
     def set_register_bit(self, register: Rfm75Register, bit_num: int):
-        bytes = self.read_register(register)
-        val = int.from_bytes(bytes, 'little')
-        val = val | (1 << bit_num)
-        result = self.write_register(
-            register, val.to_bytes(register.size, 'little'))
-        return result
+        with self.__lock:
+            bytes = self.read_register(register)
+            val = int.from_bytes(bytes, 'little')
+            val = val | (1 << bit_num)
+            result = self.write_register(
+                register, val.to_bytes(register.size, 'little'))
+            return result
 
     def unset_register_bit(self, register: Rfm75Register, bit_num: int):
-        bytes = self.read_register(register)
-        val = int.from_bytes(bytes, 'little')
-        val = val & ~(1 << bit_num)
-        result = self.write_register(
-            register, val.to_bytes(register.size, 'little'))
-        return result
+        with self.__lock:
+            bytes = self.read_register(register)
+            val = int.from_bytes(bytes, 'little')
+            val = val & ~(1 << bit_num)
+            result = self.write_register(
+                register, val.to_bytes(register.size, 'little'))
+            return result
 
     def read_register_bit(self, register: Rfm75Register, bit_num: int)->int:
         bytes = self.read_register(register)
@@ -31,29 +123,51 @@ class Rfm75RegisterController:
         return val
 
     def set_bank_number(self, bank_number):
-        if(self.get_bank_number() != bank_number):
-            self.switch_bank_number()
+        with self.__lock:
+            if(self.__paranoid or self.__bank is None):
+                self.resync_bank_number()
+            if(self.__bank != bank_number):
+                self.switch_bank_number()
 
     def get_bank_number(self):
-        BANK_BIT_NUM = 7
-        reg = self.__port.exchange(
-            [Rfm75Registers.STATUS.addr], Rfm75Registers.STATUS.size, True, True)
-        mask = 1 << BANK_BIT_NUM
-        return (reg[0] & mask) >> BANK_BIT_NUM
+        """Read active bank number from STATUS register
+
+:return:  bank number reported by chip
+        """
+        return self.read_status().bank
+
+    def resync_bank_number(self) -> int:
+        """Probe active bank from chip and use it as locally tracked bank.
+        Must be called after chip reset or bank switch made outside of this controller.
+
+:return:  bank number reported by chip
+        """
+        with self.__lock:
+            self.__bank = self.get_bank_number()
+            return self.__bank
 
     def switch_bank_number(self):
-        self.__port.write([0x50, 0x53], True, True)
+        with self.__lock:
+            self.__write_frame([0x50, 0x53])
+            if self.__bank is not None:
+                self.__bank ^= 1
+            if self.metrics is not None:
+                self.metrics.count("bank_switches")
 
     def read_register(self, register: Rfm75Register):
-        self.set_bank_number(register.bank)
-        reg = self.__port.exchange([register.addr], register.size)
-        return reg
+        if self.__is_cacheable(register):
+            cached = self.__cache.get(register)
+            if cached is not None:
+                return bytearray(cached)
+        with self.__lock:
+            return self.__read_from_chip(register)
 
     def write_register(self, register: Rfm75Register, values: bytearray) -> bytearray:
         """Write value to given register.
         :param register: Rfm75Register which defines address bank and register size
         :param values: Bytearray of values which represent register
-        
+        When batch is active write is queued and written values are returned without readback.
+
 :return:  new register value
         """
         if(len(values) > register.size):
@@ -65,9 +179,269 @@ class Rfm75RegisterController:
                 )
             )
 
+        with self.__lock:
+            self.set_bank_number(register.bank)
+            frame = bytearray([register.addr | Rfm75Command.WRITE])
+            frame.extend(values)
+            self.__write_frame(frame)
+            if self.__batch is not None:
+                self.__batch._written(register)
+            if self.__is_cacheable(register):
+                cached = self.__update_cache(register, values)
+                if cached is not None:
+                    return bytearray(cached)
+            if self.__batch is not None:
+                return bytearray(values)
+            return self.__read_from_chip(register)
+
+    def send_command(self, command: Iterable[int], readlen: int = 0) -> bytearray:
+        """Send command to module within single chip select frame.
+        Commands which does not return data are queued when batch is active.
+
+        :param command: command byte followed by command data
+        :param readlen: number of bytes to read after command
+
+:return:  bytearray with data returned by module
+        """
+        with self.__lock:
+            if readlen > 0:
+                return self.__exchange(command, readlen)
+            self.__write_frame(command)
+            return bytearray()
+
+    def send_command_into(self, command: Iterable[int], buffer) -> int:
+        """Send command to module and copy returned data into caller supplied buffer,
+        so no intermediate bytearray is created for returned data.
+
+        :param command: command byte followed by command data
+        :param buffer: writable buffer (bytearray, memoryview), number of bytes read is defined by its length
+
+:return:  number of bytes read into buffer
+        """
+        view = memoryview(buffer)
+        readlen = len(view)
+        if readlen == 0:
+            return 0
+        with self.__lock:
+            reg, cmd_len = self.__transfer(command, readlen)
+        view[:] = memoryview(reg)[cmd_len:]
+        return readlen
+
+    def batch(self, readback: bool = False) -> Rfm75RegisterBatch:
+        """Create batch to queue register writes, bank switches and commands.
+        Queued frames are sent when batch exits. Nested batches join already active one.
+        Batch holds controller lock until it exits, batch of other thread waits for it.
+
+        Usage::
+
+            with reg_controller.batch(readback=True) as batch:
+                config_ctrl.chip_init("1Msps")
+            print(batch.results)
+
+        :param readback: bool Read back every written register when batch exits
+
+:return:  Rfm75RegisterBatch to be used as context manager
+        """
+        if self.__batch is not None and self.__batch_owner == get_ident():
+            return self.__batch
+        return Rfm75RegisterBatch(self, readback)
+
+    def flush(self):
+        """Send all frames queued by active batch"""
+        with self.__lock:
+            if self.__batch is None or not self.__batch.frames:
+                return
+            frames = self.__batch.frames
+            self.__batch.frames = []
+            if self.__sequencer is not None:
+                self.__sequencer.write_frames(frames)
+                if self.metrics is not None:
+                    self.metrics.count_spi(sum(len(frame) for frame in frames), 0, False)
+                return
+            for frame in frames:
+                self.__port.write(frame, True, True)
+                if self.metrics is not None:
+                    self.metrics.count_spi(len(frame), 0, False)
+
+    def _begin_batch(self, batch: Rfm75RegisterBatch):
+        self.__lock.acquire()
+        self.__batch = batch
+        self.__batch_owner = get_ident()
+
+    def _end_batch(self, batch: Rfm75RegisterBatch):
+        try:
+            try:
+                self.flush()
+            finally:
+                self.__batch = None
+                self.__batch_owner = None
+            for register in sorted(batch.readbacks, key=lambda reg: reg.bank != self.__bank):
+                batch.results[register] = self.__read_from_chip(register)
+        finally:
+            self.__lock.release()
+
+    def invalidate_cache(self, register: Rfm75Register = None):
+        """Drop cached register values, so next read goes to the chip.
+        Must be called after chip reset or any change made outside of this controller.
+
+        :param register: Rfm75Register to drop from cache, all registers dropped if not set
+        """
+        if register is None:
+            self.__cache.clear()
+        else:
+            self.__cache.pop(register, None)
+
+    def refresh_cache(self) -> dict:
+        """Re-read all static registers of both banks from the chip into cache
+
+:return:  dict with Rfm75Register as key and cached value as bytes
+        """
+        if not self.__use_cache:
+            raise RuntimeError("Register cache is disabled")
+        with self.__lock:
+            self.__cache.clear()
+            for register in sorted(Rfm75Registers.all(), key=lambda reg: reg.bank):
+                if self.__is_cacheable(register):
+                    self.read_register(register)
+            return dict(self.__cache)
+
+    def snapshot(self) -> Rfm75RegisterImage:
+        """Read all registers of both banks. Registers of active bank are read first, so only
+        one bank switch is done, every register is read with single SPI frame without bank probe.
+        With sequencer set all frames are sent in single USB transfer, otherwise every frame is
+        single SPI transaction. Static registers are stored into cache when it is enabled.
+
+        :return:  Rfm75RegisterImage
+        """
+        with self.__lock:
+            self.flush()
+            if(self.__paranoid or self.__bank is None):
+                self.resync_bank_number()
+            first_bank = self.__bank
+            registers = [register for register in Rfm75Registers.all() if register.bank == first_bank]
+            registers.append(None)  # Bank switch
+            registers.extend(register for register in Rfm75Registers.all() if register.bank != first_bank)
+            frames = [bytearray([0x50, 0x53]) if register is None
+                      else bytearray([register.addr]) + bytes(register.size) for register in registers]
+            received = self.__exchange_frames(frames)
+            self.__bank = first_bank ^ 1
+            if self.metrics is not None:
+                self.metrics.count("bank_switches")
+            values = []
+            for register, reg in zip(registers, received):
+                if register is None:
+                    continue
+                if reg[0] >> 7 != register.bank:
+                    raise RuntimeError("Bank changed to {} while reading register 0x{:02X} of bank {}".format(
+                        reg[0] >> 7, register.addr, register.bank))
+                value = bytes(reg[1:])
+                if self.__is_cacheable(register):
+                    self.__cache[register] = value
+                values.append((register, value))
+            self.__status = Rfm75Status(received[-1][0], monotonic())
+            values.sort(key=lambda item: (item[0].bank, item[0].addr))
+            return Rfm75RegisterImage(tuple(values), monotonic())
+
+    def restore(self, image: Rfm75RegisterImage) -> list:
+        """Write registers from image taken by snapshot() back to module in single batch.
+        Volatile and read-only registers are skipped. FEATURE and DYNPD are written again
+        after features are activated if module ignored them, see verify_features().
+
+        :param image: Rfm75RegisterImage to restore
+
+        :return:  list of written Rfm75Register
+        """
+        registers = [(register, value) for register, value in image.values
+                     if register not in Rfm75Registers.VOLATILE and register not in Rfm75Registers.READ_ONLY]
+        with self.__lock:
+            # Registers of active bank first, so only one bank switch is queued
+            registers.sort(key=lambda item: item[0].bank != self.__bank)
+            with self.batch():
+                for register, value in registers:
+                    self.write_register(register, value)
+            self.verify_features(registers)
+        return [register for register, _ in registers]
+
+    def verify_features(self, values: list) -> bool:
+        """Module ignores writes to FEATURE and DYNPD until features are activated. Read back
+        FEATURE and DYNPD values which were written with any bit set, bypassing cache, and if module
+        ignored them, activate features and write them again.
+
+        :param values: list of written (Rfm75Register, value) pairs, other registers are skipped
+
+        :return:  True if features were activated
+        """
+        features = [(register, bytes(value)) for register, value in values
+                    if register in (Rfm75Registers.FEATURE, Rfm75Registers.DYNPD) and any(value)]
+        with self.__lock:
+            if all(self.__read_from_chip(register) == value for register, value in features):
+                return False
+            logging.debug("Features are not active, activating them to write FEATURE and DYNPD")
+            with self.batch():
+                self.send_command(Rfm75Command.ACTIVATE_FEATURES)
+                for register, value in features:
+                    self.write_register(register, value)
+            return True
+
+    def __read_from_chip(self, register: Rfm75Register) -> bytearray:
         self.set_bank_number(register.bank)
-        reg_write = register.addr | Rfm75Command.WRITE
-        self.__port.write(reg_write.to_bytes(1, 'little'), True, False)
-        self.__port.exchange(values, 0, False, True)
-        reg = self.__port.exchange([register.addr], register.size)
+        reg = self.__exchange([register.addr], register.size)
+        if self.__is_cacheable(register):
+            self.__cache[register] = bytes(reg)
         return reg
+
+    def __write_frame(self, frame: Iterable[int]):
+        if self.__batch is not None:
+            self.__batch._queue(frame)
+        else:
+            self.__port.write(frame, True, True)
+            if self.metrics is not None:
+                self.metrics.count_spi(len(frame), 0, False)
+
+    def __exchange_frames(self, frames: list) -> list:
+        """Full duplex exchange of several frames, in single USB transfer when sequencer is set"""
+        if self.__sequencer is not None:
+            received = self.__sequencer.exchange_frames(frames)
+            if self.metrics is not None:
+                nbytes = sum(len(frame) for frame in frames)
+                self.metrics.count_spi(nbytes, nbytes, True)
+            return received
+        received = []
+        for frame in frames:
+            received.append(self.__port.exchange(frame, len(frame), True, True, True))
+            if self.metrics is not None:
+                self.metrics.count_spi(len(frame), len(frame), True)
+        return received
+
+    def __exchange(self, out: Iterable[int], readlen: int) -> bytearray:
+        reg, cmd_len = self.__transfer(out, readlen)
+        return reg[cmd_len:]
+
+    def __transfer(self, out: Iterable[int], readlen: int) -> tuple:
+        """Full duplex exchange, STATUS clocked out on first byte is harvested for free.
+        Return whole received frame and command length"""
+        self.flush()
+        frame = bytearray(out)
+        cmd_len = len(frame)
+        frame.extend(bytes(readlen))
+        reg = self.__port.exchange(frame, len(frame), True, True, True)
+        if self.metrics is not None:
+            self.metrics.count_spi(len(frame), len(frame), True)
+        self.__status = Rfm75Status(reg[0], monotonic())
+        if not self.__paranoid:
+            self.__bank = self.__status.bank
+        return reg, cmd_len
+
+    def __is_cacheable(self, register: Rfm75Register) -> bool:
+        return self.__use_cache and register not in Rfm75Registers.VOLATILE
+
+    def __update_cache(self, register: Rfm75Register, values: bytearray) -> bytes:
+        """Apply written values to cached register image.
+        Chip updates only first bytes of register when less bytes than register size written,
+        so partial write could be applied only on top of already cached value."""
+        values = bytes(values)
+        if len(values) == register.size:
+            self.__cache[register] = values
+        elif register in self.__cache:
+            self.__cache[register] = values + self.__cache[register][len(values):]
+        return self.__cache.get(register)
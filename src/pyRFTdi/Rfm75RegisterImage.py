@@ -0,0 +1,44 @@
+from collections import namedtuple
+
+from pyRFTdi.Rfm75Registers import Rfm75Register
+
+
+class Rfm75RegisterImage(namedtuple("Rfm75RegisterImage", "values timestamp")):
+    """Immutable image of module registers taken by Rfm75RegisterController.snapshot()
+
+    :param values: tuple of (Rfm75Register, bytes) pairs ordered by bank and address
+    :param timestamp: float time.monotonic() when image was taken
+    """
+    __slots__ = ()
+
+    @property
+    def registers(self) -> list:
+        """Registers contained in image"""
+        return [register for register, _ in self.values]
+
+    def get(self, register: Rfm75Register) -> bytes:
+        """Register value, None if register is not in image"""
+        for image_register, value in self.values:
+            if image_register == register:
+                return value
+        return None
+
+    def as_dict(self) -> dict:
+        """Image as dict with Rfm75Register as key and bytes as value"""
+        return dict(self.values)
+
+    def diff(self, other: "Rfm75RegisterImage", registers: list = None) -> dict:
+        """Compare image with other one, e.g. misbehaving radio with known-good one
+
+        :param other: Rfm75RegisterImage to compare with
+        :param registers: list of Rfm75Register to compare, all registers of both images if not set
+
+        :return:  dict with Rfm75Register as key and (value in this image, value in other image) as value
+                  for every register which differs. Missing value is None
+        """
+        mine = self.as_dict()
+        theirs = other.as_dict()
+        if registers is None:
+            registers = sorted(set(mine) | set(theirs), key=lambda register: (register.bank, register.addr))
+        return {register: (mine.get(register), theirs.get(register)) for register in registers
+                if mine.get(register) != theirs.get(register)}
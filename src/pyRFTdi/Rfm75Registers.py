@@ -27,6 +27,7 @@ class Rfm75Registers:
     RX_PW_P3 = Rfm75Register(0, 0x14, 1)
     RX_PW_P4 = Rfm75Register(0, 0x15, 1)
     RX_PW_P5 = Rfm75Register(0, 0x16, 1)
+    FIFO_STATUS = Rfm75Register(0, 0x17, 1)
 
     DYNPD = Rfm75Register(0, 0x1C, 1)
     FEATURE = Rfm75Register(0, 0x1D, 1)
@@ -42,3 +43,13 @@ class Rfm75Registers:
     B1_REG_0C = Rfm75Register(1, 0x0C, 4)
     B1_REG_0D = Rfm75Register(1, 0x0D, 4)
     B1_REG_0E = Rfm75Register(1, 0x0E, 11)
+
+    # Registers which are changed by chip itself and must never be served from cache
+    VOLATILE = (STATUS, OBSERVE_TX, CD, FIFO_STATUS, B1_STATUS)
+    # Registers which could not be written
+    READ_ONLY = (OBSERVE_TX, CD, FIFO_STATUS, B1_STATUS, B1_CHIP_ID)
+
+    @classmethod
+    def all(cls) -> list:
+        """Return all known registers of both banks in definition order"""
+        return [value for value in vars(cls).values() if isinstance(value, Rfm75Register)]
@@ -0,0 +1,163 @@
+import logging
+from threading import RLock
+
+from pyftdi.spi import SpiController, SpiPort
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+
+
+class Rfm75SpiBus:
+    """Share single FTDI SPI controller between several RFM75 modules, each with own chip select and CE pin.
+
+    Radios opened with open_radio() get SPI port and GPIO proxies which serialise access through
+    bus lock, so every SPI transaction and GPIO change of one radio is atomic against the others,
+    while operations of different radios interleave. Radio could hold the bus for sequence of
+    operations with exclusive().
+
+    GPIO output state is shared by all radios and every radio changes only pins it owns,
+    so CE change of one radio does not touch CE of the other.
+
+    Usage::
+
+        ftdi_ctrl = SpiController(cs_count=2)
+        ftdi_ctrl.configure(FTDI_URL)
+        bus = Rfm75SpiBus(ftdi_ctrl)
+        rx_controller = bus.open_radio(cs=0, ce_pin=6)
+        tx_controller = bus.open_radio(cs=1, ce_pin=7)
+
+    MPSSE sequencer is not supported for radios on shared bus, as it writes GPIO state directly.
+    """
+
+    def __init__(self, spi_controller: SpiController):
+        """Constructor
+
+        :param spi_controller: SpiController configured with cs_count matching number of radios
+        """
+        self._spi_controller = spi_controller
+        self._gpio = spi_controller.get_gpio()
+        self.lock = RLock()
+        self.__owners = {}  # pin number -> radio name
+        self.__chip_selects = {}  # cs -> radio name
+        self.__gpio_out = self._gpio.read(with_output=True) & self._gpio.direction
+        self.transactions = {}  # radio name -> number of SPI transactions and GPIO accesses
+
+    def exclusive(self) -> RLock:
+        """Hold the bus for sequence of operations, other radios wait until it is released
+
+        Usage::
+
+            with bus.exclusive():
+                tx_controller.write_tx_payload(payload)
+
+        :return:  bus lock to be used as context manager
+        """
+        return self.lock
+
+    def open_radio(self, cs: int, ce_pin: int, irq_pin: int = None, freq: float = 8E6,
+                   use_cache: bool = True, name: str = None, **kwargs) -> FtdiRfm75Controller:
+        """Create controller for radio connected to given chip select
+
+        :param cs: int Chip select number, must be below cs_count of SpiController
+        :param ce_pin: int GPIO pin number for CE pin of this radio
+        :param irq_pin: int GPIO pin number wired to IRQ pin of this radio
+        :param freq: float SPI clock frequency in Hz
+        :param use_cache: bool Enable register cache, see Rfm75RegisterController
+        :param name: str Radio name used in transaction statistics, "cs<N>" if not set
+        :param kwargs: other FtdiRfm75Controller constructor parameters
+
+        :return:  FtdiRfm75Controller
+        """
+        if kwargs.get("sequencer") is not None:
+            raise RuntimeError("MPSSE sequencer is not supported on shared bus")
+        name = name or "cs{}".format(cs)
+        pins = [pin for pin in (ce_pin, irq_pin) if pin is not None]
+        with self.lock:
+            if cs in self.__chip_selects:
+                raise RuntimeError("Chip select {} is already used by {}".format(cs, self.__chip_selects[cs]))
+            for pin in pins:
+                if pin in self.__owners:
+                    raise RuntimeError("Pin {} is already used by {}".format(pin, self.__owners[pin]))
+            self.__chip_selects[cs] = name
+            for pin in pins:
+                self.__owners[pin] = name
+            self.transactions[name] = 0
+            port = Rfm75BusPort(self, self._spi_controller.get_port(cs=cs, freq=freq, mode=0), name)
+            gpio = Rfm75BusGpio(self, sum(1 << pin for pin in pins), name)
+            reg_controller = Rfm75RegisterController(port, use_cache=use_cache)
+            logging.info("Radio {} opened on CS{}, CE pin {}".format(name, cs, ce_pin))
+            return FtdiRfm75Controller(port, gpio, ce_pin, reg_controller, irq_pin=irq_pin, **kwargs)
+
+    def _count(self, name: str):
+        self.transactions[name] += 1
+
+    def _gpio_read(self, with_output: bool) -> int:
+        return self._gpio.read(with_output)
+
+    def _gpio_write(self, value: int, owned: int):
+        self.__gpio_out = (self.__gpio_out & ~owned) | (value & owned)
+        self._gpio.write(self.__gpio_out)
+
+    def _gpio_set_direction(self, pins: int, direction: int, owned: int):
+        if pins & ~owned:
+            raise RuntimeError("Pins 0x{:04X} are not owned by radio".format(pins & ~owned))
+        self._gpio.set_direction(pins, direction)
+        self.__gpio_out &= self._gpio.direction
+
+    @property
+    def gpio_direction(self) -> int:
+        return self._gpio.direction
+
+
+class Rfm75BusPort:
+    """SpiPort proxy which serialises transactions of one radio on Rfm75SpiBus"""
+
+    def __init__(self, bus: Rfm75SpiBus, port: SpiPort, name: str):
+        self._bus = bus
+        self._port = port
+        self.name = name
+
+    def exchange(self, out=b'', readlen: int = 0, start: bool = True, stop: bool = True,
+                 duplex: bool = False, droptail: int = 0) -> bytes:
+        with self._bus.lock:
+            self._bus._count(self.name)
+            return self._port.exchange(out, readlen, start, stop, duplex, droptail)
+
+    def write(self, out, start: bool = True, stop: bool = True, droptail: int = 0):
+        with self._bus.lock:
+            self._bus._count(self.name)
+            return self._port.write(out, start, stop, droptail)
+
+    def read(self, readlen: int = 0, start: bool = True, stop: bool = True, droptail: int = 0) -> bytes:
+        with self._bus.lock:
+            self._bus._count(self.name)
+            return self._port.read(readlen, start, stop, droptail)
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+
+class Rfm75BusGpio:
+    """SpiGpioPort proxy which lets one radio on Rfm75SpiBus change only pins it owns"""
+
+    def __init__(self, bus: Rfm75SpiBus, owned: int, name: str):
+        self._bus = bus
+        self._owned = owned
+        self.name = name
+
+    @property
+    def direction(self) -> int:
+        return self._bus.gpio_direction
+
+    def read(self, with_output: bool = False) -> int:
+        with self._bus.lock:
+            self._bus._count(self.name)
+            return self._bus._gpio_read(with_output)
+
+    def write(self, value: int):
+        with self._bus.lock:
+            self._bus._count(self.name)
+            self._bus._gpio_write(value, self._owned)
+
+    def set_direction(self, pins: int, direction: int):
+        with self._bus.lock:
+            self._bus._gpio_set_direction(pins, direction, self._owned)
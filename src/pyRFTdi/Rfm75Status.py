@@ -0,0 +1,47 @@
+from collections import namedtuple
+
+
+class Rfm75Status(namedtuple("Rfm75Status", "value timestamp")):
+    """STATUS register value clocked out by module on first byte of SPI transaction
+
+    :param value: int raw STATUS register value
+    :param timestamp: float time.monotonic() when value was captured
+    """
+    __slots__ = ()
+
+    RX_P_NO_EMPTY = 0b111
+
+    @property
+    def rx_dr(self) -> bool:
+        """Data ready in RX FIFO"""
+        return (self.value & (1 << 6)) > 0
+
+    @property
+    def tx_ds(self) -> bool:
+        """Data sent. In AA mode set only when ACK received"""
+        return (self.value & (1 << 5)) > 0
+
+    @property
+    def max_rt(self) -> bool:
+        """Maximum number of retransmits reached"""
+        return (self.value & (1 << 4)) > 0
+
+    @property
+    def rx_p_no(self) -> int:
+        """Pipe number of payload available in RX FIFO, 0b111 when RX FIFO is empty"""
+        return (self.value >> 1) & 0b111
+
+    @property
+    def rx_empty(self) -> bool:
+        """RX FIFO empty"""
+        return self.rx_p_no == self.RX_P_NO_EMPTY
+
+    @property
+    def tx_full(self) -> bool:
+        """TX FIFO full"""
+        return (self.value & 1) > 0
+
+    @property
+    def bank(self) -> int:
+        """Active register bank"""
+        return (self.value >> 7) & 1
@@ -0,0 +1,78 @@
+from threading import RLock
+from time import monotonic
+
+from pyRFTdi.Rfm75LockStats import Rfm75LockStats
+
+
+class Rfm75TimedLock:
+    """Reentrant lock which measures contention, wait and hold time.
+
+    Usage::
+
+        lock = Rfm75TimedLock("wire")
+        with lock:
+            ...
+        print(lock.stats())
+    """
+
+    def __init__(self, name: str = None):
+        """Constructor
+
+        :param name: str Lock name used in reports
+        """
+        self.name = name
+        self.__lock = RLock()
+        self.__depth = 0  # Changed only by owner thread
+        self.__acquired_at = 0.0
+        self.reset()
+
+    def acquire(self, blocking: bool = True, timeout: float = -1) -> bool:
+        """Acquire lock, see threading.RLock.acquire()
+
+        :return:  True if lock acquired
+        """
+        start = monotonic()
+        contended = not self.__lock.acquire(False)
+        if contended and (not blocking or not self.__lock.acquire(True, timeout)):
+            return False
+        self.__depth += 1
+        if self.__depth == 1:
+            now = monotonic()
+            self.__acquired_at = now
+            self.__acquisitions += 1
+            if contended:
+                self.__contended += 1
+                self.__wait_time += now - start
+        return True
+
+    def release(self):
+        if self.__depth == 1:
+            held = monotonic() - self.__acquired_at
+            self.__held_time += held
+            self.__max_held_time = max(self.__max_held_time, held)
+        self.__depth -= 1
+        self.__lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
+
+    def stats(self) -> Rfm75LockStats:
+        """Get lock usage statistics
+
+        :return:  Rfm75LockStats
+        """
+        return Rfm75LockStats(self.__acquisitions, self.__contended, self.__wait_time,
+                              self.__held_time, self.__max_held_time)
+
+    def reset(self):
+        """Reset lock usage statistics"""
+        self.__acquisitions = 0
+        self.__contended = 0
+        self.__wait_time = 0.0
+        self.__held_time = 0.0
+        self.__max_held_time = 0.0
@@ -0,0 +1,138 @@
+from pyRFTdi.Rfm75Enums import Rfm75Command, Rfm75TraceKind
+from pyRFTdi.Rfm75Registers import Rfm75Register, Rfm75Registers
+from pyRFTdi.Rfm75TraceEntry import Rfm75TraceEntry
+from pyRFTdi.Rfm75TraceRecorder import Rfm75TraceRecorder
+
+
+class Rfm75TraceDecoder:
+    """Decode trace entries into RFM75 commands with register names and attribute time to them.
+
+    Active bank is taken from STATUS clocked out on first byte of every full duplex exchange and
+    tracked over bank switches in between, so register names are resolved in correct bank.
+    Every port call is decoded on its own, chip select framing is not reassembled.
+
+    Usage::
+
+        decoder = Rfm75TraceDecoder(ce_pin=7)
+        for entry in Rfm75TraceReplayer("radio.trace"):
+            print(decoder.format(entry))
+        print(decoder.format_profile())
+    """
+
+    COMMANDS = {
+        Rfm75Command.R_RX_PL_WID: "R_RX_PL_WID",
+        Rfm75Command.R_RX_PAYLOAD: "R_RX_PAYLOAD",
+        Rfm75Command.W_TX_PAYLOAD: "W_TX_PAYLOAD",
+        Rfm75Command.W_TX_PAYLOAD_NO_ACK: "W_TX_PAYLOAD_NO_ACK",
+        Rfm75Command.FLUSH_TX: "FLUSH_TX",
+        Rfm75Command.FLUSH_RX: "FLUSH_RX",
+        0xE3: "REUSE_TX_PL",
+        Rfm75Command.NOP: "NOP"
+    }
+    W_ACK_PAYLOAD = 0xA8
+    ACTIVATE = 0x50
+    ACTIVATE_BANK = 0x53
+
+    def __init__(self, ce_pin: int = None, irq_pin: int = None):
+        """Constructor
+
+        :param ce_pin: int GPIO pin number wired to CE, its level is shown for GPIO writes
+        :param irq_pin: int GPIO pin number wired to IRQ, its state is shown for GPIO reads
+        """
+        self._ce_pin = ce_pin
+        self._irq_pin = irq_pin
+        self._names = {(register.bank, register.addr): name for name, register in vars(Rfm75Registers).items()
+                       if isinstance(register, Rfm75Register)}
+        self.__bank = None  # Active bank, None until first STATUS seen
+        self.__profile = {}  # operation -> [count, total duration]
+
+    def decode(self, entry: Rfm75TraceEntry) -> tuple:
+        """Decode single trace entry and account its duration
+
+        :return:  tuple of operation name (e.g. "R_REGISTER RF_SETUP") and details text
+        """
+        if entry.kind == Rfm75TraceKind.SPI_EXCHANGE and entry.flags & Rfm75TraceRecorder.DUPLEX \
+                and entry.flags & Rfm75TraceRecorder.START and entry.received:
+            self.__bank = entry.received[0] >> 7
+            operation, details = self.__decode_command(entry.out, entry.received[1:])
+            details = "STATUS={:02x} {}".format(entry.received[0], details)
+        elif entry.kind in (Rfm75TraceKind.SPI_EXCHANGE, Rfm75TraceKind.SPI_WRITE, Rfm75TraceKind.SPI_READ):
+            operation, details = self.__decode_command(entry.out, entry.received)
+        else:
+            operation, details = self.__decode_gpio(entry)
+        if entry.flags & Rfm75TraceRecorder.ERROR:
+            details += " FAILED"
+        stats = self.__profile.setdefault(operation, [0, 0.0])
+        stats[0] += 1
+        stats[1] += entry.duration
+        return operation, details
+
+    def format(self, entry: Rfm75TraceEntry) -> str:
+        """Decode entry into single line with timestamp and duration"""
+        operation, details = self.decode(entry)
+        return "{:12.6f} {:8.1f}us {} {}".format(entry.timestamp, entry.duration * 1E6, operation, details).rstrip()
+
+    def profile(self) -> dict:
+        """Time attributed to every decoded operation
+
+        :return:  dict with operation name as key and (count, total duration in seconds) as value
+        """
+        return {operation: tuple(stats) for operation, stats in self.__profile.items()}
+
+    def format_profile(self) -> str:
+        """Profile as text table sorted by total time"""
+        total = sum(duration for _, duration in self.__profile.values()) or 1.0
+        lines = ["{:<32} {:>8} {:>12} {:>10} {:>6}".format("operation", "count", "total ms", "avg us", "%")]
+        for operation, (count, duration) in sorted(self.__profile.items(), key=lambda item: -item[1][1]):
+            lines.append("{:<32} {:>8} {:>12.3f} {:>10.1f} {:>6.1f}".format(
+                operation, count, duration * 1000, duration / count * 1E6, duration / total * 100))
+        return "\n".join(lines)
+
+    def __register_name(self, addr: int) -> str:
+        if self.__bank is None:
+            return self._names.get((0, addr), "0x{:02X}".format(addr)) + "(bank?)"
+        return self._names.get((self.__bank, addr), "B{}_0x{:02X}".format(self.__bank, addr))
+
+    def __decode_command(self, out: bytes, received: bytes) -> tuple:
+        if not out:
+            return "SPI_READ", received.hex()
+        command = out[0]
+        data = out[1:]
+        if command < Rfm75Command.WRITE:
+            return "R_REGISTER {}".format(self.__register_name(command)), "-> {}".format(received.hex())
+        if command < Rfm75Command.WRITE + 0x20:
+            return "W_REGISTER {}".format(self.__register_name(command & 0x1F)), "<- {}".format(data.hex())
+        if command == self.ACTIVATE and data:
+            if data[0] == self.ACTIVATE_BANK:
+                if self.__bank is not None:
+                    self.__bank ^= 1
+                return "ACTIVATE BANK", "-> bank {}".format("?" if self.__bank is None else self.__bank)
+            return "ACTIVATE FEATURES", ""
+        if self.W_ACK_PAYLOAD <= command <= self.W_ACK_PAYLOAD + 5:
+            return "W_ACK_PAYLOAD", "pipe {} <- {}".format(command - self.W_ACK_PAYLOAD, data.hex())
+        name = self.COMMANDS.get(command)
+        if name is None:
+            return "UNKNOWN 0x{:02X}".format(command), "<- {} -> {}".format(data.hex(), received.hex())
+        if data:
+            return name, "<- {}".format(data.hex())
+        return name, "-> {}".format(received.hex()) if received else ""
+
+    def __decode_gpio(self, entry: Rfm75TraceEntry) -> tuple:
+        if entry.kind == Rfm75TraceKind.GPIO_DIRECTION:
+            pins, direction = Rfm75TraceRecorder.GPIO_DIRECTION.unpack(entry.out)
+            return "GPIO_DIRECTION", "pins {:04x} output {:04x}".format(pins, direction)
+        if entry.kind == Rfm75TraceKind.GPIO_WRITE:
+            value = Rfm75TraceRecorder.GPIO_VALUE.unpack(entry.out)[0]
+            details = "<- {:04x}".format(value)
+            if self._ce_pin is not None:
+                details += " CE={}".format((value >> self._ce_pin) & 1)
+            return "GPIO_WRITE", details
+        if entry.kind == Rfm75TraceKind.GPIO_READ:
+            if not entry.received:
+                return "GPIO_READ", ""
+            value = Rfm75TraceRecorder.GPIO_VALUE.unpack(entry.received)[0]
+            details = "-> {:04x}".format(value)
+            if self._irq_pin is not None:
+                details += " IRQ={}".format("active" if not value & (1 << self._irq_pin) else "idle")
+            return "GPIO_READ", details
+        return "UNKNOWN KIND {}".format(entry.kind), ""
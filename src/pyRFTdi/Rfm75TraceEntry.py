@@ -0,0 +1,10 @@
+from collections import namedtuple
+
+# Single SPI or GPIO port call recorded by Rfm75TraceRecorder
+# kind: Rfm75TraceKind of call
+# flags: Rfm75TraceRecorder.START/STOP/DUPLEX/WITH_OUTPUT/ERROR bits
+# timestamp: time in seconds from start of recording when call was made
+# duration: time in seconds call took
+# out: bytes sent to module. GPIO value for GPIO_WRITE, pins and direction for GPIO_DIRECTION, 2 bytes little endian each
+# received: bytes returned by module. GPIO value for GPIO_READ, 2 bytes little endian
+Rfm75TraceEntry = namedtuple("Rfm75TraceEntry", "kind flags timestamp duration out received")
@@ -0,0 +1,210 @@
+import struct
+from threading import Lock, local
+from time import monotonic
+
+from pyRFTdi.Rfm75Enums import Rfm75TraceKind
+
+
+class Rfm75TraceRecorder:
+    """Record every SPI and GPIO port call into compact binary trace file.
+
+    Ports returned by wrap_port() and wrap_gpio() are passed to controllers instead of original ones,
+    every call is written as single record: kind, chip select framing flags, timestamp and duration
+    in nanoseconds since start of recording, bytes sent and bytes received. Failed calls are
+    recorded with ERROR flag. Records are appended to buffered file, so recording costs one
+    struct.pack and buffer copy per USB transaction.
+
+    Usage::
+
+        recorder = Rfm75TraceRecorder("radio.trace")
+        port = recorder.wrap_port(ftdi_ctrl.get_port(cs=0, freq=8E6))
+        gpio = recorder.wrap_gpio(ftdi_ctrl.get_gpio())
+        reg_controller = Rfm75RegisterController(port, use_cache=True)
+        controller = FtdiRfm75Controller(port, gpio, CE_PIN, reg_controller)
+        ...
+        recorder.close()
+
+    Trace is read back with Rfm75TraceReplayer and decoded with Rfm75TraceDecoder.
+    Rfm75Emulator recorded with clock=recorder.clock sees the same time as emulator replayed with
+    clock=replayer.clock, so replay of single threaded trace returns exactly recorded data.
+    Commands sent by Rfm75MpsseSequencer bypass SPI port and are not recorded.
+    """
+
+    MAGIC = b"RFM75TRC"
+    VERSION = 1
+    HEADER = struct.Struct("<8sB")
+    RECORD = struct.Struct("<BBQIHH")  # kind, flags, timestamp ns, duration ns, out length, received length
+    GPIO_VALUE = struct.Struct("<H")
+    GPIO_DIRECTION = struct.Struct("<HH")
+
+    START = 0x01  # Chip select asserted before transfer
+    STOP = 0x02  # Chip select released after transfer
+    DUPLEX = 0x04  # Received bytes were clocked out while sending
+    WITH_OUTPUT = 0x08  # GPIO read included output pins
+    ERROR = 0x10  # Port call raised exception, nothing received
+
+    def __init__(self, path: str, buffering: int = 65536):
+        """Constructor
+
+        :param path: str Trace file path, existing file is overwritten
+        :param buffering: int File buffer size in bytes
+        """
+        self.__file = open(path, "wb", buffering=buffering)
+        self.__file.write(self.HEADER.pack(self.MAGIC, self.VERSION))
+        self.__lock = Lock()
+        self.__call = local()  # Timestamp of port call in progress on this thread
+        self.__start = monotonic()
+        self.records = 0
+
+    def wrap_port(self, port):
+        """Wrap SpiPort, so its calls are recorded
+
+        :return:  Rfm75TracedSpiPort
+        """
+        return Rfm75TracedSpiPort(self, port)
+
+    def wrap_gpio(self, gpio):
+        """Wrap SpiGpioPort, so its calls are recorded. Current pin direction is recorded first
+
+        :return:  Rfm75TracedGpio
+        """
+        self.record(Rfm75TraceKind.GPIO_DIRECTION, 0, self.begin(),
+                    self.GPIO_DIRECTION.pack(0xFFFF, gpio.direction))
+        return Rfm75TracedGpio(self, gpio)
+
+    def clock(self) -> float:
+        """Time in seconds since start of recording, used as Rfm75Emulator clock.
+        Inside of port call it is recorded timestamp of that call, the same value replayer reports"""
+        timestamp = getattr(self.__call, "timestamp", None)
+        if timestamp is None:
+            return monotonic() - self.__start
+        return timestamp / 1E9
+
+    def begin(self) -> int:
+        """Mark start of port call on current thread, called by traced ports
+
+        :return:  int Call timestamp in nanoseconds since start of recording
+        """
+        self.__call.timestamp = int((monotonic() - self.__start) * 1E9)
+        return self.__call.timestamp
+
+    def record(self, kind: int, flags: int, timestamp: int, out=b'', received=b''):
+        """Append record to trace and end port call started by begin(), called by traced ports
+
+        :param timestamp: int Value returned by begin()
+        """
+        self.__call.timestamp = None
+        duration = int((monotonic() - self.__start) * 1E9) - timestamp
+        header = self.RECORD.pack(kind, flags, timestamp, min(duration, 0xFFFFFFFF), len(out), len(received))
+        with self.__lock:
+            self.__file.write(header)
+            self.__file.write(out)
+            self.__file.write(received)
+            self.records += 1
+
+    def flush(self):
+        """Write buffered records to file"""
+        with self.__lock:
+            self.__file.flush()
+
+    def close(self):
+        with self.__lock:
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class Rfm75TracedSpiPort:
+    """SpiPort proxy which records every transaction into Rfm75TraceRecorder"""
+
+    def __init__(self, recorder: Rfm75TraceRecorder, port):
+        self._recorder = recorder
+        self._port = port
+
+    def exchange(self, out=b'', readlen: int = 0, start: bool = True, stop: bool = True,
+                 duplex: bool = False, droptail: int = 0) -> bytes:
+        flags = self.__flags(start, stop) | (Rfm75TraceRecorder.DUPLEX if duplex else 0)
+        begin = self._recorder.begin()
+        try:
+            received = self._port.exchange(out, readlen, start, stop, duplex, droptail)
+        except Exception:
+            self._recorder.record(Rfm75TraceKind.SPI_EXCHANGE, flags | Rfm75TraceRecorder.ERROR, begin, bytes(out))
+            raise
+        self._recorder.record(Rfm75TraceKind.SPI_EXCHANGE, flags, begin, bytes(out), received)
+        return received
+
+    def write(self, out, start: bool = True, stop: bool = True, droptail: int = 0):
+        flags = self.__flags(start, stop)
+        begin = self._recorder.begin()
+        try:
+            result = self._port.write(out, start, stop, droptail)
+        except Exception:
+            flags |= Rfm75TraceRecorder.ERROR
+            raise
+        finally:
+            self._recorder.record(Rfm75TraceKind.SPI_WRITE, flags, begin, bytes(out))
+        return result
+
+    def read(self, readlen: int = 0, start: bool = True, stop: bool = True, droptail: int = 0) -> bytes:
+        flags = self.__flags(start, stop)
+        begin = self._recorder.begin()
+        try:
+            received = self._port.read(readlen, start, stop, droptail)
+        except Exception:
+            self._recorder.record(Rfm75TraceKind.SPI_READ, flags | Rfm75TraceRecorder.ERROR, begin)
+            raise
+        self._recorder.record(Rfm75TraceKind.SPI_READ, flags, begin, b'', received)
+        return received
+
+    def __getattr__(self, name):
+        return getattr(self._port, name)
+
+    @staticmethod
+    def __flags(start: bool, stop: bool) -> int:
+        return (Rfm75TraceRecorder.START if start else 0) | (Rfm75TraceRecorder.STOP if stop else 0)
+
+
+class Rfm75TracedGpio:
+    """SpiGpioPort proxy which records every GPIO access into Rfm75TraceRecorder"""
+
+    def __init__(self, recorder: Rfm75TraceRecorder, gpio):
+        self._recorder = recorder
+        self._gpio = gpio
+
+    @property
+    def direction(self) -> int:
+        return self._gpio.direction
+
+    def read(self, with_output: bool = False) -> int:
+        flags = Rfm75TraceRecorder.WITH_OUTPUT if with_output else 0
+        begin = self._recorder.begin()
+        try:
+            value = self._gpio.read(with_output)
+        except Exception:
+            self._recorder.record(Rfm75TraceKind.GPIO_READ, flags | Rfm75TraceRecorder.ERROR, begin)
+            raise
+        self._recorder.record(Rfm75TraceKind.GPIO_READ, flags, begin,
+                              b'', Rfm75TraceRecorder.GPIO_VALUE.pack(value))
+        return value
+
+    def write(self, value: int):
+        flags = 0
+        begin = self._recorder.begin()
+        try:
+            self._gpio.write(value)
+        except Exception:
+            flags |= Rfm75TraceRecorder.ERROR
+            raise
+        finally:
+            self._recorder.record(Rfm75TraceKind.GPIO_WRITE, flags, begin,
+                                  Rfm75TraceRecorder.GPIO_VALUE.pack(value))
+
+    def set_direction(self, pins: int, direction: int):
+        begin = self._recorder.begin()
+        self._gpio.set_direction(pins, direction)
+        self._recorder.record(Rfm75TraceKind.GPIO_DIRECTION, 0, begin,
+                              Rfm75TraceRecorder.GPIO_DIRECTION.pack(pins, direction))
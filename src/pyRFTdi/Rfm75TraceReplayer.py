@@ -0,0 +1,110 @@
+import logging
+from time import monotonic, sleep
+
+from pyRFTdi.Rfm75Enums import Rfm75TraceKind
+from pyRFTdi.Rfm75TraceEntry import Rfm75TraceEntry
+from pyRFTdi.Rfm75TraceRecorder import Rfm75TraceRecorder
+
+
+class Rfm75TraceReplayer:
+    """Read trace recorded by Rfm75TraceRecorder and feed it back into SPI and GPIO ports.
+
+    Replay against Rfm75Emulator is deterministic when emulator clock is driven by the trace,
+    so chip timing (PLL settling, airtime, retransmits) follows recorded timestamps
+    instead of replay speed. Emulator time is set to start timestamp of every recorded call,
+    so trace of emulator recorded with clock=recorder.clock is replayed without mismatches.
+
+    Usage::
+
+        replayer = Rfm75TraceReplayer("radio.trace")
+        emulator = Rfm75Emulator(clock=replayer.clock)
+        mismatches = replayer.replay(emulator.get_port(), emulator.get_gpio(ce_pin=7, irq_pin=6))
+    """
+
+    def __init__(self, path: str):
+        """Constructor
+
+        :param path: str Trace file path
+        """
+        self.path = path
+        self.__time = 0.0
+
+    def __iter__(self):
+        """Yield Rfm75TraceEntry for every record of trace"""
+        header_size = Rfm75TraceRecorder.HEADER.size
+        record_size = Rfm75TraceRecorder.RECORD.size
+        with open(self.path, "rb") as trace:
+            magic, version = Rfm75TraceRecorder.HEADER.unpack(trace.read(header_size))
+            if magic != Rfm75TraceRecorder.MAGIC or version != Rfm75TraceRecorder.VERSION:
+                raise RuntimeError("{} is not RFM75 trace version {}".format(self.path, Rfm75TraceRecorder.VERSION))
+            while True:
+                header = trace.read(record_size)
+                if len(header) < record_size:
+                    if header:
+                        logging.warning("Trace {} is truncated".format(self.path))
+                    return
+                kind, flags, timestamp, duration, out_len, received_len = Rfm75TraceRecorder.RECORD.unpack(header)
+                out = trace.read(out_len)
+                received = trace.read(received_len)
+                if len(out) + len(received) < out_len + received_len:
+                    logging.warning("Trace {} is truncated".format(self.path))
+                    return
+                yield Rfm75TraceEntry(kind, flags, timestamp / 1E9, duration / 1E9, out, received)
+
+    def clock(self) -> float:
+        """Time in seconds of trace entry being replayed, used as Rfm75Emulator clock"""
+        return self.__time
+
+    def replay(self, port, gpio=None, realtime: bool = False) -> list:
+        """Repeat every recorded call on given ports and compare returned data with recorded one.
+        Calls which failed during recording are skipped.
+
+        :param port: SpiPort to replay SPI transactions on, e.g. Rfm75EmulatedSpiPort
+        :param gpio: SpiGpioPort to replay GPIO accesses on, GPIO entries are skipped if not set
+        :param realtime: bool Keep recorded time between calls
+
+        :return:  list of (Rfm75TraceEntry, received) tuples for every call which returned different data
+        """
+        mismatches = []
+        start = monotonic()
+        for entry in self:
+            if entry.flags & Rfm75TraceRecorder.ERROR:
+                continue
+            self.__time = entry.timestamp
+            if realtime:
+                delay = entry.timestamp - (monotonic() - start)
+                if delay > 0:
+                    sleep(delay)
+            received = self.__call(entry, port, gpio)
+            if received is not None and received != entry.received:
+                mismatches.append((entry, received))
+        return mismatches
+
+    @staticmethod
+    def __call(entry: Rfm75TraceEntry, port, gpio) -> bytes:
+        """Repeat single call
+
+        :return:  bytes returned by port, None for calls which return nothing
+        """
+        start = bool(entry.flags & Rfm75TraceRecorder.START)
+        stop = bool(entry.flags & Rfm75TraceRecorder.STOP)
+        if entry.kind == Rfm75TraceKind.SPI_EXCHANGE:
+            duplex = bool(entry.flags & Rfm75TraceRecorder.DUPLEX)
+            return bytes(port.exchange(entry.out, len(entry.received), start, stop, duplex))
+        if entry.kind == Rfm75TraceKind.SPI_WRITE:
+            port.write(entry.out, start, stop)
+            return None
+        if entry.kind == Rfm75TraceKind.SPI_READ:
+            return bytes(port.read(len(entry.received), start, stop))
+        if gpio is None:
+            return None
+        if entry.kind == Rfm75TraceKind.GPIO_READ:
+            value = gpio.read(bool(entry.flags & Rfm75TraceRecorder.WITH_OUTPUT))
+            return Rfm75TraceRecorder.GPIO_VALUE.pack(value)
+        if entry.kind == Rfm75TraceKind.GPIO_WRITE:
+            gpio.write(Rfm75TraceRecorder.GPIO_VALUE.unpack(entry.out)[0])
+            return None
+        if entry.kind == Rfm75TraceKind.GPIO_DIRECTION:
+            gpio.set_direction(*Rfm75TraceRecorder.GPIO_DIRECTION.unpack(entry.out))
+            return None
+        raise RuntimeError("Unknown trace entry kind {}".format(entry.kind))
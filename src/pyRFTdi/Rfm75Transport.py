@@ -0,0 +1,208 @@
+import logging
+import struct
+from collections import namedtuple, OrderedDict
+from time import monotonic
+
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Enums import Rfm75TxOutcome
+from pyRFTdi.Rfm75Packet import Rfm75Packet
+from pyRFTdi.Rfm75TxStream import Rfm75TxStream
+
+# Frame header: sender id, message id, frame index, frame count, data length in frame
+FRAME_HEADER = struct.Struct("<BBHHB")
+
+
+class Rfm75TransferStats(namedtuple("Rfm75TransferStats", "bytes frames retries failed elapsed")):
+    """Statistics of single message transfer
+
+    :param bytes: int Message length
+    :param frames: int Number of frames message was split into
+    :param retries: int Number of frames written again after MAX_RT or timeout
+    :param failed: int Number of frames which were not delivered after all retries
+    :param elapsed: float Transfer time in seconds
+    """
+    __slots__ = ()
+
+    @property
+    def throughput(self) -> float:
+        """Message bytes per second"""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class Rfm75Reassembler:
+    """Reassemble messages from frames received from several senders.
+
+    Partially received messages are kept in bounded per-sender buffers and evicted
+    when no frame received for timeout seconds or when buffer limits are reached.
+    """
+
+    def __init__(self, max_senders: int = 8, max_message_size: int = 1 << 20, timeout: float = 5.0):
+        """Constructor
+
+        :param max_senders: int Max number of senders with incomplete message, oldest one evicted above it
+        :param max_message_size: int Max message size in bytes, longer messages are dropped
+        :param timeout: float Time in seconds after which incomplete message is evicted
+        """
+        self._max_senders = max_senders
+        self._max_message_size = max_message_size
+        self._timeout = timeout
+        self.__partials = OrderedDict()  # (pipe, sender) -> [msg_id, count, frames, last_update]
+        self.__completed = {}  # (pipe, sender) -> last completed msg_id, to drop late duplicates
+        self.evicted = 0
+        self.dropped = 0
+
+    def feed(self, packet: Rfm75Packet) -> bytes:
+        """Process received frame
+
+        :param packet: Rfm75Packet with frame
+
+        :return:  complete message as bytes, None if message is not complete yet
+        """
+        now = monotonic()
+        self.__evict_expired(now)
+        if len(packet.payload) < FRAME_HEADER.size:
+            self.dropped += 1
+            return None
+        sender, msg_id, index, count, length = FRAME_HEADER.unpack_from(packet.payload)
+        data = bytes(packet.payload[FRAME_HEADER.size:FRAME_HEADER.size + length])
+        key = (packet.pipe, sender)
+        if index >= count or self.__completed.get(key) == msg_id:
+            self.dropped += 1
+            return None
+
+        partial = self.__partials.get(key)
+        if partial is not None and partial[0] != msg_id:
+            logging.debug("Incomplete message {} from {} replaced".format(partial[0], key))
+            del self.__partials[key]
+            self.evicted += 1
+            partial = None
+        if partial is None:
+            if count * (len(packet.payload) - FRAME_HEADER.size) > self._max_message_size:
+                self.dropped += 1
+                return None
+            if len(self.__partials) >= self._max_senders:
+                self.__partials.popitem(last=False)
+                self.evicted += 1
+            partial = [msg_id, count, {}, now]
+            self.__partials[key] = partial
+
+        frames = partial[2]
+        frames.setdefault(index, data)
+        partial[3] = now
+        self.__partials.move_to_end(key)
+        if len(frames) < count:
+            return None
+        del self.__partials[key]
+        self.__completed[key] = msg_id
+        return b"".join(frames[i] for i in range(count))
+
+    def __evict_expired(self, now: float):
+        while self.__partials:
+            key, partial = next(iter(self.__partials.items()))
+            if now - partial[3] <= self._timeout:
+                break
+            logging.debug("Incomplete message {} from {} evicted".format(partial[0], key))
+            del self.__partials[key]
+            self.evicted += 1
+
+
+class Rfm75Transport:
+    """Send arbitrary length messages split into sequenced frames and reassemble them on RX side.
+
+    TX side streams frames with Rfm75TxStream and writes frames lost on MAX_RT again.
+    RX side passes received packets to feed().
+
+    Usage::
+
+        transport = Rfm75Transport(tx_controller, sender_id=1)
+        stats = transport.send_message(firmware)
+        print("{:.0f} B/s".format(stats.throughput))
+
+        for packet in receiver:
+            message = rx_transport.feed(packet)
+    """
+
+    def __init__(self, controller: FtdiRfm75Controller, sender_id: int = 0, frame_size: int = 32,
+                 ack: bool = True, retries: int = 3, pad: bool = False,
+                 reassembler: Rfm75Reassembler = None):
+        """Constructor
+
+        :param controller: FtdiRfm75Controller used to send frames
+        :param sender_id: int Sender id in range 0-255, used by receiver to separate messages
+        :param frame_size: int Frame size in bytes, must not exceed 32
+        :param ack: bool Send frames with W_TX_PAYLOAD, see Rfm75TxStream
+        :param retries: int How many times frames lost on MAX_RT or timeout are sent again
+        :param pad: bool Pad every frame to frame_size, required for static payload width
+        :param reassembler: Rfm75Reassembler used by feed(), created with defaults if not set
+        """
+        if(frame_size <= FRAME_HEADER.size or frame_size > FtdiRfm75Controller.MAX_PAYLOAD_LEN):
+            raise RuntimeError("Wrong frame size {}. Allowed values {}-{}".format(
+                frame_size, FRAME_HEADER.size + 1, FtdiRfm75Controller.MAX_PAYLOAD_LEN))
+        self._controller = controller
+        self._sender_id = sender_id
+        self._frame_size = frame_size
+        self._ack = ack
+        self._retries = retries
+        self._pad = pad
+        self._reassembler = reassembler or Rfm75Reassembler()
+        self.__msg_id = 0
+
+    @property
+    def frame_data_size(self) -> int:
+        """Message bytes carried by single frame"""
+        return self._frame_size - FRAME_HEADER.size
+
+    def split(self, data: bytes) -> list:
+        """Split message into frames
+
+        :param data: message bytes
+
+        :return:  list of frames as bytearray
+        """
+        chunk = self.frame_data_size
+        count = max(1, (len(data) + chunk - 1) // chunk)
+        if count > 0xFFFF:
+            raise RuntimeError("Message of {} bytes is too long".format(len(data)))
+        msg_id = self.__msg_id
+        self.__msg_id = (self.__msg_id + 1) & 0xFF
+        frames = []
+        for index in range(count):
+            part = data[index * chunk:(index + 1) * chunk]
+            frame = bytearray(FRAME_HEADER.pack(self._sender_id, msg_id, index, count, len(part)))
+            frame.extend(part)
+            if self._pad:
+                frame.extend(bytes(self._frame_size - len(frame)))
+            frames.append(frame)
+        return frames
+
+    def send_message(self, data: bytes) -> Rfm75TransferStats:
+        """Send message. Module must be configured for TX and powered up
+
+        :param data: message bytes
+
+        :return:  Rfm75TransferStats, failed is above zero if some frames were not delivered
+        """
+        start = monotonic()
+        frames = self.split(data)
+        todo = list(range(len(frames)))
+        retries = 0
+        for attempt in range(self._retries + 1):
+            stream = Rfm75TxStream(self._controller, self._ack)
+            failed = [todo[index] for index, outcome in stream.send(frames[i] for i in todo)
+                      if outcome != Rfm75TxOutcome.SENT]
+            if not failed:
+                todo = []
+                break
+            if attempt < self._retries:
+                retries += len(failed)
+            todo = sorted(failed)
+        if todo:
+            logging.warning("{} of {} frames were not delivered".format(len(todo), len(frames)))
+        return Rfm75TransferStats(len(data), len(frames), retries, len(todo), monotonic() - start)
+
+    def feed(self, packet: Rfm75Packet) -> bytes:
+        """Process received frame, see Rfm75Reassembler.feed()
+
+        :return:  complete message as bytes, None if message is not complete yet
+        """
+        return self._reassembler.feed(packet)
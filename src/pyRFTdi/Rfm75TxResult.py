@@ -0,0 +1,7 @@
+from collections import namedtuple
+
+# Result of single packet transmission
+# outcome: Rfm75TxOutcome
+# retransmits: number of retransmits done, ARC_CNT from OBSERVE_TX
+# elapsed: time in seconds from payload write to TX_DS/MAX_RT/timeout
+Rfm75TxResult = namedtuple("Rfm75TxResult", "outcome retransmits elapsed")
@@ -0,0 +1,156 @@
+import logging
+from collections import deque
+from time import monotonic, sleep
+
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Enums import Rfm75TxOutcome
+
+
+class Rfm75TxStream:
+    """Continuous transmit mode which keeps CE high and tops up 3-deep TX FIFO whenever it has room.
+
+    Every poll costs single FIFO_STATUS read, STATUS is harvested from the same transaction.
+    Polls are done every poll_interval of controller, when IRQ pin is configured FIFO_STATUS is
+    read only after TX_DS or MAX_RT asserted it.
+    TX_DS and MAX_RT are reported per packet and do not stop the stream: packet which reached
+    MAX_RT is dropped, packets queued behind it are written again.
+
+    FIFO_STATUS tells only empty and full TX FIFO, so packet is reported SENT once it surely left
+    FIFO: partially filled FIFO is assumed to hold two packets and TX_DS, which could stand for
+    several packets, is not counted. Reports could be delayed, but are never ahead of the chip.
+    MAX_RT stops transmission, so FIFO content is stable and packet which failed is found exactly.
+
+    Module must be configured for TX mode and powered up.
+
+    Usage::
+
+        stream = Rfm75TxStream(controller, ack=True)
+        for index, outcome in stream.send(payloads):
+            if outcome != Rfm75TxOutcome.SENT:
+                print("packet {} lost".format(index))
+    """
+
+    TX_FIFO_DEPTH = 3
+    FIFO_TX_EMPTY = 1 << 4
+    FIFO_TX_FULL = 1 << 5
+    STATUS_TX_DS = 1 << 5
+    STATUS_MAX_RT = 1 << 4
+
+    def __init__(self, controller: FtdiRfm75Controller, ack: bool = True, timeout: float = 0.1):
+        """Constructor
+
+        :param controller: FtdiRfm75Controller configured for TX
+        :param ack: bool Use W_TX_PAYLOAD when True, W_TX_PAYLOAD_NO_ACK when AA enabled and False
+        :param timeout: float Max time in seconds without any TX progress, in-flight packets reported as TIMEOUT after it
+        """
+        self._controller = controller
+        self._ack = ack
+        self._timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self.elapsed = 0.0
+
+    def send(self, payloads):
+        """Stream payloads to the air. Payloads are consumed lazily, so generator could be used
+
+        :param payloads: iterable of bytearray payloads
+
+        :return:  generator of (index, Rfm75TxOutcome) in order of payloads
+        """
+        pending = deque()
+        source = enumerate(payloads)
+        in_flight = deque()
+        start = monotonic()
+        last_progress = start
+        self._controller.flush_tx()
+        self._controller.clear_status_flags(self.STATUS_TX_DS | self.STATUS_MAX_RT)
+        self._controller.ce_on()
+        try:
+            while True:
+                if not pending:
+                    item = next(source, None)
+                    if item is not None:
+                        pending.append(item)
+                if not pending and not in_flight:
+                    break
+
+                with self._controller.get_register_controller().locked():
+                    fifo = self._controller.read_fifo_status()
+                    status = self._controller.get_register_controller().last_status
+                if status.max_rt and in_flight:
+                    occupancy = self.__halted_occupancy(fifo, in_flight)
+                else:
+                    occupancy = self.__max_occupancy(fifo, len(in_flight))
+                done = len(in_flight) - occupancy
+                for _ in range(done):
+                    index, _ = in_flight.popleft()
+                    self.sent += 1
+                    yield index, Rfm75TxOutcome.SENT
+
+                if status.max_rt and in_flight:
+                    index, _ = in_flight.popleft()
+                    self.failed += 1
+                    logging.debug("MAX_RT for packet {}".format(index))
+                    yield index, Rfm75TxOutcome.MAX_RT
+                    # Packets behind failed one are flushed with it and written again
+                    self._controller.flush_tx()
+                    pending.extendleft(reversed(in_flight))
+                    in_flight.clear()
+                    occupancy = 0
+                if status.tx_ds or status.max_rt:
+                    self._controller.clear_status_flags(
+                        status.value & (self.STATUS_TX_DS | self.STATUS_MAX_RT))
+                if done or status.max_rt:
+                    last_progress = monotonic()
+                elif in_flight and monotonic() - last_progress > self._timeout:
+                    self._controller.flush_tx()
+                    while in_flight:
+                        index, _ = in_flight.popleft()
+                        self.failed += 1
+                        yield index, Rfm75TxOutcome.TIMEOUT
+                    occupancy = 0
+                    last_progress = monotonic()
+
+                for _ in range(self.TX_FIFO_DEPTH - occupancy):
+                    if not pending:
+                        item = next(source, None)
+                        if item is None:
+                            break
+                        pending.append(item)
+                    index, payload = pending.popleft()
+                    self._controller.write_tx_fifo(payload, self._ack)
+                    in_flight.append((index, payload))
+                if in_flight:
+                    self.__wait_progress()
+        finally:
+            self._controller.ce_off()
+            self.elapsed = monotonic() - start
+
+    def __wait_progress(self):
+        """Wait at least poll_interval, then until IRQ pin is asserted when configured or timeout passed"""
+        deadline = monotonic() + self._timeout
+        while True:
+            sleep(self._controller.poll_interval)
+            if self._controller.irq_pin is None or self._controller.is_irq_active() or monotonic() >= deadline:
+                return
+
+    def __max_occupancy(self, fifo: int, in_flight: int) -> int:
+        """Upper bound of packets left in TX FIFO. Partially filled FIFO holds one or two packets"""
+        if in_flight == 0 or fifo & self.FIFO_TX_EMPTY:
+            return 0
+        if fifo & self.FIFO_TX_FULL:
+            return self.TX_FIFO_DEPTH
+        return min(in_flight, self.TX_FIFO_DEPTH - 1)
+
+    def __halted_occupancy(self, fifo: int, in_flight: deque) -> int:
+        """Exact number of packets left in TX FIFO while MAX_RT holds transmission.
+        Partially filled FIFO with two candidates is told apart by writing one more payload,
+        which fills FIFO only if two packets were left. FIFO is flushed afterwards anyway"""
+        if fifo & self.FIFO_TX_EMPTY:
+            return 0
+        if fifo & self.FIFO_TX_FULL:
+            return self.TX_FIFO_DEPTH
+        if len(in_flight) == 1:
+            return 1
+        self._controller.write_tx_fifo(in_flight[-1][1], self._ack)
+        return 2 if self._controller.read_fifo_status() & self.FIFO_TX_FULL else 1
@@ -0,0 +1,22 @@
+import asyncio
+
+from pyRFTdi.Rfm75AsyncController import AsyncRfm75Controller
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+
+from test_emulator import open_tx
+
+
+def test_send_on_running_loop():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+    radio = AsyncRfm75Controller(controller)
+
+    async def send():
+        return [await radio.send(bytearray([index] * 4)) for index in range(3)]
+
+    try:
+        assert len(asyncio.run(send())) == 3
+    finally:
+        radio.close()
+    assert emulator.tx_packets == 3
@@ -0,0 +1,151 @@
+from threading import Event, Thread
+from time import monotonic, sleep
+
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Enums import Rfm75TxOutcome
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+from pyRFTdi.Rfm75TxStream import Rfm75TxStream
+
+CE_PIN = 7
+IRQ_PIN = 6
+
+
+def open_tx(emulator: Rfm75Emulator, irq_pin: int = None) -> FtdiRfm75Controller:
+    port = emulator.get_port()
+    controller = FtdiRfm75Controller(port, emulator.get_gpio(CE_PIN, irq_pin), CE_PIN,
+                                     Rfm75RegisterController(port, use_cache=True), irq_pin=irq_pin)
+    controller.set_mode_tx()
+    controller.power_up()
+    return controller
+
+
+def test_flush_tx_during_transmission():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    # 15 retransmits 4ms apart, nobody acknowledges
+    reg_controller.write_register(Rfm75Registers.SETUP_RETR, [0xFF])
+
+    result = controller.send(bytearray(5), timeout=0.005)
+    assert result.outcome == Rfm75TxOutcome.TIMEOUT
+    sleep(0.01)
+    assert reg_controller.get_status() is not None
+    assert emulator.next_event() is None
+
+    reg_controller.write_register(Rfm75Registers.SETUP_RETR, [0x00])
+    result = controller.send(bytearray(5))
+    assert result.outcome == Rfm75TxOutcome.MAX_RT
+
+
+def test_send_without_auto_ack():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+
+    for _ in range(3):
+        assert controller.send(bytearray(5)).outcome == Rfm75TxOutcome.SENT
+    assert emulator.tx_packets == 3
+
+
+def test_send_no_ack_requires_en_dyn_ack():
+    emulator = Rfm75Emulator(on_transmit=lambda _, payload, no_ack: False)
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    controller.activate_features()
+    assert emulator.features_active
+
+    # FEATURE is 0, chip drops W_TX_PAYLOAD_NO_ACK and nothing is transmitted
+    assert controller.send(bytearray(5), ack_send=False, timeout=0.005).outcome == Rfm75TxOutcome.TIMEOUT
+    assert emulator.tx_packets == 0
+
+    reg_controller.write_register(Rfm75Registers.FEATURE, [0x01])
+    assert controller.send(bytearray(5), ack_send=False).outcome == Rfm75TxOutcome.SENT
+    assert emulator.tx_packets == 1
+
+
+def test_data_rate_bits():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    for rf_setup, rate in ((0x07, 1000000), (0x0F, 2000000), (0x27, 250000), (0x2F, 2000000)):
+        reg_controller.write_register(Rfm75Registers.RF_SETUP, [rf_setup])
+        assert emulator.data_rate() == rate
+
+
+def test_tx_stream_polls_every_poll_interval():
+    for irq_pin in (None, IRQ_PIN):
+        emulator = Rfm75Emulator()
+        controller = open_tx(emulator, irq_pin)
+        controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+        polls = emulator.transactions.get("spi_exchange", 0)
+
+        stream = Rfm75TxStream(controller)
+        outcomes = [outcome for _, outcome in stream.send(bytearray([index] * 8) for index in range(30))]
+        assert outcomes == [Rfm75TxOutcome.SENT] * 30
+        # 3-deep FIFO drains within one poll_interval, so each poll frees whole FIFO
+        assert emulator.transactions["spi_exchange"] - polls <= 15
+
+
+def test_snapshot_restore_after_reset():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    controller.activate_features()
+    reg_controller.write_register(Rfm75Registers.FEATURE, [0x05])
+    reg_controller.write_register(Rfm75Registers.DYNPD, [0x03])
+    reg_controller.write_register(Rfm75Registers.RF_CH, [0x28])
+    image = reg_controller.snapshot()
+    assert image.get(Rfm75Registers.FEATURE) == b'\x05'
+
+    emulator.reset()
+    reg_controller.invalidate_cache()
+    reg_controller.resync_bank_number()
+    reg_controller.restore(image)
+    assert emulator.features_active
+    assert reg_controller.snapshot().diff(image, [register for register, _ in image.values
+                                                  if register not in Rfm75Registers.VOLATILE]) == {}
+
+
+def test_ce_toggle_does_not_wait_for_spi_of_other_thread():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    held = Event()
+    release = Event()
+
+    def hold_lock():
+        with reg_controller.locked():
+            held.set()
+            release.wait(1)
+
+    thread = Thread(target=hold_lock)
+    thread.start()
+    try:
+        assert held.wait(1)
+        start = monotonic()
+        controller.ce_on()
+        assert emulator.ce
+        controller.ce_off()
+        assert not emulator.ce
+        assert monotonic() - start < 0.5
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_tx_stream_reports_max_rt_for_failed_packet():
+    for failed in range(6):
+        for poll_interval in (0.0, 0.0002, 0.001):
+            emulator = Rfm75Emulator(on_transmit=lambda _, payload, no_ack: payload[0] != failed)
+            controller = open_tx(emulator)
+            controller.poll_interval = poll_interval
+            # Single transmission per packet, 250us apart
+            controller.get_register_controller().write_register(Rfm75Registers.SETUP_RETR, [0x00])
+
+            stream = Rfm75TxStream(controller)
+            results = list(stream.send(bytearray([index] * 8) for index in range(6)))
+            assert sorted(index for index, _ in results) == list(range(6))
+            assert dict(results) == {index: Rfm75TxOutcome.MAX_RT if index == failed else Rfm75TxOutcome.SENT
+                                for index in range(6)}
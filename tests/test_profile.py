@@ -0,0 +1,19 @@
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Profile import Rfm75PipeProfile, Rfm75Profile
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+
+from test_emulator import open_tx
+
+
+def test_apply_dynamic_payload_activates_features():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator)
+    reg_controller = controller.get_register_controller()
+    profile = Rfm75Profile(dynamic_payload=True, pipes={0: Rfm75PipeProfile(auto_ack=True, dynamic_payload=True)})
+
+    controller.config_ctrl.apply(profile)
+    assert emulator.features_active
+    reg_controller.invalidate_cache()
+    assert reg_controller.read_register(Rfm75Registers.FEATURE)[0] & 0x04
+    assert reg_controller.read_register(Rfm75Registers.DYNPD)[0] & 0x01
+    assert controller.config_ctrl.apply(profile) == []
@@ -0,0 +1,26 @@
+from time import sleep
+
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Receiver import Rfm75Receiver
+
+from test_emulator import IRQ_PIN, open_tx
+
+
+def test_irq_held_by_max_rt_is_not_spun_on():
+    emulator = Rfm75Emulator()
+    controller = open_tx(emulator, IRQ_PIN)
+    # Nobody acknowledges, MAX_RT keeps IRQ asserted while RX FIFO is empty
+    controller.write_tx_fifo(bytearray(4), True)
+    controller.ce_on()
+    sleep(0.01)
+    controller.ce_off()
+    assert controller.is_irq_active()
+    exchanges = emulator.transactions["spi_exchange"]
+
+    receiver = Rfm75Receiver(controller)
+    receiver.start()
+    sleep(0.1)
+    assert receiver.stop() == 0
+    assert receiver.received == 0
+    # Single drain per poll_interval, not back to back
+    assert emulator.transactions["spi_exchange"] - exchanges < 0.1 / controller.poll_interval * 2
@@ -0,0 +1,105 @@
+from threading import Lock
+
+from pyftdi.ftdi import Ftdi
+from pyftdi.spi import SpiController, SpiPort
+
+from pyRFTdi.Rfm75ConfigController import Rfm75ConfigController
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75MpsseSequencer import Rfm75MpsseSequencer
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+
+
+class MpsseEmulator:
+    """FTDI MPSSE engine which executes commands built by Rfm75MpsseSequencer on Rfm75Emulator"""
+
+    def __init__(self, emulator: Rfm75Emulator):
+        self.emulator = emulator
+        self.writes = 0
+        self.__selected = False
+        self.__received = bytearray()
+
+    def set_frequency(self, frequency: float):
+        pass
+
+    def write_data(self, data):
+        self.writes += 1
+        data = bytes(data)
+        index = 0
+        while index < len(data):
+            opcode = data[index]
+            if opcode in (Ftdi.SET_BITS_LOW, Ftdi.SET_BITS_HIGH):
+                if opcode == Ftdi.SET_BITS_LOW:
+                    self.__select(not data[index + 1] & SpiController.CS_BIT)
+                index += 3
+            elif opcode in (Ftdi.WRITE_BYTES_NVE_MSB, Ftdi.RW_BYTES_PVE_NVE_MSB):
+                length = (data[index + 1] | data[index + 2] << 8) + 1
+                for mosi in data[index + 3:index + 3 + length]:
+                    miso = self.emulator.shift(mosi)
+                    if opcode == Ftdi.RW_BYTES_PVE_NVE_MSB:
+                        self.__received.append(miso)
+                index += 3 + length
+            elif opcode == Ftdi.SEND_IMMEDIATE:
+                index += 1
+            else:
+                raise RuntimeError("Unexpected MPSSE command 0x{:02X}".format(opcode))
+
+    def read_data_bytes(self, size: int, attempt: int = 1) -> bytearray:
+        data = self.__received[:size]
+        del self.__received[:size]
+        return data
+
+    def __select(self, selected: bool):
+        if selected and not self.__selected:
+            self.emulator.select()
+        elif not selected and self.__selected:
+            self.emulator.deselect()
+        self.__selected = selected
+
+
+class MpsseController:
+    """SpiController state used by Rfm75MpsseSequencer, CS0 is the only chip select"""
+
+    def __init__(self, emulator: Rfm75Emulator):
+        self.ftdi = MpsseEmulator(emulator)
+        self.frequency = 8E6
+        self.direction = SpiController.SCK_BIT | SpiController.DO_BIT | SpiController.CS_BIT
+        self._lock = Lock()
+        self._frequency = None
+        self._spi_mask = SpiController.SPI_BITS | SpiController.CS_BIT
+        self._cs_bits = SpiController.CS_BIT
+        self._gpio_low = 0
+
+
+def open_sequenced(emulator: Rfm75Emulator) -> tuple:
+    mpsse = MpsseController(emulator)
+    sequencer = Rfm75MpsseSequencer(mpsse, SpiPort(mpsse, cs=0))
+    return mpsse.ftdi, Rfm75RegisterController(emulator.get_port(), use_cache=True, sequencer=sequencer)
+
+
+def test_batch_is_single_usb_transfer():
+    emulator = Rfm75Emulator()
+    mpsse, reg_controller = open_sequenced(emulator)
+    reg_controller.resync_bank_number()
+
+    with reg_controller.batch():
+        Rfm75ConfigController(reg_controller).chip_init("1Msps")
+    assert mpsse.writes == 1
+    assert "spi_write" not in emulator.transactions
+    for register in (Rfm75Registers.RF_CH, Rfm75Registers.RF_SETUP, Rfm75Registers.SETUP_AW):
+        assert reg_controller.read_register(register) == emulator.register(register.addr, register.bank)
+
+
+def test_snapshot_is_single_usb_transfer():
+    emulator = Rfm75Emulator()
+    mpsse, reg_controller = open_sequenced(emulator)
+    reg_controller.resync_bank_number()
+    reg_controller.write_register(Rfm75Registers.RF_CH, [0x28])
+    exchanges = emulator.transactions["spi_exchange"]
+
+    image = reg_controller.snapshot()
+    assert mpsse.writes == 1
+    assert emulator.transactions["spi_exchange"] == exchanges
+    assert image.get(Rfm75Registers.RF_CH) == b'\x28'
+    assert image.get(Rfm75Registers.B1_CHIP_ID) == emulator.register(Rfm75Registers.B1_CHIP_ID.addr, 1)
+    assert reg_controller.get_bank_number() == 1
@@ -0,0 +1,39 @@
+import tracemalloc
+
+import pytest
+
+from pyRFTdi.Rfm75PacketSlab import Rfm75PacketSlab
+
+
+def test_acquire_release_reuses_views():
+    slab = Rfm75PacketSlab(slots=1)
+    payload = slab.acquire(8)
+    assert len(payload) == 8
+    assert slab.acquire(8) is None
+    assert slab.overruns == 1
+    slab.release(payload)
+    assert slab.acquire(8) is payload
+    slab.release(payload)
+    with pytest.raises(RuntimeError):
+        slab.release(payload)
+    with pytest.raises(RuntimeError):
+        slab.release(memoryview(bytearray(8)))
+
+
+def test_acquire_release_does_not_allocate():
+    slab = Rfm75PacketSlab(slots=4)
+    for length in range(33):
+        slab.release(slab.acquire(length))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        for index in range(1000):
+            payload = slab.acquire(index % 33)
+            payload[:1] = b'\x01' if len(payload) else b''
+            slab.release(payload)
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    growth = sum(stat.size_diff for stat in after.compare_to(before, "filename")
+                 if stat.traceback[0].filename.endswith("Rfm75PacketSlab.py"))
+    assert growth <= 0
@@ -0,0 +1,37 @@
+from pyRFTdi.Rfm75Controller import FtdiRfm75Controller
+from pyRFTdi.Rfm75Emulator import Rfm75Emulator
+from pyRFTdi.Rfm75Enums import Rfm75TraceKind, Rfm75TxOutcome
+from pyRFTdi.Rfm75RegisterController import Rfm75RegisterController
+from pyRFTdi.Rfm75Registers import Rfm75Registers
+from pyRFTdi.Rfm75TraceRecorder import Rfm75TraceRecorder
+from pyRFTdi.Rfm75TraceReplayer import Rfm75TraceReplayer
+
+CE_PIN = 7
+IRQ_PIN = 6
+
+
+def test_record_replay_round_trip(tmp_path):
+    path = str(tmp_path / "radio.trace")
+    with Rfm75TraceRecorder(path) as recorder:
+        emulator = Rfm75Emulator(clock=recorder.clock)
+        port = recorder.wrap_port(emulator.get_port())
+        gpio = recorder.wrap_gpio(emulator.get_gpio(CE_PIN, IRQ_PIN))
+        controller = FtdiRfm75Controller(port, gpio, CE_PIN, Rfm75RegisterController(port, use_cache=True),
+                                         irq_pin=IRQ_PIN)
+        controller.set_mode_tx()
+        controller.power_up()
+        # Nobody acknowledges, every send waits for retransmits on IRQ pin
+        controller.get_register_controller().write_register(Rfm75Registers.SETUP_RETR, [0x13])
+        for index in range(5):
+            assert controller.send(bytearray([index] * 8)).outcome == Rfm75TxOutcome.MAX_RT
+        controller.config_ctrl.pipe_ctrl.disable_auto_acknowledge()
+        for index in range(5):
+            assert controller.send(bytearray([index] * 8)).outcome == Rfm75TxOutcome.SENT
+    assert emulator.tx_packets == 5 * 4 + 5
+
+    replayer = Rfm75TraceReplayer(path)
+    replayed = Rfm75Emulator(clock=replayer.clock)
+    mismatches = replayer.replay(replayed.get_port(), replayed.get_gpio(CE_PIN, IRQ_PIN))
+    assert mismatches == []
+    assert replayed.tx_packets == emulator.tx_packets
+    assert any(entry.kind == Rfm75TraceKind.GPIO_READ for entry in replayer)